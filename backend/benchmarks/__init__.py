@@ -0,0 +1 @@
+# Benchmark suite (see benchmarks/api_bench.py)
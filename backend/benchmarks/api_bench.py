@@ -0,0 +1,292 @@
+"""Reproducible API benchmark.
+
+Boots ``src.entry.flask_app`` against a freshly seeded database (a
+temporary SQLite file by default, or any ``--database-url``), with the
+LLM and Twilio clients replaced by local fakes, and replays a weighted
+mix of realistic requests through the Flask test client.
+
+For every scenario it reports p50/p95/p99 latency, throughput and SQL
+statements per request, and can write the results to a JSON file and
+compare them with an earlier run:
+
+    poetry run python -m benchmarks.api_bench --profile mixed --requests 2000 --output bench.json
+    poetry run python -m benchmarks.api_bench --compare bench.json
+
+WARNING: the target database is dropped and re-created.  Never point
+``--database-url`` at a database whose data you want to keep.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+# Weighted request mixes.  Each entry maps a scenario name to its weight.
+PROFILES = {
+    'mixed': {
+        'availability': 30, 'catalog': 30, 'calendar': 15,
+        'booking': 10, 'admin_lists': 10, 'chat': 5,
+    },
+    'availability': {'availability': 1},
+    'catalog': {'catalog': 1},
+    'booking': {'booking': 1},
+    'calendar': {'calendar': 1},
+    'admin': {'admin_lists': 1},
+    'chat': {'chat': 1},
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Scenarios:
+    """Builds requests for each scenario from the seeded data set."""
+
+    def __init__(self, data, rng):
+        self.data = data
+        self.rng = rng
+
+    def _day(self):
+        return self.data['first_day'] + timedelta(days=self.rng.randrange(self.data['days']))
+
+    def _staff(self):
+        return self.rng.choice(self.data['staff'])
+
+    def availability(self):
+        staff = self._staff()
+        duration = self.rng.choice([30, 45, 60, 90])
+        return 'GET', f"/api/staffs/{staff['id']}/available-time-slots/?date={self._day().isoformat()}&service_duration={duration}", None
+
+    def catalog(self):
+        salon_id = self.rng.choice(self.data['salon_ids'])
+        path = self.rng.choice([
+            f'/api/salons/{salon_id}/',
+            f'/api/salons/{salon_id}/services/',
+            f'/api/salons/{salon_id}/staffs/',
+            f"/api/services/{self.rng.choice(self.data['services'])['id']}/",
+        ])
+        return 'GET', path, None
+
+    def calendar(self):
+        staff = self._staff()
+        day = self._day()
+        return 'GET', f"/api/staffs/{staff['id']}/appointments/?month={day.month}&year={day.year}", None
+
+    def booking(self):
+        staff = self._staff()
+        service = self.rng.choice([s for s in self.data['services'] if s['salon_id'] == staff['salon_id']])
+        hour = self.rng.randrange(9, 18)
+        minute = self.rng.choice([0, 30])
+        body = {
+            'staff_id': staff['id'],
+            'service_id': service['id'],
+            'date': self._day().isoformat(),
+            'start_time': f'{hour:02d}:{minute:02d}',
+            'end_time': f'{hour + 1:02d}:{minute:02d}',
+            'customer_phone': f'+8491{self.rng.randrange(10 ** 7):07d}',
+        }
+        return 'POST', '/api/appointments/', body
+
+    def admin_lists(self):
+        path = self.rng.choice([
+            '/admin/appointments/',
+            f'/admin/appointments/?date={self._day().isoformat()}',
+            '/admin/appointments/?search=Staff',
+            '/admin/salons/',
+            '/admin/staff/',
+            '/admin/services/',
+        ])
+        return 'GET', path, None
+
+    def chat(self):
+        body = {
+            'conversation': [],
+            'message': 'Which services do you offer?',
+        }
+        return 'POST', '/api/chat/', body
+
+
+def boot(args):
+    """Configure the environment, install fakes and import the app."""
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    # Keep the guard quiet: the benchmark reports query counts itself
+    os.environ['QUERY_GUARD_ENABLED'] = 'false'
+    os.environ['SLOW_REQUEST_MS'] = '0'
+
+    from benchmarks import fakes
+    fakes.install()
+
+    if args.fake_redis:
+        import fakeredis  # type: ignore
+        import src.cache
+        src.cache._client = fakeredis.FakeRedis()
+
+    from src.entry import flask_app
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+def run(args):
+    flask_app = boot(args)
+
+    from benchmarks.seed import seed
+    from src.models import db
+    from src.query_guard import track_queries
+
+    with flask_app.app_context():
+        started = time.perf_counter()
+        data = seed(salons=args.salons, staff_per_salon=args.staff, services_per_salon=args.services,
+                    days=args.days, appointments_per_staff_day=args.appointments_per_day,
+                    random_seed=args.seed)
+        print(f"Seeded {data['counts']} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    rng = random.Random(args.seed)
+    scenarios = Scenarios(data, rng)
+    weights = PROFILES[args.profile]
+    names = list(weights)
+
+    client = flask_app.test_client()
+    with client.session_transaction() as session:
+        session['admin_id'] = data['admin_id']
+        session['admin_username'] = 'bench_admin'
+
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    queries = {name: [] for name in names}
+
+    def send(name):
+        method, path, body = getattr(scenarios, name)()
+        with track_queries(name, threshold=sys.maxsize) as tracker:
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - start
+        response.close()
+        # Drop session state between requests, as separate HTTP requests would
+        with flask_app.app_context():
+            db.session.remove()
+        return elapsed, response.status_code, tracker.count
+
+    for _ in range(args.warmup):
+        send(rng.choices(names, weights=[weights[n] for n in names])[0])
+
+    run_started = time.perf_counter()
+    for _ in range(args.requests):
+        name = rng.choices(names, weights=[weights[n] for n in names])[0]
+        elapsed, status, count = send(name)
+        samples[name].append(elapsed)
+        queries[name].append(count)
+        statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+    wall_time = time.perf_counter() - run_started
+
+    def summarize(latencies, counts, status_counts):
+        ordered = sorted(latencies)
+        total = sum(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': sum(n for code, n in status_counts.items() if code.startswith('5')),
+            'status_counts': status_counts,
+            'mean_ms': round(total / len(latencies) * 1000, 3) if latencies else None,
+            'p50_ms': round(percentile(ordered, 50) * 1000, 3) if ordered else None,
+            'p95_ms': round(percentile(ordered, 95) * 1000, 3) if ordered else None,
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3) if ordered else None,
+            'throughput_rps': round(len(latencies) / total, 2) if total else None,
+            'queries_per_request': round(sum(counts) / len(counts), 2) if counts else None,
+            'max_queries': max(counts) if counts else None,
+        }
+
+    all_latencies = [value for name in names for value in samples[name]]
+    all_queries = [value for name in names for value in queries[name]]
+    all_statuses = {}
+    for name in names:
+        for code, n in statuses[name].items():
+            all_statuses[code] = all_statuses.get(code, 0) + n
+
+    total = summarize(all_latencies, all_queries, all_statuses)
+    total['throughput_rps'] = round(len(all_latencies) / wall_time, 2) if wall_time else None
+
+    return {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'profile': args.profile,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'database': args.database_url.split(':', 1)[0],
+            'fake_redis': args.fake_redis,
+            'python': platform.python_version(),
+            'data': data['counts'],
+        },
+        'scenarios': {name: summarize(samples[name], queries[name], statuses[name])
+                      for name in names if samples[name]},
+        'total': total,
+    }
+
+
+def print_report(results, baseline=None):
+    header = f"{'scenario':<14}{'reqs':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'q/req':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(results['scenarios'].items()) + [('TOTAL', results['total'])]
+    for name, stats in rows:
+        print(f"{name:<14}{stats['requests']:>7}{stats['errors']:>5}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['throughput_rps']:>10}{stats['queries_per_request']:>8}")
+        if baseline is None:
+            continue
+        before = baseline['total'] if name == 'TOTAL' else baseline['scenarios'].get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request'):
+            if before.get(key):
+                deltas.append(f"{key} {(stats[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"{'':<14}vs baseline: {', '.join(deltas)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed')
+    parser.add_argument('--requests', type=int, default=1000, help='measured requests')
+    parser.add_argument('--warmup', type=int, default=50, help='unmeasured warm-up requests')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for data and traffic')
+    parser.add_argument('--database-url', default=None,
+                        help='database to DROP, seed and benchmark (default: temporary SQLite file)')
+    parser.add_argument('--fake-redis', action='store_true', help='use fakeredis instead of REDIS_URL')
+    parser.add_argument('--salons', type=int, default=2)
+    parser.add_argument('--staff', type=int, default=8, help='staff per salon')
+    parser.add_argument('--services', type=int, default=12, help='services per salon')
+    parser.add_argument('--days', type=int, default=14, help='days of seeded appointments')
+    parser.add_argument('--appointments-per-day', type=int, default=5, help='appointments per staff per day')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON results to compare against')
+    args = parser.parse_args(argv)
+
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='heresalon-bench-'), 'bench.sqlite')
+        args.database_url = f'sqlite:///{path}'
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Results written to {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Local stand-ins for external services used while benchmarking.
+
+The chatbot talks to an LLM provider and (for confirmations) Twilio.
+Benchmarks must not depend on either, so :func:`install` swaps them for
+deterministic fakes *before* the Flask app - and with it the chat
+blueprint's module-level ``ChatBotService`` - is imported.
+"""
+import json
+import sys
+from types import SimpleNamespace
+
+
+class FakeCompletions:
+    """Mimics ``client.chat.completions`` of the openai package.
+
+    The first call of a conversation asks for the ``list_services`` tool,
+    the follow-up call (which sees the tool result) returns a final
+    answer.  That reproduces the DB work of a typical one-tool chat turn.
+    """
+
+    def __init__(self, salon_id=1):
+        self.salon_id = salon_id
+        self.calls = 0
+
+    def create(self, model, messages, tools=None, tool_choice=None, temperature=None):
+        self.calls += 1
+        if messages and messages[-1].get('role') == 'tool':
+            message = SimpleNamespace(role='assistant', content='Here are our services.', tool_calls=None)
+        else:
+            tool_call = SimpleNamespace(
+                id=f'call_{self.calls}',
+                type='function',
+                function=SimpleNamespace(name='list_services', arguments=json.dumps({'salon_id': self.salon_id})),
+            )
+            message = SimpleNamespace(role='assistant', content=None, tool_calls=[tool_call])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeOpenAI:
+    def __init__(self, api_key=None, **kwargs):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+
+
+class FakeTwilioClient:
+    """Records outgoing SMS instead of sending them."""
+
+    sent = []
+
+    def __init__(self, account_sid=None, auth_token=None, **kwargs):
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, body=None, from_=None, to=None, **kwargs):
+        message = SimpleNamespace(sid=f'SM{len(self.sent):032d}', body=body, from_=from_, to=to)
+        self.sent.append(message)
+        return message
+
+
+def install():
+    """Replace the LLM and Twilio clients used by the chatbot with fakes."""
+    if 'src.routes' in sys.modules:
+        raise RuntimeError('benchmarks.fakes.install() must run before the Flask app is imported')
+
+    from src.services import chatbot_service
+    from src.settings import Settings
+
+    Settings.LLM_PROVIDER = 'openai'
+    chatbot_service.openai = SimpleNamespace(OpenAI=FakeOpenAI)
+    chatbot_service.Client = FakeTwilioClient
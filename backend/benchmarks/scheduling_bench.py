@@ -0,0 +1,155 @@
+"""Micro-benchmarks for the scheduling hot path.
+
+Times the availability and conflict algorithms directly (no HTTP layer):
+
+* ``AvailabilityService.get_available_time_slots``
+* ``AvailabilityService.check_staff_availability``
+* ``AppointmentService.check_time_conflict``
+* ``ChatBotService._tool_find_available_staff``
+
+over a grid of staff count, appointments per staff per day, slot
+interval and service duration, reporting the median wall time and the
+number of SQL statements per call:
+
+    poetry run python -m benchmarks.scheduling_bench --output scheduling.json
+    poetry run python -m benchmarks.scheduling_bench --staff 5 50 --appointments-per-day 2 8 --compare scheduling.json
+
+Like api_bench, the target database is dropped and re-seeded.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from benchmarks.api_bench import boot
+
+
+def measure(fn, repeat):
+    """Run ``fn`` ``repeat`` times; return (median seconds, statements per call)."""
+    from src.models import db
+    from src.query_guard import track_queries
+
+    timings = []
+    statements = 0
+    for _ in range(repeat):
+        db.session.expire_all()
+        with track_queries('scheduling_bench', threshold=sys.maxsize) as tracker:
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        statements = tracker.count
+    return statistics.median(timings), statements
+
+
+def run(args):
+    flask_app = boot(args)
+
+    from benchmarks.seed import seed
+    from src.services.appointment_service import AppointmentService
+    from src.services.availability_service import AvailabilityService
+    from src.services.chatbot_service import ChatBotService
+
+    chatbot = ChatBotService()
+    results = []
+
+    with flask_app.app_context():
+        for staff_count, per_day in itertools.product(args.staff, args.appointments_per_day):
+            data = seed(salons=1, staff_per_salon=staff_count, services_per_salon=4, customers=20,
+                        days=3, appointments_per_staff_day=per_day, random_seed=args.seed)
+            staff_id = data['staff'][0]['id']
+            service_id = data['services'][0]['id']
+            day = data['first_day'] + timedelta(days=1)
+            start = datetime.combine(day, dt_time(13, 0))
+
+            def record(function, params, fn):
+                seconds, statements = measure(fn, args.repeat)
+                row = {'function': function, 'staff': staff_count, 'appointments_per_day': per_day,
+                       **params, 'median_ms': round(seconds * 1000, 3), 'statements': statements}
+                results.append(row)
+                print(f"{function:<28} staff={staff_count:<4} appts/day={per_day:<3} "
+                      f"{' '.join(f'{k}={v}' for k, v in params.items()):<26} "
+                      f"{row['median_ms']:>9.3f} ms {statements:>5} stmts", file=sys.stderr)
+
+            for interval, duration in itertools.product(args.interval, args.duration):
+                record('get_available_time_slots', {'interval': interval, 'duration': duration},
+                       lambda: AvailabilityService.get_available_time_slots(
+                           staff_id=staff_id, appointment_date=day,
+                           service_duration_minutes=duration, slot_interval_minutes=interval))
+
+            for duration in args.duration:
+                end = start + timedelta(minutes=duration)
+                record('check_staff_availability', {'duration': duration},
+                       lambda: AvailabilityService.check_staff_availability(
+                           staff_id=staff_id, appointment_date=day, start_time=start, end_time=end))
+                record('check_time_conflict', {'duration': duration},
+                       lambda: AppointmentService.check_time_conflict(
+                           staff_id=staff_id, start_time=start, end_time=end))
+                tool_args = {'service_id': service_id, 'date': day.isoformat(),
+                             'start_time': start.strftime('%H:%M'), 'end_time': end.strftime('%H:%M')}
+                record('find_available_staff', {'duration': duration},
+                       lambda: chatbot._tool_find_available_staff(tool_args, None))
+
+    return {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'database': args.database_url.split(':', 1)[0],
+        },
+        'results': results,
+    }
+
+
+def _row_key(row):
+    return tuple(sorted((k, v) for k, v in row.items() if k not in ('median_ms', 'statements')))
+
+
+def compare(results, baseline):
+    before = {_row_key(row): row for row in baseline['results']}
+    for row in results['results']:
+        old = before.get(_row_key(row))
+        if not old:
+            continue
+        change = (row['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+        params = ' '.join(f'{k}={v}' for k, v in _row_key(row) if k != 'function')
+        print(f"{row['function']:<28} {params:<60} {change:+7.1f}% time, "
+              f"{row['statements'] - old['statements']:+d} stmts")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--staff', type=int, nargs='+', default=[5, 20, 50], help='staff counts to test')
+    parser.add_argument('--appointments-per-day', type=int, nargs='+', default=[2, 5, 8],
+                        help='appointments per staff per day')
+    parser.add_argument('--interval', type=int, nargs='+', default=[15, 30], help='slot intervals (minutes)')
+    parser.add_argument('--duration', type=int, nargs='+', default=[30, 60, 90], help='service durations (minutes)')
+    parser.add_argument('--repeat', type=int, default=20, help='calls per measurement (median is reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None,
+                        help='database to DROP, seed and benchmark (default: temporary SQLite file)')
+    parser.add_argument('--fake-redis', action='store_true', help='use fakeredis instead of REDIS_URL')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON results to compare against')
+    args = parser.parse_args(argv)
+
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='heresalon-bench-'), 'scheduling.sqlite')
+        args.database_url = f'sqlite:///{path}'
+
+    results = run(args)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Results written to {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Deterministic data set for benchmarks.
+
+Rows are bulk inserted (bypassing model validators) so that seeding a
+realistic volume stays fast.  Appointments are only created on future
+days, as the booking and availability paths expect.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from werkzeug.security import generate_password_hash
+
+from src.models import db, Salon, Staff, Service, User, Appointment
+from src.models.appointment import AppointmentStatus, normalize_phone
+from src.models.service import ServiceType
+from src.models.staff import Seniority
+from src.models.user import UserRole
+
+
+def seed(salons=2, staff_per_salon=8, services_per_salon=12, customers=200,
+         days=14, appointments_per_staff_day=5, random_seed=42):
+    """
+    Reset the schema and insert the benchmark data set
+
+    Returns:
+        Dict describing what was created (IDs and counts), used by the load profiles
+    """
+    rng = random.Random(random_seed)
+    db.drop_all()
+    db.create_all()
+
+    salon_ids = []
+    for i in range(salons):
+        salon = Salon(name=f'Bench Salon {i + 1}', address=f'{i + 1} Bench Street',
+                      start_working_time=time(9, 0), end_working_time=time(19, 0))
+        db.session.add(salon)
+        db.session.flush()
+        salon_ids.append(salon.id)
+
+    password_hash = generate_password_hash('bench123')
+    db.session.add(User(username='bench_admin', email='bench_admin@example.com',
+                        password_hash=password_hash, role=UserRole.ADMIN))
+    db.session.bulk_insert_mappings(User, [
+        {'username': f'customer{i}', 'email': f'customer{i}@example.com',
+         'password_hash': password_hash, 'role': UserRole.CUSTOMER}
+        for i in range(customers)
+    ])
+    db.session.bulk_insert_mappings(Service, [
+        {'salon_id': salon_id, 'name': f'Service {salon_id}-{i}', 'type': rng.choice(list(ServiceType)),
+         'price': Decimal(rng.randrange(15, 120)), 'duration': rng.choice([30, 45, 60, 90])}
+        for salon_id in salon_ids for i in range(services_per_salon)
+    ])
+    db.session.bulk_insert_mappings(Staff, [
+        {'salon_id': salon_id, 'name': f'Staff {salon_id}-{i}', 'role': 1,
+         'seniority': rng.choice(list(Seniority)), 'years_experience': rng.randrange(1, 15)}
+        for salon_id in salon_ids for i in range(staff_per_salon)
+    ])
+    db.session.commit()
+
+    admin_id = User.query.filter_by(username='bench_admin').first().id
+    customer_ids = [row.id for row in User.query.with_entities(User.id).filter_by(role=UserRole.CUSTOMER)]
+    staff_rows = Staff.query.with_entities(Staff.id, Staff.salon_id).all()
+    service_rows = Service.query.with_entities(Service.id, Service.salon_id, Service.duration).all()
+    services_by_salon = {}
+    for service_id, salon_id, duration in service_rows:
+        services_by_salon.setdefault(salon_id, []).append((service_id, duration))
+
+    first_day = date.today() + timedelta(days=1)
+    statuses = [AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.CONFIRMED,
+                AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED]
+    appointments = []
+    for staff_id, salon_id in staff_rows:
+        for day_offset in range(days):
+            day = first_day + timedelta(days=day_offset)
+            # Non-overlapping hourly slots between 09:00 and 19:00
+            for hour in sorted(rng.sample(range(9, 19), min(appointments_per_staff_day, 10))):
+                service_id, duration = rng.choice(services_by_salon[salon_id])
+                start = datetime.combine(day, time(hour, 0))
+                guest = rng.random() < 0.3
+                phone = f'+8490{rng.randrange(10 ** 7):07d}' if guest else None
+                appointments.append({
+                    'staff_id': staff_id, 'service_id': service_id, 'date': day,
+                    'user_id': None if guest else rng.choice(customer_ids),
+                    # bulk inserts skip the model validators
+                    'phone_number': phone,
+                    'phone_digits': normalize_phone(phone),
+                    'status': rng.choice(statuses),
+                    'start_time': start,
+                    'end_time': start + timedelta(minutes=min(duration or 60, 60)),
+                })
+    db.session.bulk_insert_mappings(Appointment, appointments)
+    db.session.commit()
+
+    return {
+        'salon_ids': salon_ids,
+        'staff': [{'id': staff_id, 'salon_id': salon_id} for staff_id, salon_id in staff_rows],
+        'services': [{'id': service_id, 'salon_id': salon_id, 'duration': duration}
+                     for service_id, salon_id, duration in service_rows],
+        'customer_ids': customer_ids,
+        'admin_id': admin_id,
+        'first_day': first_day,
+        'days': days,
+        'counts': {
+            'salons': len(salon_ids),
+            'staff': len(staff_rows),
+            'services': len(service_rows),
+            'customers': len(customer_ids),
+            'appointments': len(appointments),
+        },
+    }
@@ -3,9 +3,26 @@
 if [ ${DEV:-false} = 'true' ]; then
   poetry run flask run --host 0.0.0.0 --port 8080
 else
-  poetry run uwsgi -s /tmp/uwsgi.sock \
-                   --manage-script-name \
-                   --mount /=src/entry.py \
-                   --callable flask_app \
-                   --http 0.0.0.0:8080
+  # Production profile: cpu, io (default) or gevent.
+  # See /etc/uwsgi/heresalon.ini for what each setting does.
+  export HERESALON_UWSGI_PROFILE=${HERESALON_UWSGI_PROFILE:-io}
+  export HERESALON_UWSGI_PROCESSES=${HERESALON_UWSGI_PROCESSES:-$(nproc)}
+  export HERESALON_UWSGI_THREADS=${HERESALON_UWSGI_THREADS:-4}
+  export HERESALON_UWSGI_ASYNC_CORES=${HERESALON_UWSGI_ASYNC_CORES:-100}
+  export HERESALON_UWSGI_LAZY_APPS=${HERESALON_UWSGI_LAZY_APPS:-true}
+  export HERESALON_UWSGI_LISTEN=${HERESALON_UWSGI_LISTEN:-128}
+  export HERESALON_UWSGI_MAX_REQUESTS=${HERESALON_UWSGI_MAX_REQUESTS:-5000}
+  export HERESALON_UWSGI_RELOAD_ON_RSS=${HERESALON_UWSGI_RELOAD_ON_RSS:-512}
+  export HERESALON_UWSGI_OFFLOAD_THREADS=${HERESALON_UWSGI_OFFLOAD_THREADS:-2}
+
+  if [ "$HERESALON_UWSGI_PROFILE" = 'gevent' ]; then
+    # Chat requests wait on the LLM for a long time; allow for it
+    export HERESALON_UWSGI_HARAKIRI=${HERESALON_UWSGI_HARAKIRI:-120}
+    # Tells the app to make psycopg2 cooperative (see src/green.py)
+    export GEVENT=true
+  else
+    export HERESALON_UWSGI_HARAKIRI=${HERESALON_UWSGI_HARAKIRI:-60}
+  fi
+
+  poetry run uwsgi --ini /etc/uwsgi/heresalon.ini:${HERESALON_UWSGI_PROFILE}
 fi
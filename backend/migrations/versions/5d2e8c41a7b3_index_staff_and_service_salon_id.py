@@ -0,0 +1,28 @@
+"""Index staffs.salon_id and services.salon_id
+
+Revision ID: 5d2e8c41a7b3
+Revises: 39be446c5be7
+Create Date: 2026-10-19 09:12:41.208517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8c41a7b3'
+down_revision = '39be446c5be7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backs the correlated staff_count/services_count subqueries on Salon
+    op.create_index(op.f('ix_staffs_salon_id'), 'staffs', ['salon_id'], unique=False)
+    op.create_index(op.f('ix_services_salon_id'), 'services', ['salon_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_services_salon_id'), table_name='services')
+    op.drop_index(op.f('ix_staffs_salon_id'), table_name='staffs')
@@ -0,0 +1,54 @@
+"""Indexes for the admin appointment search
+
+Revision ID: 9a41c7e2d5b8
+Revises: 5d2e8c41a7b3
+Create Date: 2026-10-19 12:05:17.443920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = '9a41c7e2d5b8'
+down_revision = '5d2e8c41a7b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_appointments_staff_id'), 'appointments', ['staff_id'], unique=False)
+    op.create_index(op.f('ix_appointments_user_id'), 'appointments', ['user_id'], unique=False)
+    op.create_index(op.f('ix_appointments_service_id'), 'appointments', ['service_id'], unique=False)
+    op.create_index('ix_appointments_date_start_time', 'appointments', ['date', 'start_time'], unique=False)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Trigram indexes for substring and word-similarity matching (AppointmentSearchService)
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_username_trgm', 'users', ['username'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.create_index('ix_staffs_name_trgm', 'staffs', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_services_name_trgm', 'services', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    # Digits-only phone number, for prefix matching
+    op.execute(
+        "CREATE INDEX ix_appointments_phone_digits ON appointments "
+        "(regexp_replace(phone_number, '[^0-9]', '', 'g') text_pattern_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_appointments_phone_digits', table_name='appointments')
+        op.drop_index('ix_services_name_trgm', table_name='services')
+        op.drop_index('ix_staffs_name_trgm', table_name='staffs')
+        op.drop_index('ix_users_username_trgm', table_name='users')
+
+    op.drop_index('ix_appointments_date_start_time', table_name='appointments')
+    op.drop_index(op.f('ix_appointments_service_id'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_user_id'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_staff_id'), table_name='appointments')
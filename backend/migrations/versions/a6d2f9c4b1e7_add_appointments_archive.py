@@ -0,0 +1,48 @@
+"""Add appointments_archive
+
+Revision ID: a6d2f9c4b1e7
+Revises: f4d8a1b6c053
+Create Date: 2026-10-19 21:05:13.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f9c4b1e7'
+down_revision = 'f4d8a1b6c053'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reuse the enum type created with the appointments table
+    status = postgresql.ENUM('PENDING', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED',
+                             name='appointmentstatus', create_type=False)
+    if op.get_bind().dialect.name != 'postgresql':
+        status = sa.Enum('PENDING', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='appointmentstatus')
+
+    op.create_table('appointments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('phone_digits', sa.String(length=15), nullable=True),
+    sa.Column('status', status, nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_appointments_archive_staff_id_date', 'appointments_archive', ['staff_id', 'date'], unique=False)
+    op.create_index('ix_appointments_archive_date', 'appointments_archive', ['date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_appointments_archive_date', table_name='appointments_archive')
+    op.drop_index('ix_appointments_archive_staff_id_date', table_name='appointments_archive')
+    op.drop_table('appointments_archive')
@@ -0,0 +1,69 @@
+"""Add appointments.phone_digits
+
+Revision ID: c3f19a7d0e62
+Revises: 9a41c7e2d5b8
+Create Date: 2026-10-19 13:21:48.905114
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f19a7d0e62'
+down_revision = '9a41c7e2d5b8'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+appointments = sa.table(
+    'appointments',
+    sa.column('id', sa.Integer),
+    sa.column('phone_number', sa.String),
+    sa.column('phone_digits', sa.String),
+)
+
+
+def upgrade():
+    op.add_column('appointments', sa.Column('phone_digits', sa.String(length=15), nullable=True))
+
+    # Backfill in id order, one batch per statement round trip
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select([appointments.c.id, appointments.c.phone_number])
+            .where(appointments.c.id > last_id)
+            .where(appointments.c.phone_number.isnot(None))
+            .order_by(appointments.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            appointments.update()
+            .where(appointments.c.id == sa.bindparam('row_id'))
+            .values(phone_digits=sa.bindparam('digits')),
+            [{'row_id': row.id, 'digits': re.sub(r'\D', '', row.phone_number)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    if conn.dialect.name == 'postgresql':
+        # Superseded by the stored column
+        op.drop_index('ix_appointments_phone_digits', table_name='appointments')
+    op.create_index('ix_appointments_phone_digits_date', 'appointments', ['phone_digits', 'date'], unique=False,
+                    postgresql_ops={'phone_digits': 'text_pattern_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_appointments_phone_digits_date', table_name='appointments')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_appointments_phone_digits ON appointments "
+            "(regexp_replace(phone_number, '[^0-9]', '', 'g') text_pattern_ops)"
+        )
+    op.drop_column('appointments', 'phone_digits')
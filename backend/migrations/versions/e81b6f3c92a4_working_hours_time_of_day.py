@@ -0,0 +1,36 @@
+"""Store working hours as times of day
+
+Revision ID: e81b6f3c92a4
+Revises: c3f19a7d0e62
+Create Date: 2026-10-19 14:02:33.518276
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b6f3c92a4'
+down_revision = 'c3f19a7d0e62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only the time part of the old DateTime columns was ever meaningful
+    with op.batch_alter_table('working_hours') as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), type_=sa.Time(),
+                              existing_nullable=False, postgresql_using='start_time::time')
+        batch_op.alter_column('end_time', existing_type=sa.DateTime(), type_=sa.Time(),
+                              existing_nullable=False, postgresql_using='end_time::time')
+    op.create_index(op.f('ix_working_hours_staff_id'), 'working_hours', ['staff_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_working_hours_staff_id'), table_name='working_hours')
+    with op.batch_alter_table('working_hours') as batch_op:
+        batch_op.alter_column('end_time', existing_type=sa.Time(), type_=sa.DateTime(),
+                              existing_nullable=False, postgresql_using="'2000-01-01'::date + end_time")
+        batch_op.alter_column('start_time', existing_type=sa.Time(), type_=sa.DateTime(),
+                              existing_nullable=False, postgresql_using="'2000-01-01'::date + start_time")
@@ -0,0 +1,49 @@
+"""Add time_off
+
+Revision ID: f4d8a1b6c053
+Revises: e81b6f3c92a4
+Create Date: 2026-10-19 15:10:42.067391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4d8a1b6c053'
+down_revision = 'e81b6f3c92a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('time_off',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('salon_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.Enum('HOLIDAY', 'SICK', 'TRAINING', 'OTHER', name='timeoffreason'), nullable=False),
+    sa.Column('note', sa.String(length=255), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('end_at > start_at', name='check_time_off_period'),
+    sa.ForeignKeyConstraint(['salon_id'], ['salons.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staffs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_time_off_salon_id'), 'time_off', ['salon_id'], unique=False)
+    op.create_index(op.f('ix_time_off_staff_id'), 'time_off', ['staff_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Interval index for overlap (&&) queries
+        op.execute('CREATE INDEX ix_time_off_period ON time_off USING gist (tsrange(start_at, end_at))')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_time_off_period', table_name='time_off')
+    op.drop_index(op.f('ix_time_off_staff_id'), table_name='time_off')
+    op.drop_index(op.f('ix_time_off_salon_id'), table_name='time_off')
+    op.drop_table('time_off')
+    sa.Enum(name='timeoffreason').drop(op.get_bind(), checkfirst=True)
@@ -3,6 +3,10 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 
 from src import routes, utils as u
+from src.database import ReplicaRouter, engine_options, init_engine
+from src.events import AppointmentEvents
+from src.metrics import RequestMetrics
+from src.query_guard import QueryGuard
 from src.models import db
 from src.settings import Settings as S
 from src.tasks import make_celery
@@ -25,6 +29,13 @@ class Application:
         # Init Flask
         self.flask_app = Flask(__name__, static_url_path='/static')
         self.flask_app.config.from_object(S)
+        self.flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(S.SQLALCHEMY_DATABASE_URI)
+
+        # Per-endpoint latency/SQL/response-size metrics, exposed at /metrics
+        self.metrics = RequestMetrics(self.flask_app)
+
+        # Warn about (or fail on) N+1 query patterns in development
+        self.query_guard = QueryGuard(self.flask_app)
 
         # Configure CORS with more permissive settings for development
         CORS(self.flask_app, 
@@ -44,6 +55,13 @@ class Application:
         # Init Flask-SQLAlchemy
         self.db = db
         self.db.init_app(self.flask_app)
+        init_engine(self.flask_app, self.db)
+
+        # Serve GET requests from DATABASE_REPLICA_URL when configured
+        self.replica_router = ReplicaRouter(self.flask_app, self.db)
+
+        # Publish appointment changes to the live calendar streams
+        self.appointment_events = AppointmentEvents(self.flask_app)
 
         # Init Flask-Migrate
         # u.wait_for_service('postgres', 5432, timeout=30.0)
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+import redis
+
+from src.settings import Settings as S
+
+
+_client = None
+_blocking_client = None
+
+
+def get_redis():
+    """Return the shared Redis client (same server as the Celery broker).
+
+    redis-py connection pools are fork-aware, so a client created before
+    uWSGI/Celery forks is safe to use in the workers.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            S.REDIS_URL,
+            socket_timeout=S.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=S.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def get_blocking_redis():
+    """Return a Redis client for long blocking reads (XREAD BLOCK).
+
+    Same server as ``get_redis``, but with a socket timeout that outlasts
+    the block time of the live event streams.
+    """
+    global _blocking_client
+    if _blocking_client is None:
+        _blocking_client = redis.Redis.from_url(
+            S.REDIS_URL,
+            socket_timeout=S.EVENTS_HEARTBEAT_SECONDS + 5,
+            socket_connect_timeout=S.REDIS_SOCKET_TIMEOUT,
+        )
+    return _blocking_client
+
+
+def key(*parts):
+    """Build a namespaced Redis key, e.g. key('catalog', 1) -> 'heresalon:catalog:1'."""
+    return ':'.join(['heresalon'] + [str(part) for part in parts])
+
+
+class LocalLRU:
+    """Small thread-safe, process-local LRU cache.
+
+    Used in front of Redis for hot values; entries should carry their own
+    version so callers can tell when they are stale.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name, default=None):
+        with self._lock:
+            if name not in self._data:
+                return default
+            self._data.move_to_end(name)
+            return self._data[name]
+
+    def set(self, name, value):
+        with self._lock:
+            self._data[name] = value
+            self._data.move_to_end(name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, name):
+        with self._lock:
+            self._data.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,249 @@
+"""SQLAlchemy engine configuration for uWSGI and Celery workers.
+
+Every web and worker process owns its own pool, so the total number of
+Postgres connections is roughly::
+
+    processes x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+Size the pool to the threads (or greenlets) of one process and keep the
+sum under ``max_connections``.  When that no longer scales, put PgBouncer
+in transaction-pooling mode in front of Postgres and set ``DB_PGBOUNCER``:
+the application then keeps no pool of its own and leaves pooling to
+PgBouncer.
+
+With ``DATABASE_REPLICA_URL`` set, reads can be served by a streaming
+replica (see ``RoutingSession`` and ``ReplicaRouter``).
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from celery.signals import worker_process_init
+from flask import request, session as flask_session
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event, exc, orm, text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.dml import UpdateBase
+
+from src.settings import Settings as S
+
+try:
+    from uwsgidecorators import postfork  # type: ignore
+except ImportError:
+    postfork = None  # not running under uWSGI
+
+
+
+def engine_options(database_url):
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` for a database URL."""
+    if not database_url or make_url(database_url).get_backend_name() != 'postgresql':
+        # SQLite (development, benchmarks): keep Flask-SQLAlchemy's defaults
+        return {}
+
+    if S.DB_PGBOUNCER:
+        # PgBouncer owns the pool.  Session-level settings would leak to
+        # other clients sharing the server connection, so the statement
+        # timeout is applied per transaction (see _set_local_statement_timeout).
+        return {'poolclass': NullPool}
+
+    options = {
+        'pool_size': S.DB_POOL_SIZE,
+        'max_overflow': S.DB_MAX_OVERFLOW,
+        'pool_timeout': S.DB_POOL_TIMEOUT,
+        'pool_recycle': S.DB_POOL_RECYCLE,
+        'pool_pre_ping': S.DB_POOL_PRE_PING,
+    }
+    if S.DB_STATEMENT_TIMEOUT_MS:
+        options['connect_args'] = {'options': f'-c statement_timeout={S.DB_STATEMENT_TIMEOUT_MS}'}
+    return options
+
+
+def _set_local_statement_timeout(conn):
+    if conn.dialect.name != 'postgresql':
+        return
+    # Raw cursor: the transaction is still being opened on ``conn``
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f'SET LOCAL statement_timeout = {int(S.DB_STATEMENT_TIMEOUT_MS)}')
+    finally:
+        cursor.close()
+
+
+def _record_pid(dbapi_connection, connection_record):
+    connection_record.info['pid'] = os.getpid()
+
+
+def _check_pid(dbapi_connection, connection_record, connection_proxy):
+    # Never hand a connection opened by the parent process to a forked child
+    pid = os.getpid()
+    if connection_record.info.get('pid') != pid:
+        connection_record.connection = connection_proxy.connection = None
+        raise exc.DisconnectionError(
+            f"Connection record belongs to pid {connection_record.info.get('pid')}, "
+            f'attempting to check out in pid {pid}'
+        )
+
+
+def _reset_pool(app, db):
+    """Drop the pools inherited from the parent without closing their sockets."""
+    with app.app_context():
+        for bind in [None] + list(app.config['SQLALCHEMY_BINDS'] or {}):
+            engine = db.get_engine(app, bind=bind)
+            engine.pool = engine.pool.recreate()
+
+
+def init_engine(app, db):
+    """Attach fork-safety hooks (and the PgBouncer timeout) to the app's engines."""
+    with app.app_context():
+        engines = [db.get_engine(app)]
+        if REPLICA_BIND in (app.config['SQLALCHEMY_BINDS'] or {}):
+            engines.append(db.get_engine(app, bind=REPLICA_BIND))
+
+    for engine in engines:
+        event.listen(engine.pool, 'connect', _record_pid)
+        event.listen(engine.pool, 'checkout', _check_pid)
+        if S.DB_PGBOUNCER and S.DB_STATEMENT_TIMEOUT_MS:
+            event.listen(engine, 'begin', _set_local_statement_timeout)
+
+    # With uWSGI lazy-apps the app is created after the fork and the pool
+    # is already private; otherwise start each worker with a fresh pool.
+    if postfork is not None:
+        postfork(lambda: _reset_pool(app, db))
+    worker_process_init.connect(lambda **kwargs: _reset_pool(app, db), weak=False)
+
+
+# ----------------------------------------------------------------------
+# Read replica
+#
+# Reads are routed to the ``replica`` bind only inside ``use_replica()``
+# (which ReplicaRouter enters for GET requests), and only while:
+#
+# * the session has not written anything - once it flushes or executes
+#   DML, everything it reads afterwards comes from the primary, so
+#   read-your-write paths like create_appointment() + to_dict() are safe;
+# * the replica is less than DB_REPLICA_MAX_LAG seconds behind.
+# ----------------------------------------------------------------------
+
+REPLICA_BIND = 'replica'
+
+# Routing flag of the current thread (greenlet under gevent)
+_routing = threading.local()
+
+# Last replication lag check in this process: (checked_at, healthy)
+_replica_health = (0.0, False)
+
+_REPLICA_LAG_SQL = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Route reads in the block to the replica (or force the primary with False)."""
+    previous = getattr(_routing, 'replica', False)
+    _routing.replica = enabled
+    try:
+        yield
+    finally:
+        _routing.replica = previous
+
+
+def use_primary():
+    """Force every statement in the block to the primary."""
+    return use_replica(False)
+
+
+def replica_healthy(engine):
+    """Whether the replica is within DB_REPLICA_MAX_LAG (cached per process)."""
+    global _replica_health
+    checked_at, healthy = _replica_health
+    now = time.monotonic()
+    if now - checked_at < S.DB_REPLICA_LAG_CHECK_INTERVAL:
+        return healthy
+
+    if engine.dialect.name != 'postgresql':
+        healthy = True
+    else:
+        try:
+            with engine.connect() as conn:
+                lag = conn.execute(_REPLICA_LAG_SQL).scalar()
+            # NULL: not a replica (or never replayed anything)
+            healthy = lag is not None and float(lag) <= S.DB_REPLICA_MAX_LAG
+        except exc.SQLAlchemyError:
+            healthy = False
+    _replica_health = (now, healthy)
+    return healthy
+
+
+class RoutingSession(SignallingSession):
+    """Session that sends reads to the replica bind when allowed."""
+
+    def __init__(self, db, **options):
+        self._db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+        if (getattr(_routing, 'replica', False)
+                and not self._flushing
+                and not self.info.get('wrote')
+                and REPLICA_BIND in (self.app.config['SQLALCHEMY_BINDS'] or {})):
+            replica = self._db.get_engine(self.app, bind=REPLICA_BIND)
+            if replica_healthy(replica):
+                return replica
+        return super().get_bind(mapper, clause)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    session.info['wrote'] = True
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy with a replica-aware session."""
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+class ReplicaRouter:
+    """Serve GET requests from the read replica.
+
+    After a request that wrote, the Flask session is pinned to the primary
+    for DB_REPLICA_STICKY_SECONDS so that e.g. the admin list shown after
+    an edit redirect includes the edit.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        if REPLICA_BIND not in (app.config['SQLALCHEMY_BINDS'] or {}):
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _before_request():
+        if request.method not in ('GET', 'HEAD'):
+            return
+        if flask_session.get('db_primary_until', 0) > time.time():
+            return
+        _routing.replica = True
+
+    def _after_request(self, response):
+        if self.db.session.info.get('wrote') and S.DB_REPLICA_STICKY_SECONDS:
+            flask_session['db_primary_until'] = time.time() + S.DB_REPLICA_STICKY_SECONDS
+        return response
+
+    @staticmethod
+    def _teardown_request(exc):
+        _routing.replica = False
@@ -1,3 +1,10 @@
+from src.settings import Settings as S
+
+if S.GEVENT:
+    # Before anything can open a database connection
+    from src.green import patch_psycopg
+    patch_psycopg()
+
 from src.app import Application
 
 
@@ -0,0 +1,208 @@
+"""Live appointment events for the staff and admin calendars.
+
+Every committed change to an appointment is appended to two capped Redis
+streams on the broker: one for the salon and one for the staff member.
+Calendars subscribe to them over server-sent events
+(``src/routes/api/events.py``) instead of polling.  The stream entry ID
+is the SSE event ID, so a reconnecting ``EventSource`` resumes from its
+``Last-Event-ID`` without missing changes.
+
+Streams are used rather than PUBLISH/SUBSCRIBE because pub/sub drops
+whatever is published while a client is reconnecting.
+
+Changes made through the ORM are collected on flush and published after
+commit; bulk ``UPDATE`` statements must call ``publish`` themselves.
+Events carry no customer details, only what a calendar needs to update
+or refetch an entry.
+"""
+import logging
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+
+from src.cache import get_blocking_redis, get_redis, key
+from src.database import RoutingSession
+from src.models import Appointment, AppointmentSchema, Staff
+from src.models.appointment import AppointmentStatus
+from src.serializers import dumps, loads
+from src.settings import Settings as S
+
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+CANCELLED = 'cancelled'
+DELETED = 'deleted'
+
+EVENT_FIELDS = ('id', 'staff_id', 'service_id', 'status', 'date', 'start_time', 'end_time')
+
+_EVENT_ID = re.compile(r'^\d+-\d+$')
+_listeners_registered = False
+
+
+def stream_key(scope: str, object_id: int) -> str:
+    """Redis stream of a salon or staff member, e.g. stream_key('salon', 1)."""
+    return key('events', scope, object_id)
+
+
+def appointment_event(appointment: Appointment, action: str, salon_id: Optional[int]) -> Dict[str, Any]:
+    """The event payload for one appointment."""
+    payload = AppointmentSchema.dump(appointment, EVENT_FIELDS)
+    payload['action'] = action
+    payload['salon_id'] = salon_id
+    return payload
+
+
+def publish(events: List[Dict[str, Any]]) -> None:
+    """Append events to their salon and staff streams (errors are logged)."""
+    if not events or not S.EVENTS_ENABLED:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for payload in events:
+            fields = {'data': dumps(payload)}
+            # A reassigned appointment also leaves the previous staff member's calendar
+            streams = [stream_key('staff', payload['staff_id'])]
+            if payload.get('previous_staff_id'):
+                streams.append(stream_key('staff', payload['previous_staff_id']))
+            for salon_id in {payload['salon_id'], payload.get('previous_salon_id')}:
+                if salon_id:
+                    streams.append(stream_key('salon', salon_id))
+            for stream in streams:
+                pipe.xadd(stream, fields, maxlen=S.EVENTS_STREAM_MAXLEN, approximate=True)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f'Could not publish {len(events)} appointment events: {e}')
+
+
+def parse_event_id(value: Optional[str]) -> Optional[str]:
+    """A valid stream entry ID (resume token), or None."""
+    if value and _EVENT_ID.match(value.strip()):
+        return value.strip()
+    return None
+
+
+def _id_tuple(event_id) -> Tuple[int, int]:
+    if isinstance(event_id, bytes):
+        event_id = event_id.decode()
+    milliseconds, sequence = event_id.split('-')
+    return int(milliseconds), int(sequence)
+
+
+def listen(stream: str, last_id: Optional[str], seconds: int) -> Iterator[Tuple[Optional[str], Optional[str], Any]]:
+    """
+    Follow a stream for up to ``seconds``
+
+    Yields (event_id, 'appointment', payload) for each entry after
+    ``last_id`` (or after the current end when None), (None, None, None)
+    whenever EVENTS_HEARTBEAT_SECONDS pass without one, and a single
+    (None, 'reset', None) first when ``last_id`` has already been trimmed
+    from the stream, i.e. the client missed events and must refetch.
+    """
+    client = get_blocking_redis()
+    deadline = time.monotonic() + seconds
+    try:
+        if last_id is None:
+            newest = client.xrevrange(stream, count=1)
+            last_id = newest[0][0].decode() if newest else '0-0'
+        else:
+            oldest = client.xrange(stream, count=1)
+            if (oldest and _id_tuple(oldest[0][0]) > _id_tuple(last_id)
+                    and client.xlen(stream) >= S.EVENTS_STREAM_MAXLEN):
+                # The client refetches everything, so carry on from the current end
+                yield None, 'reset', None
+                last_id = client.xrevrange(stream, count=1)[0][0].decode()
+
+        while time.monotonic() < deadline:
+            block_ms = int(min(S.EVENTS_HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0.001)) * 1000)
+            response = client.xread({stream: last_id}, count=100, block=block_ms)
+            if not response:
+                yield None, None, None
+                continue
+            for entry_id, fields in response[0][1]:
+                last_id = entry_id.decode()
+                yield last_id, 'appointment', loads(fields[b'data'])
+    except RedisError as e:
+        # The client reconnects with its Last-Event-ID
+        logger.warning(f'Event stream {stream} interrupted: {e}')
+
+
+# ----------------------------------------------------------------------
+# ORM hooks
+#
+# Appointment changes are collected into ``session.info`` after each
+# flush (while the pre-flush state and attribute history are still
+# available) and published once the transaction commits.
+# ----------------------------------------------------------------------
+
+def _staff_ids(obj) -> Tuple[int, Optional[int]]:
+    """Staff member of a flushed appointment, and the previous one if it was reassigned"""
+    current = int(obj.staff_id)
+    previous = [int(value) for value in inspect(obj).attrs.staff_id.history.deleted or () if value is not None]
+    return current, previous[0] if previous and previous[0] != current else None
+
+
+def _after_flush(session, flush_context):
+    changes = [(obj, CREATED) for obj in session.new if isinstance(obj, Appointment)]
+    for obj in session.dirty:
+        if isinstance(obj, Appointment) and session.is_modified(obj):
+            status = inspect(obj).attrs.status.history
+            cancelled = AppointmentStatus.CANCELLED in (status.added or ())
+            changes.append((obj, CANCELLED if cancelled else UPDATED))
+    changes += [(obj, DELETED) for obj in session.deleted if isinstance(obj, Appointment)]
+    if not changes:
+        return
+
+    # Assigned attributes keep their type until reloaded, e.g. a form's '2'
+    staff_ids = [_staff_ids(obj) for obj, _ in changes]
+    with session.no_autoflush:
+        salons = dict(session.query(Staff.id, Staff.salon_id).filter(
+            Staff.id.in_({staff_id for ids in staff_ids for staff_id in ids if staff_id is not None})
+        ))
+
+    events = []
+    for (obj, action), (staff_id, previous_staff_id) in zip(changes, staff_ids):
+        payload = appointment_event(obj, action, salons.get(staff_id))
+        payload['staff_id'] = staff_id
+        if previous_staff_id is not None:
+            payload['previous_staff_id'] = previous_staff_id
+            payload['previous_salon_id'] = salons.get(previous_staff_id)
+        events.append(payload)
+    session.info.setdefault('appointment_events', []).extend(events)
+
+
+def _after_commit(session):
+    publish(session.info.pop('appointment_events', None))
+
+
+def _after_rollback(session):
+    session.info.pop('appointment_events', None)
+
+
+def register_listeners():
+    """Attach the session listeners (idempotent)."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    event.listen(RoutingSession, 'after_flush', _after_flush)
+    event.listen(RoutingSession, 'after_commit', _after_commit)
+    event.listen(RoutingSession, 'after_rollback', _after_rollback)
+    _listeners_registered = True
+
+
+class AppointmentEvents:
+    """Publishes appointment changes for the live calendar streams."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['EVENTS_ENABLED']:
+            return
+        register_listeners()
+        app.extensions['appointment_events'] = self
@@ -0,0 +1,11 @@
+def patch_psycopg():
+    """Make psycopg2 cooperative under gevent.
+
+    uWSGI's gevent profile monkey-patches the standard library, but
+    psycopg2 talks to Postgres through libpq, which gevent cannot patch.
+    psycogreen installs a wait callback so a query yields to other
+    greenlets instead of blocking the whole worker.  Must run before the
+    first database connection is opened.
+    """
+    from psycogreen.gevent import patch_psycopg as _patch_psycopg
+    _patch_psycopg()
@@ -0,0 +1,205 @@
+import hmac
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Maximum number of statements kept per request for slow-request logs
+MAX_RECORDED_QUERIES = 200
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus sense (per label set)."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def render(self, name, labels):
+        lines = []
+        for bound, count in zip(self.buckets, self.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+# ----------------------------------------------------------------------
+# SQL tracking
+#
+# Engine-wide cursor events record every statement executed while a
+# request is active into ``g.sql_queries`` as (statement, seconds).
+# ----------------------------------------------------------------------
+
+_sql_events_registered = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    if not has_request_context() or 'sql_queries' not in g:
+        return
+    g.sql_count += 1
+    g.sql_time += elapsed
+    if len(g.sql_queries) < MAX_RECORDED_QUERIES:
+        g.sql_queries.append((statement, elapsed))
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements
+    conn = exception_context.connection
+    start_times = conn.info.get('query_start_time') if conn is not None else None
+    if start_times:
+        start_times.pop()
+
+
+def register_sql_events():
+    """Attach the cursor listeners to every Engine (idempotent)."""
+    global _sql_events_registered
+    if _sql_events_registered:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _sql_events_registered = True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Per-endpoint request instrumentation.
+
+    Records latency, SQL statement count, SQL time and response size for
+    every request, keyed by endpoint and method.  Requests slower than
+    ``SLOW_REQUEST_MS`` are logged together with their SQL statements.
+
+    The metrics are served at ``/metrics`` in the Prometheus text format
+    only when ``METRICS_TOKEN`` is set, to scrapers sending it as a
+    bearer token.
+
+    Metrics are kept in process memory, so under uWSGI with several
+    processes each scrape reflects the worker that served it.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.sql_seconds = defaultdict(float)
+        self.responses = defaultdict(int)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['METRICS_ENABLED']:
+            return
+        register_sql_events()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if app.config['METRICS_TOKEN']:
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        app.extensions['request_metrics'] = self
+
+    @staticmethod
+    def _before_request():
+        g.request_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_queries = []
+
+    def _after_request(self, response):
+        if 'request_start' not in g or request.endpoint == 'metrics':
+            return response
+        elapsed = time.perf_counter() - g.request_start
+        endpoint = request.endpoint or 'unmatched'
+        labels = f'endpoint="{_escape(endpoint)}",method="{request.method}"'
+
+        with self._lock:
+            self.latency[labels].observe(elapsed)
+            self.queries[labels].observe(g.sql_count)
+            self.sql_seconds[labels] += g.sql_time
+            self.responses[f'{labels},status="{response.status_code}"'] += 1
+            if response.content_length is not None:
+                self.sizes[labels].observe(response.content_length)
+
+        slow_ms = current_app.config['SLOW_REQUEST_MS']
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            self._log_slow_request(endpoint, elapsed)
+        return response
+
+    @staticmethod
+    def _log_slow_request(endpoint, elapsed):
+        lines = [
+            f'Slow request {request.method} {request.full_path} ({endpoint}): '
+            f'{elapsed * 1000:.0f}ms, {g.sql_count} queries, {g.sql_time * 1000:.0f}ms in SQL'
+        ]
+        if current_app.config['SLOW_REQUEST_LOG_QUERIES']:
+            for statement, seconds in g.sql_queries:
+                lines.append(f'  [{seconds * 1000:.1f}ms] {" ".join(statement.split())}')
+        current_app.logger.warning('\n'.join(lines))
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines.append('# HELP heresalon_http_requests_total Requests served by endpoint, method and status.')
+            lines.append('# TYPE heresalon_http_requests_total counter')
+            for labels, count in sorted(self.responses.items()):
+                lines.append(f'heresalon_http_requests_total{{{labels}}} {count}')
+
+            lines.append('# HELP heresalon_http_request_duration_seconds Request latency.')
+            lines.append('# TYPE heresalon_http_request_duration_seconds histogram')
+            for labels, histogram in sorted(self.latency.items()):
+                lines.extend(histogram.render('heresalon_http_request_duration_seconds', labels))
+
+            lines.append('# HELP heresalon_http_request_sql_queries SQL statements executed per request.')
+            lines.append('# TYPE heresalon_http_request_sql_queries histogram')
+            for labels, histogram in sorted(self.queries.items()):
+                lines.extend(histogram.render('heresalon_http_request_sql_queries', labels))
+
+            lines.append('# HELP heresalon_http_request_sql_seconds_total Time spent executing SQL.')
+            lines.append('# TYPE heresalon_http_request_sql_seconds_total counter')
+            for labels, seconds in sorted(self.sql_seconds.items()):
+                lines.append(f'heresalon_http_request_sql_seconds_total{{{labels}}} {seconds}')
+
+            lines.append('# HELP heresalon_http_response_size_bytes Response body size.')
+            lines.append('# TYPE heresalon_http_response_size_bytes histogram')
+            for labels, histogram in sorted(self.sizes.items()):
+                lines.extend(histogram.render('heresalon_http_response_size_bytes', labels))
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        auth_header = request.headers.get('Authorization', '')
+        expected = f"Bearer {current_app.config['METRICS_TOKEN']}"
+        if not hmac.compare_digest(auth_header.encode(), expected.encode()):
+            abort(401)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
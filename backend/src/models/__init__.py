@@ -1,17 +1,19 @@
 from .base import db
-from .user import User, UserRole
-from .salon import Salon
-from .staff import Staff, StaffRole, Seniority
-from .service import Service, ServiceType
-from .appointment import Appointment, AppointmentStatus
-from .working_hour import WorkingHour, DayOfWeek
+from .user import User, UserRole, UserSchema
+from .salon import Salon, SalonSchema
+from .staff import Staff, StaffRole, Seniority, StaffSchema
+from .service import Service, ServiceType, ServiceSchema
+from .appointment import Appointment, ArchivedAppointment, AppointmentStatus, AppointmentSchema, GuestAppointmentSchema
+from .working_hour import WorkingHour, DayOfWeek, WorkingHourSchema
+from .time_off import TimeOff, TimeOffReason, TimeOffSchema, PublicTimeOffSchema
 
 __all__ = [
     'db',
-    'User', 'UserRole',
-    'Salon',
-    'Staff', 'StaffRole', 'Seniority',
-    'Service', 'ServiceType',
-    'Appointment', 'AppointmentStatus',
-    'WorkingHour', 'DayOfWeek'
+    'User', 'UserRole', 'UserSchema',
+    'Salon', 'SalonSchema',
+    'Staff', 'StaffRole', 'Seniority', 'StaffSchema',
+    'Service', 'ServiceType', 'ServiceSchema',
+    'Appointment', 'ArchivedAppointment', 'AppointmentStatus', 'AppointmentSchema', 'GuestAppointmentSchema',
+    'WorkingHour', 'DayOfWeek', 'WorkingHourSchema',
+    'TimeOff', 'TimeOffReason', 'TimeOffSchema', 'PublicTimeOffSchema'
 ]
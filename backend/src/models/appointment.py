@@ -4,6 +4,14 @@ from sqlalchemy import CheckConstraint
 from sqlalchemy.orm import validates
 import re
 from src.models.base import BaseModel, db
+from src.serializers import Schema, Field, enum_value, iso, hhmm
+
+
+def normalize_phone(phone_number):
+    """Digits-only form of a phone number, as stored in Appointment.phone_digits"""
+    if phone_number is None:
+        return None
+    return re.sub(r'\D', '', phone_number)
 
 
 class AppointmentStatus(Enum):
@@ -17,10 +25,12 @@ class AppointmentStatus(Enum):
 class Appointment(BaseModel):
     __tablename__ = 'appointments'
 
-    staff_id = db.Column(db.Integer, db.ForeignKey('staffs.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
-    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    staff_id = db.Column(db.Integer, db.ForeignKey('staffs.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False, index=True)
     phone_number = db.Column(db.String(20), nullable=True)
+    # Digits of phone_number, kept in sync by validate_phone_number
+    phone_digits = db.Column(db.String(15), nullable=True)
     status = db.Column(db.Enum(AppointmentStatus), nullable=False, default=AppointmentStatus.PENDING)
     date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
@@ -32,6 +42,12 @@ class Appointment(BaseModel):
             '(user_id IS NOT NULL) OR (phone_number IS NOT NULL)',
             name='check_user_or_phone'
         ),
+        # Admin list order.  The trigram search indexes are Postgres-only
+        # and live in migration 9a41c7e2d5b8.
+        db.Index('ix_appointments_date_start_time', 'date', 'start_time'),
+        # Guest lookup (equality + date) and admin phone prefix search
+        db.Index('ix_appointments_phone_digits_date', 'phone_digits', 'date',
+                 postgresql_ops={'phone_digits': 'text_pattern_ops'}),
     )
 
     # Relationships
@@ -41,10 +57,11 @@ class Appointment(BaseModel):
     def validate_phone_number(self, key, phone_number):
         """Validate phone number format"""
         if phone_number is None:
+            self.phone_digits = None
             return phone_number
         
         # Remove all non-digit characters for validation
-        digits_only = re.sub(r'\D', '', phone_number)
+        digits_only = normalize_phone(phone_number)
         
         # Check if it has 10-15 digits (common phone number lengths)
         if len(digits_only) < 10 or len(digits_only) > 15:
@@ -55,6 +72,7 @@ class Appointment(BaseModel):
         if not re.match(phone_pattern, phone_number):
             raise ValueError('Invalid phone number format')
         
+        self.phone_digits = digits_only
         return phone_number
 
     @validates('date')
@@ -81,14 +99,57 @@ class Appointment(BaseModel):
         return f'<Appointment {self.id} - {self.date}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'staff_id': self.staff_id,
-            'user_id': self.user_id,
-            'service_id': self.service_id,
-            'phone_number': self.phone_number,
-            'status': self.status.value,
-            'date': self.date.isoformat() if self.date else None,
-            'start_time': self.start_time.time().strftime('%H:%M') if self.start_time else None,
-            'end_time': self.end_time.time().strftime('%H:%M') if self.end_time else None
-        } 
+        return AppointmentSchema.dump(self)
+
+
+class ArchivedAppointment(BaseModel):
+    """A completed or cancelled appointment moved out of ``appointments``.
+
+    Rows keep their original ID and columns, so they serialize with
+    ``AppointmentSchema``.  There are no foreign keys or validators: this
+    is write-once history (see ``ArchiveService`` for its readers).
+    """
+    __tablename__ = 'appointments_archive'
+
+    id = db.Column(db.Integer(), primary_key=True, autoincrement=False)
+    staff_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    service_id = db.Column(db.Integer, nullable=False)
+    phone_number = db.Column(db.String(20), nullable=True)
+    phone_digits = db.Column(db.String(15), nullable=True)
+    status = db.Column(db.Enum(AppointmentStatus), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.Index('ix_appointments_archive_staff_id_date', 'staff_id', 'date'),
+        db.Index('ix_appointments_archive_date', 'date'),
+    )
+
+    def __repr__(self):
+        return f'<ArchivedAppointment {self.id} - {self.date}>'
+
+    def to_dict(self):
+        return AppointmentSchema.dump(self)
+
+
+class AppointmentSchema(Schema):
+    model = Appointment
+    fields = (
+        Field('id'),
+        Field('staff_id'),
+        Field('user_id'),
+        Field('service_id'),
+        Field('phone_number'),
+        Field('status', format=enum_value),
+        Field('date', format=iso),
+        Field('start_time', format=hhmm),
+        Field('end_time', format=hhmm),
+    )
+
+
+class GuestAppointmentSchema(AppointmentSchema):
+    """Guest bookings found by phone number, without echoing the number back"""
+    fields = tuple(field for field in AppointmentSchema.fields if field.name != 'phone_number')
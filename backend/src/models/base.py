@@ -1,14 +1,14 @@
 import uuid
 
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm.session import make_transient
 from sqlalchemy_utils import EncryptedType
 from sqlalchemy_utils.types.encrypted.encrypted_type import AesEngine
 
+from src.database import RoutingSQLAlchemy
 from src.settings import Settings as S
 
 
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
 EncryptedString = EncryptedType(db.Unicode, S.AES_SECRET_KEY, AesEngine, 'pkcs5')
 
 
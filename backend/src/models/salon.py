@@ -1,4 +1,9 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property, undefer
 from src.models.base import BaseModel, db
+from src.models.staff import Staff
+from src.models.service import Service
+from src.serializers import Schema, Field, iso
 
 
 class Salon(BaseModel):
@@ -20,16 +25,45 @@ class Salon(BaseModel):
     def __repr__(self):
         return f'<Salon {self.name}>'
 
+    @classmethod
+    def with_counts(cls):
+        """Query salons with staff_count/services_count loaded in the same SELECT."""
+        return cls.query.options(undefer('staff_count'), undefer('services_count'))
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'uuid': self.uuid,
-            'name': self.name,
-            'address': self.address,
-            'description': self.description,
-            'start_working_time': self.start_working_time.isoformat() if self.start_working_time else None,
-            'end_working_time': self.end_working_time.isoformat() if self.end_working_time else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'staff_count': len(self.staffs) if self.staffs else 0,
-            'services_count': len(self.services) if self.services else 0
-        }
+        return SalonSchema.dump(self)
+
+
+# Counts are correlated subqueries rather than len(self.staffs), so listing
+# salons never loads the staff/service rows.  They are deferred to keep
+# plain Salon lookups cheap; use Salon.with_counts() when listing.
+Salon.staff_count = column_property(
+    select([func.count(Staff.id)])
+    .where(Staff.salon_id == Salon.id)
+    .correlate_except(Staff)
+    .as_scalar(),
+    deferred=True
+)
+Salon.services_count = column_property(
+    select([func.count(Service.id)])
+    .where(Service.salon_id == Salon.id)
+    .correlate_except(Service)
+    .as_scalar(),
+    deferred=True
+)
+
+
+class SalonSchema(Schema):
+    model = Salon
+    fields = (
+        Field('id'),
+        Field('uuid'),
+        Field('name'),
+        Field('address'),
+        Field('description'),
+        Field('start_working_time', format=iso),
+        Field('end_working_time', format=iso),
+        Field('created_at', format=iso),
+        Field('staff_count'),
+        Field('services_count'),
+    )
@@ -1,6 +1,7 @@
 from enum import Enum
 from decimal import Decimal
 from src.models.base import BaseModel, db
+from src.serializers import Schema, Field, enum_value, to_float
 
 
 class ServiceType(Enum):
@@ -15,7 +16,7 @@ class ServiceType(Enum):
 class Service(BaseModel):
     __tablename__ = 'services'
 
-    salon_id = db.Column(db.Integer, db.ForeignKey('salons.id'), nullable=True)
+    salon_id = db.Column(db.Integer, db.ForeignKey('salons.id'), nullable=True, index=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     type = db.Column(db.Enum(ServiceType), nullable=False)
@@ -30,13 +31,18 @@ class Service(BaseModel):
         return f'<Service {self.name}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'salon_id': self.salon_id,
-            'name': self.name,
-            'description': self.description,
-            'type': self.type.value,
-            'price': float(self.price) if self.price else None,
-            'duration': self.duration,
-            'image_url': self.image_url
-        }
+        return ServiceSchema.dump(self)
+
+
+class ServiceSchema(Schema):
+    model = Service
+    fields = (
+        Field('id'),
+        Field('salon_id'),
+        Field('name'),
+        Field('description'),
+        Field('type', format=enum_value),
+        Field('price', format=to_float),
+        Field('duration'),
+        Field('image_url'),
+    )
@@ -1,5 +1,6 @@
 from enum import Enum
 from src.models.base import BaseModel, db
+from src.serializers import Schema, Field, enum_value, iso
 
 
 class StaffRole(Enum):
@@ -18,7 +19,7 @@ class Seniority(Enum):
 class Staff(BaseModel):
     __tablename__ = 'staffs'
 
-    salon_id = db.Column(db.Integer, db.ForeignKey('salons.id'), nullable=False)
+    salon_id = db.Column(db.Integer, db.ForeignKey('salons.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Optional user account
     name = db.Column(db.String(100), nullable=False)
     bio = db.Column(db.Text, nullable=True)
@@ -33,23 +34,28 @@ class Staff(BaseModel):
     # Relationships
     user = db.relationship('User', backref='staff_profile', lazy=True)
     appointments = db.relationship('Appointment', backref='staff', lazy=True)
-    # working_hours = db.relationship('WorkingHour', backref='staff', lazy=True)
+    working_hours = db.relationship('WorkingHour', backref='staff', lazy=True)
 
     def __repr__(self):
         return f'<Staff {self.name}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'salon_id': self.salon_id,
-            'user_id': self.user_id,
-            'name': self.name,
-            'bio': self.bio,
-            'role': self.role,
-            'years_experience': self.years_experience,
-            'seniority': self.seniority.value if self.seniority else None,
-            'rating': self.rating,
-            'specialties': self.specialties,
-            'image_url': self.image_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return StaffSchema.dump(self)
+
+
+class StaffSchema(Schema):
+    model = Staff
+    fields = (
+        Field('id'),
+        Field('salon_id'),
+        Field('user_id'),
+        Field('name'),
+        Field('bio'),
+        Field('role'),
+        Field('years_experience'),
+        Field('seniority', format=enum_value),
+        Field('rating'),
+        Field('specialties'),
+        Field('image_url'),
+        Field('created_at', format=iso),
+    )
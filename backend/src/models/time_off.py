@@ -0,0 +1,60 @@
+from enum import Enum
+from sqlalchemy import CheckConstraint
+from src.models.base import BaseModel, db
+from src.serializers import Schema, Field, enum_value, iso
+
+
+class TimeOffReason(Enum):
+    HOLIDAY = "holiday"
+    SICK = "sick"
+    TRAINING = "training"
+    OTHER = "other"
+
+
+class TimeOff(BaseModel):
+    """A period during which a staff member (or a whole salon) takes no bookings.
+
+    Rows with ``staff_id`` are staff time off; rows without one are salon
+    blackouts (public holidays, closures) that apply to all of its staff.
+    ``salon_id`` is always set so a salon's periods load in one query.
+    The period is the half-open interval [start_at, end_at).
+    """
+    __tablename__ = 'time_off'
+
+    staff_id = db.Column(db.Integer, db.ForeignKey('staffs.id'), nullable=True, index=True)
+    salon_id = db.Column(db.Integer, db.ForeignKey('salons.id'), nullable=False, index=True)
+    reason = db.Column(db.Enum(TimeOffReason), nullable=False, default=TimeOffReason.OTHER)
+    note = db.Column(db.String(255), nullable=True)
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    # A GiST index on tsrange(start_at, end_at) backs overlap queries on
+    # Postgres; it is created by migration f4d8a1b6c053.
+    __table_args__ = (
+        CheckConstraint('end_at > start_at', name='check_time_off_period'),
+    )
+
+    def __repr__(self):
+        return f'<TimeOff {self.staff_id or "salon " + str(self.salon_id)} {self.start_at} - {self.end_at}>'
+
+    def to_dict(self):
+        return TimeOffSchema.dump(self)
+
+
+class TimeOffSchema(Schema):
+    model = TimeOff
+    fields = (
+        Field('id'),
+        Field('staff_id'),
+        Field('salon_id'),
+        Field('reason', format=enum_value),
+        Field('note'),
+        Field('start_at', format=iso),
+        Field('end_at', format=iso),
+    )
+
+
+class PublicTimeOffSchema(TimeOffSchema):
+    """Periods shown to customers: when, but not why"""
+    fields = tuple(field for field in TimeOffSchema.fields if field.name in ('staff_id', 'start_at', 'end_at'))
@@ -1,6 +1,7 @@
 from enum import Enum
 from src.models.base import BaseModel, db
 from sqlalchemy import CheckConstraint
+from src.serializers import Schema, Field, enum_value, iso
 
 
 class UserRole(Enum):
@@ -64,11 +65,16 @@ class User(BaseModel):
         return super().save()
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'role': self.role.value,
-            'salon_id': self.salon_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return UserSchema.dump(self)
+
+
+class UserSchema(Schema):
+    model = User
+    fields = (
+        Field('id'),
+        Field('username'),
+        Field('email'),
+        Field('role', format=enum_value),
+        Field('salon_id'),
+        Field('created_at', format=iso),
+    )
@@ -1,5 +1,6 @@
 from enum import Enum
 from src.models.base import BaseModel, db
+from src.serializers import Schema, Field, enum_value, hhmm
 
 
 class DayOfWeek(Enum):
@@ -13,22 +14,31 @@ class DayOfWeek(Enum):
 
 
 class WorkingHour(BaseModel):
+    """One shift of a staff member's weekly schedule.
+
+    A day may have several shifts (split shifts); the gaps between them
+    are breaks.  Staff without any rows work the salon's opening hours.
+    """
     __tablename__ = 'working_hours'
 
-    staff_id = db.Column(db.Integer, db.ForeignKey('staffs.id'), nullable=False)
+    staff_id = db.Column(db.Integer, db.ForeignKey('staffs.id'), nullable=False, index=True)
     day_of_week = db.Column(db.Enum(DayOfWeek), nullable=False)
-    start_time = db.Column(db.DateTime, nullable=False)
-    end_time = db.Column(db.DateTime, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
 
     def __repr__(self):
         return f'<WorkingHour {self.staff_id} - {self.day_of_week.value}>'
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'uuid': self.uuid,
-            'staff_id': self.staff_id,
-            'day_of_week': self.day_of_week.value,
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None
-        } 
\ No newline at end of file
+        return WorkingHourSchema.dump(self)
+
+
+class WorkingHourSchema(Schema):
+    model = WorkingHour
+    fields = (
+        Field('id'),
+        Field('staff_id'),
+        Field('day_of_week', format=enum_value),
+        Field('start_time', format=hhmm),
+        Field('end_time', format=hhmm),
+    )
@@ -0,0 +1,163 @@
+"""N+1 query detection for development and tests.
+
+Every SQL statement executed while a tracker is active is normalized
+(literals and bind values collapsed, whitespace squashed) and counted by
+shape.  When one shape runs more than ``threshold`` times, the tracker
+reports it - as a warning, or by raising ``NPlusOneError``.
+
+Enable the per-request guard with ``QUERY_GUARD_ENABLED`` (on by default
+when ``DEV`` is set); set ``QUERY_GUARD_RAISE`` to fail the request
+instead of logging.  Tests use the ``query_guard`` fixture defined in
+``tests/conftest.py`` on top of ``track_queries`` (see
+``tests/test_query_counts.py``)::
+
+    def test_calendar(client, query_guard):
+        client.get('/api/staffs/1/appointments/')
+        assert query_guard.count <= 3
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.settings import Settings as S
+
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """Reduce a statement to its shape, e.g. ``... WHERE id = ?``."""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class NPlusOneError(Exception):
+    """Raised when a statement shape repeats more often than allowed."""
+
+
+class QueryTracker:
+    """Counts statements by normalized shape for one unit of work."""
+
+    def __init__(self, label, threshold):
+        self.label = label
+        self.threshold = threshold
+        self.shapes = Counter()
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+    def record(self, statement):
+        self.shapes[normalize_sql(statement)] += 1
+
+    def violations(self):
+        """Shapes executed more than ``threshold`` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > self.threshold]
+
+    def report(self):
+        lines = [f'Possible N+1 in {self.label}: {self.count} statements']
+        for shape, n in self.violations():
+            lines.append(f'  {n}x {shape}')
+        return '\n'.join(lines)
+
+    def check(self, raise_on_violation=False):
+        """Warn (or raise NPlusOneError) if any shape exceeded the threshold."""
+        if not self.violations():
+            return
+        if raise_on_violation:
+            raise NPlusOneError(self.report())
+        logger.warning(self.report())
+
+
+# Trackers active in the current thread (greenlet under gevent)
+_local = threading.local()
+_listener_registered = False
+
+
+def _active_trackers():
+    if not hasattr(_local, 'trackers'):
+        _local.trackers = []
+    return _local.trackers
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for tracker in _active_trackers():
+        tracker.record(statement)
+
+
+def _register_listener():
+    global _listener_registered
+    if not _listener_registered:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        _listener_registered = True
+
+
+@contextmanager
+def track_queries(label, threshold=None, raise_on_violation=False):
+    """Track statements run inside the block and check them on exit.
+
+    Usable anywhere: Celery tasks, services, benchmarks or tests.
+    """
+    _register_listener()
+    tracker = QueryTracker(label, threshold if threshold is not None else S.QUERY_GUARD_THRESHOLD)
+    trackers = _active_trackers()
+    trackers.append(tracker)
+    try:
+        yield tracker
+    finally:
+        trackers.remove(tracker)
+    tracker.check(raise_on_violation)
+
+
+class QueryGuard:
+    """Per-request N+1 detection, named after the request endpoint."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['QUERY_GUARD_ENABLED']:
+            return
+        _register_listener()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _before_request():
+        g.query_tracker = QueryTracker(
+            request.endpoint or request.path,
+            current_app.config['QUERY_GUARD_THRESHOLD']
+        )
+        _active_trackers().append(g.query_tracker)
+
+    @staticmethod
+    def _after_request(response):
+        tracker = g.pop('query_tracker', None)
+        if tracker is not None:
+            _active_trackers().remove(tracker)
+            tracker.check(current_app.config['QUERY_GUARD_RAISE'])
+        return response
+
+    @staticmethod
+    def _teardown_request(exc):
+        # Make sure an aborted request does not leave its tracker active
+        tracker = g.pop('query_tracker', None)
+        if tracker is not None and tracker in _active_trackers():
+            _active_trackers().remove(tracker)
@@ -5,6 +5,7 @@ from .salons import blueprint as admin_salons_bp
 from .staff import blueprint as admin_staff_bp
 from .services import blueprint as admin_services_bp
 from .appointments import blueprint as admin_appointments_bp
+from .reports import blueprint as admin_reports_bp
 
 # Rename blueprints to avoid conflicts
 admin_dashboard_bp.name = 'admin_dashboard'
@@ -13,6 +14,7 @@ admin_salons_bp.name = 'admin_salons'
 admin_staff_bp.name = 'admin_staff'
 admin_services_bp.name = 'admin_services'
 admin_appointments_bp.name = 'admin_appointments'
+admin_reports_bp.name = 'admin_reports'
 
 # Array of all admin blueprints
 admin_blueprints = [
@@ -21,7 +23,8 @@ admin_blueprints = [
     admin_salons_bp,
     admin_staff_bp,
     admin_services_bp,
-    admin_appointments_bp
+    admin_appointments_bp,
+    admin_reports_bp
 ]
 
 # Export for easy importing
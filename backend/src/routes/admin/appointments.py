@@ -1,17 +1,121 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+import csv
+import io
+from itertools import chain
+from decimal import Decimal
+
+from flask import Blueprint, Response, render_template, request, jsonify, redirect, url_for, flash, stream_with_context
 from src.models import db, Appointment, User, Staff, Service, Salon
-from src.models.appointment import AppointmentStatus
+from src.models.appointment import AppointmentStatus, normalize_phone
 from src.models.user import UserRole
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_, or_
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 from src.routes.admin_auth import manager_or_admin_required
+from src.serializers import dumps
+from src.services.archive_service import ArchiveService
+from src.services.search_service import AppointmentSearchService
+from src.services.status_service import AppointmentStatusService
 
 blueprint = Blueprint('admin_appointments', __name__, url_prefix='/admin/appointments')
 
+# Filters shared by the list and the exports (query string parameters)
+FILTER_PARAMS = ('status', 'date', 'date_from', 'date_to', 'staff', 'phone', 'search')
+
+# Columns of the CSV/NDJSON export (appointment columns as of Appointment,
+# see _export_columns for the archive)
+EXPORT_COLUMNS = (
+    ('id', Appointment.id),
+    ('date', Appointment.date),
+    ('start_time', Appointment.start_time),
+    ('end_time', Appointment.end_time),
+    ('status', Appointment.status),
+    ('salon_id', Staff.salon_id),
+    ('staff_id', Staff.id),
+    ('staff_name', Staff.name),
+    ('service_id', Service.id),
+    ('service_name', Service.name),
+    ('price', Service.price),
+    ('customer', User.username),
+    ('phone_number', Appointment.phone_number),
+)
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _filtered_query(current_user, filters, model=Appointment):
+    """
+    Appointments visible to the current user, joined with staff, customer
+    and service, filtered and ordered as in the appointment list.
+    
+    ``model`` is Appointment or ArchivedAppointment (which has no foreign
+    keys, hence the explicit join conditions).
+    
+    Returns None for a manager who is not assigned to a salon.
+    """
+    # Build query based on user role
+    query = model.query.join(Staff, model.staff_id == Staff.id)
+    if not current_user.is_admin:
+        # Manager sees only appointments from their salon
+        if not current_user.salon_id:
+            return None
+        
+        query = query.filter(Staff.salon_id == current_user.salon_id)
+    query = query.outerjoin(User, model.user_id == User.id).join(Service, model.service_id == Service.id)
+    
+    # Apply filters
+    # Status values as in the filter dropdown (e.g. 'pending'); unknown ones are ignored
+    if filters['status'] in [status.value for status in AppointmentStatus]:
+        query = query.filter(model.status == AppointmentStatus(filters['status']))
+    
+    if filters['date'] and _parse_date(filters['date']):
+        query = query.filter(model.date == _parse_date(filters['date']))
+    
+    # Date range (inclusive), e.g. a payroll period
+    if filters['date_from'] and _parse_date(filters['date_from']):
+        query = query.filter(model.date >= _parse_date(filters['date_from']))
+    if filters['date_to'] and _parse_date(filters['date_to']):
+        query = query.filter(model.date <= _parse_date(filters['date_to']))
+    
+    if filters['staff']:
+        query = query.filter(Staff.id == filters['staff'])
+    
+    if normalize_phone(filters['phone']):
+        # Prefix match on the indexed digits-only column
+        query = query.filter(model.phone_digits.like(f'{normalize_phone(filters["phone"])}%'))
+    
+    # Ranked search (or date order without a search term)
+    return AppointmentSearchService.search(query, filters['search'], model)
+
+
+def _archived_dates(filters):
+    """Date filters before the archive cutoff (these days are only in the archive)."""
+    cutoff = ArchiveService.cutoff()
+    values = [_parse_date(filters[name]) for name in ('date', 'date_from', 'date_to') if filters[name]]
+    return [value for value in values if value and value < cutoff]
+
+
+def _export_columns(model):
+    """EXPORT_COLUMNS with the appointment columns taken from ``model``."""
+    return [getattr(model, column.key) if column.class_ is Appointment else column
+            for _, column in EXPORT_COLUMNS]
+
+
 @blueprint.route('/')
 @manager_or_admin_required
 def index():
-    """Display all appointments with filtering and pagination."""
+    """Display all appointments with filtering and pagination.
+    
+    Lists the ``appointments`` table only: archived (old completed and
+    cancelled) appointments cannot be opened or edited, so date filters
+    before the archive cutoff are rejected in favour of the export.
+    """
     from flask import session
     from src.models import User
     
@@ -21,53 +125,29 @@ def index():
     page = request.args.get('page', 1, type=int)
     per_page = 20
     
-    # Filter parameters
-    status_filter = request.args.get('status', '')
-    date_filter = request.args.get('date', '')
-    staff_filter = request.args.get('staff', '')
-    search = request.args.get('search', '')
-    
-    # Build query based on user role
-    if current_user.is_admin:
-        # Admin sees all appointments
-        query = Appointment.query.join(Staff).outerjoin(User).join(Service)
-    else:
-        # Manager sees only appointments from their salon
-        if not current_user.salon_id:
-            flash('Manager must be assigned to a salon!', 'error')
-            return redirect(url_for('admin_dashboard.dashboard'))
-        
-        query = Appointment.query.join(Staff).filter(Staff.salon_id == current_user.salon_id).outerjoin(User).join(Service)
-    
-    # Apply filters
-    if status_filter:
-        query = query.filter(Appointment.status == status_filter)
-    
-    if date_filter:
-        try:
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            query = query.filter(Appointment.date == filter_date)
-        except ValueError:
-            pass
-    
-    if staff_filter:
-        query = query.filter(Staff.id == staff_filter)
-    
-    if search:
-        query = query.filter(
-            or_(
-                User.username.ilike(f'%{search}%'),
-                Staff.name.ilike(f'%{search}%'),
-                Service.name.ilike(f'%{search}%'),
-                Appointment.phone_number.ilike(f'%{search}%')
-            )
-        )
-    
-    # Order by date and time
-    query = query.order_by(Appointment.date.desc(), Appointment.start_time.desc())
+    filters = {name: request.args.get(name, '') for name in FILTER_PARAMS}
+    if _archived_dates(filters):
+        flash(f'Appointments before {ArchiveService.cutoff().isoformat()} are archived: '
+              'use the CSV or NDJSON export for those dates.', 'error')
+        return redirect(url_for('admin_appointments.index', **{
+            name: value for name, value in filters.items()
+            if value and name not in ('date', 'date_from', 'date_to')
+        }))
+    query = _filtered_query(current_user, filters)
+    if query is None:
+        flash('Manager must be assigned to a salon!', 'error')
+        return redirect(url_for('admin_dashboard.dashboard'))
+
+    # Load customer, staff and service from the joins already in the query
+    query = query.options(
+        contains_eager(Appointment.staff),
+        contains_eager(Appointment.user),
+        contains_eager(Appointment.service)
+    )
     
     # Paginate
-    appointments = query.all()
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    appointments = pagination.items
     
     # Get filter options based on user role
     if current_user.is_admin:
@@ -79,14 +159,96 @@ def index():
     
     return render_template('admin/appointments/appointments.html',
                          appointments=appointments,
+                         pagination=pagination,
                          staffs=staffs,
                          statuses=statuses,
-                         current_filters={
-                             'status': status_filter,
-                             'date': date_filter,
-                             'staff': staff_filter,
-                             'search': search
-                         })
+                         tomorrow=(date.today() + timedelta(days=1)).isoformat(),
+                         current_filters={name: value for name, value in filters.items() if value})
+
+
+@blueprint.route('/export')
+@manager_or_admin_required
+def export():
+    """Stream the filtered appointments as CSV (default) or NDJSON (?format=ndjson).
+    
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE and written out as they arrive, so memory use does
+    not depend on the number of rows exported.  The stream is still subject
+    to uWSGI's harakiri timeout: large periods are exported in several
+    date_from/date_to ranges.
+    
+    Ranges starting before today also include archived appointments,
+    after the current ones.
+    """
+    from flask import session
+    
+    current_user = User.get(id=session['admin_id'])
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    filters = {name: request.args.get(name, '') for name in FILTER_PARAMS}
+    if _filtered_query(current_user, filters) is None:
+        flash('Manager must be assigned to a salon!', 'error')
+        return redirect(url_for('admin_dashboard.dashboard'))
+    
+    # Plain tuples instead of ORM objects; yield_per streams the result set.
+    # The archive is only queried once the current rows have been written.
+    names = [name for name, _ in EXPORT_COLUMNS]
+    range_start = _parse_date(filters['date']) or _parse_date(filters['date_from'])
+    rows = chain.from_iterable(
+        _filtered_query(current_user, filters, model).with_entities(*_export_columns(model)).yield_per(EXPORT_BATCH_SIZE)
+        for model in ArchiveService.models_for(range_start)
+    )
+    
+    def cell(value):
+        if isinstance(value, datetime):
+            return value.strftime('%H:%M')
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, AppointmentStatus):
+            return value.value
+        if isinstance(value, Decimal):
+            return float(value)
+        return value
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for batch in _batches(rows):
+            for row in batch:
+                writer.writerow([cell(value) for value in row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+    
+    def generate_ndjson():
+        for batch in _batches(rows):
+            yield b''.join(dumps(dict(zip(names, map(cell, row)))) + b'\n' for row in batch)
+    
+    filename = f"appointments-{datetime.now().strftime('%Y%m%d-%H%M')}.{export_format}"
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+def _batches(rows):
+    """Group a row iterator into lists of EXPORT_BATCH_SIZE."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 @blueprint.route('/<int:appointment_id>')
 @manager_or_admin_required
@@ -96,41 +258,51 @@ def view(appointment_id):
     return render_template('admin/appointments/appointment_detail.html', appointment=appointment)
 
 @blueprint.route('/<int:appointment_id>/edit', methods=['GET', 'POST'])
+@manager_or_admin_required
 def edit(appointment_id):
     """Edit appointment."""
     appointment = Appointment.query.get_or_404(appointment_id)
     
     if request.method == 'POST':
         try:
-            # Update appointment data
-            appointment.status = request.form.get('status')
-            appointment.date = datetime.strptime(
-                request.form.get('date'), '%Y-%m-%d'
-            ).date()
-            appointment.start_time = datetime.strptime(
-                request.form.get('start_time'), '%Y-%m-%dT%H:%M'
-            )
-            appointment.end_time = datetime.strptime(
-                request.form.get('end_time'), '%Y-%m-%dT%H:%M'
-            )
-            
-            # Update staff if changed
-            new_staff_id = request.form.get('staff_id')
-            if new_staff_id:
-                appointment.staff_id = new_staff_id
-            
-            # Update service if changed
-            new_service_id = request.form.get('service_id')
-            if new_service_id:
-                appointment.service_id = new_service_id
-            
-            db.session.commit()
-            flash('Appointment updated successfully!', 'success')
-            return redirect(url_for('admin_appointments.view', appointment_id=appointment.id))
-            
-        except Exception as e:
-            db.session.rollback()
-            flash(f'Error updating appointment: {str(e)}', 'error')
+            new_status = AppointmentStatus(request.form.get('status'))
+            error = AppointmentStatusService.check_transition(appointment.status, new_status)
+        except ValueError:
+            error = 'Invalid status'
+        
+        if error:
+            flash(error, 'error')
+        else:
+            try:
+                # Update appointment data
+                appointment.status = new_status
+                appointment.date = datetime.strptime(
+                    request.form.get('date'), '%Y-%m-%d'
+                ).date()
+                appointment.start_time = datetime.strptime(
+                    request.form.get('start_time'), '%Y-%m-%dT%H:%M'
+                )
+                appointment.end_time = datetime.strptime(
+                    request.form.get('end_time'), '%Y-%m-%dT%H:%M'
+                )
+                
+                # Update staff if changed
+                new_staff_id = request.form.get('staff_id')
+                if new_staff_id:
+                    appointment.staff_id = int(new_staff_id)
+                
+                # Update service if changed
+                new_service_id = request.form.get('service_id')
+                if new_service_id:
+                    appointment.service_id = int(new_service_id)
+                
+                db.session.commit()
+                flash('Appointment updated successfully!', 'success')
+                return redirect(url_for('admin_appointments.view', appointment_id=appointment.id))
+                
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Error updating appointment: {str(e)}', 'error')
     
     # Get options for dropdowns
     staffs = Staff.query.all()
@@ -144,6 +316,7 @@ def edit(appointment_id):
                          statuses=statuses)
 
 @blueprint.route('/<int:appointment_id>/delete', methods=['POST'])
+@manager_or_admin_required
 def delete(appointment_id):
     """Delete appointment."""
     appointment = Appointment.query.get_or_404(appointment_id)
@@ -168,9 +341,13 @@ def update_status(appointment_id):
     if new_status not in [status.value for status in AppointmentStatus]:
         return jsonify({'error': 'Invalid status'}), 400
     
+    # Convert string to AppointmentStatus enum
+    status_enum = AppointmentStatus(new_status)
+    error = AppointmentStatusService.check_transition(appointment.status, status_enum)
+    if error:
+        return jsonify({'error': error}), 409
+    
     try:
-        # Convert string to AppointmentStatus enum
-        status_enum = AppointmentStatus(new_status)
         appointment.status = status_enum
         db.session.commit()
         return jsonify({
@@ -182,33 +359,233 @@ def update_status(appointment_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@blueprint.route('/status', methods=['POST'])
+@manager_or_admin_required
+def bulk_update_status():
+    """
+    Change the status of many appointments at once via AJAX.
+    
+    JSON body: ``status`` (new status) and at least one of ``date``,
+    ``date_from``/``date_to``, ``ended`` (true: only appointments that have
+    already ended) or ``ids``; optionally ``from`` (a status or list of
+    statuses), ``staff`` and, for admins, ``salon_id``.  For example
+    ``{"status": "confirmed", "from": "pending", "date": "2024-05-02"}``.
+    """
+    from flask import session
+    
+    current_user = User.get(id=session['admin_id'])
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        status = AppointmentStatus(data.get('status'))
+    except ValueError:
+        return jsonify({'error': 'Invalid status'}), 400
+    
+    from_statuses = None
+    if data.get('from'):
+        values = data['from'] if isinstance(data['from'], list) else [data['from']]
+        from_statuses, error = AppointmentStatusService.parse_statuses(values)
+        if error:
+            return jsonify({'error': error}), 400
+    
+    date_from = date_to = None
+    if data.get('date'):
+        date_from = date_to = _parse_date(str(data['date']))
+        if date_from is None:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    for name in ('date_from', 'date_to'):
+        if data.get(name):
+            value = _parse_date(str(data[name]))
+            if value is None:
+                return jsonify({'error': f'Invalid {name} format. Use YYYY-MM-DD'}), 400
+            if name == 'date_from':
+                date_from = value
+            else:
+                date_to = value
+    
+    ids = data.get('ids')
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        return jsonify({'error': 'ids must be a list of appointment IDs'}), 400
+    
+    # Managers only change their own salon's appointments
+    salon_id = (data.get('salon_id') or None) if current_user.is_admin else current_user.salon_id
+    if not current_user.is_admin and not salon_id:
+        return jsonify({'error': 'Manager is not assigned to a salon'}), 403
+    
+    changed, error = AppointmentStatusService.bulk_transition(
+        status,
+        from_statuses=from_statuses,
+        salon_id=salon_id,
+        staff_id=data.get('staff') or None,
+        date_from=date_from,
+        date_to=date_to,
+        ended_before=datetime.now() if data.get('ended') else None,
+        appointment_ids=ids,
+    )
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return jsonify({
+        'success': True,
+        'updated': len(changed),
+        'appointments': changed,
+        'message': f'{len(changed)} appointments updated'
+    })
+
+def _calendar_scope(current_user):
+    """Salon whose calendar is shown: the manager's own, or ?salon_id= for admins (None = all)."""
+    if current_user.is_admin:
+        return request.args.get('salon_id', type=int)
+    return current_user.salon_id
+
+
+def _scoped_appointments(salon_id, staff_id=None, model=Appointment):
+    query = model.query
+    if salon_id:
+        query = query.join(Staff, model.staff_id == Staff.id).filter(Staff.salon_id == salon_id)
+    if staff_id:
+        query = query.filter(model.staff_id == staff_id)
+    return query
+
+
 @blueprint.route('/calendar')
+@manager_or_admin_required
 def calendar():
-    """Display appointments in calendar view."""
-    # Get date range (default to current month)
-    year = request.args.get('year', datetime.now().year, type=int)
-    month = request.args.get('month', datetime.now().month, type=int)
+    """Display appointments in calendar view (filled in from calendar.json)."""
+    from flask import session
     
-    # Get appointments for the month
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1)
-    else:
-        end_date = date(year, month + 1, 1)
+    current_user = User.get(id=session['admin_id'])
+    if not current_user.is_admin and not current_user.salon_id:
+        flash('Manager must be assigned to a salon!', 'error')
+        return redirect(url_for('admin_dashboard.dashboard'))
     
-    appointments = Appointment.query.filter(
-        and_(
-            Appointment.date >= start_date,
-            Appointment.date < end_date
-        )
-    ).join(Staff).outerjoin(User).join(Service).all()
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
     
     # Get staff for filtering
-    staffs = Staff.query.all()
+    salon_id = _calendar_scope(current_user)
+    staffs = Staff.query.filter_by(salon_id=salon_id).all() if salon_id else Staff.query.all()
     
     return render_template('admin/appointments/appointments_calendar.html',
-                         appointments=appointments,
                          staffs=staffs,
+                         salon_id=salon_id,
                          current_year=year,
                          current_month=month)
 
+
+@blueprint.route('/calendar.json')
+@manager_or_admin_required
+def calendar_month():
+    """Month calendar data: per-day, per-staff counts and compact appointment rows.
+    
+    Covers the visible grid (Monday before the 1st to Sunday after the
+    last day).  Counts are grouped in SQL; appointments are
+    [id, staff_id, date, start, end, status] tuples without joins.  Past
+    months include archived appointments.  Use calendar/day.json for the
+    full details of one day.
+    """
+    from flask import session
+    
+    current_user = User.get(id=session['admin_id'])
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    if not 1 <= month <= 12:
+        return jsonify({'error': 'Invalid month'}), 400
+    if not current_user.is_admin and not current_user.salon_id:
+        return jsonify({'error': 'Manager must be assigned to a salon'}), 403
+    
+    try:
+        first_day = date(year, month, 1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        visible_from = first_day - timedelta(days=first_day.weekday())
+        last_day = next_month - timedelta(days=1)
+        visible_to = last_day + timedelta(days=6 - last_day.weekday())
+    except (ValueError, OverflowError):
+        # Outside the years date supports (the grid may also spill past them)
+        return jsonify({'error': 'Invalid year'}), 400
+    
+    days = {}
+    rows = []
+    for model in ArchiveService.models_for(visible_from):
+        query = _scoped_appointments(_calendar_scope(current_user), request.args.get('staff', type=int), model).filter(
+            model.date >= visible_from,
+            model.date <= visible_to
+        )
+        
+        counts = query.with_entities(
+            model.date, model.staff_id, func.count(model.id)
+        ).group_by(model.date, model.staff_id).all()
+        
+        for day, staff_id, count in counts:
+            entry = days.setdefault(day.isoformat(), {'total': 0, 'by_staff': {}})
+            entry['total'] += count
+            entry['by_staff'][str(staff_id)] = entry['by_staff'].get(str(staff_id), 0) + count
+        
+        rows += query.with_entities(
+            model.id, model.staff_id, model.date,
+            model.start_time, model.end_time, model.status
+        ).all()
+    rows.sort(key=lambda row: (row[2], row[3]))
+    
+    return jsonify({
+        'year': year,
+        'month': month,
+        'from': visible_from.isoformat(),
+        'to': visible_to.isoformat(),
+        'days': days,
+        'columns': ['id', 'staff_id', 'date', 'start_time', 'end_time', 'status'],
+        'appointments': [
+            [id_, staff_id, day.isoformat(), start.strftime('%H:%M'), end.strftime('%H:%M'), status.value]
+            for id_, staff_id, day, start, end, status in rows
+        ],
+    })
+
+
+@blueprint.route('/calendar/day.json')
+@manager_or_admin_required
+def calendar_day():
+    """Full details of the appointments of one day (lazy calendar detail).
+    
+    Archived appointments have no detail page: their ``url`` is null.
+    """
+    from flask import session
+    
+    current_user = User.get(id=session['admin_id'])
+    day = _parse_date(request.args.get('date', ''))
+    if not day:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if not current_user.is_admin and not current_user.salon_id:
+        return jsonify({'error': 'Manager must be assigned to a salon'}), 403
+    
+    salon_id = _calendar_scope(current_user)
+    staff_id = request.args.get('staff', type=int)
+    rows = []
+    for model in ArchiveService.models_for(day):
+        # Archived rows have no relationships: select staff, service and customer alongside
+        query = db.session.query(model, Staff, Service, User).join(
+            Staff, model.staff_id == Staff.id
+        ).outerjoin(User, model.user_id == User.id).join(
+            Service, model.service_id == Service.id
+        ).filter(model.date == day)
+        if salon_id:
+            query = query.filter(Staff.salon_id == salon_id)
+        if staff_id:
+            query = query.filter(model.staff_id == staff_id)
+        rows += query.all()
+    rows.sort(key=lambda row: row[0].start_time)
+    
+    result = []
+    for appointment, staff, service, user in rows:
+        appointment_dict = appointment.to_dict()
+        appointment_dict['staff'] = {'id': staff.id, 'name': staff.name}
+        appointment_dict['service'] = {
+            'id': service.id,
+            'name': service.name,
+            'price': float(service.price) if service.price else None
+        }
+        appointment_dict['customer'] = user.username if user else None
+        appointment_dict['url'] = (url_for('admin_appointments.view', appointment_id=appointment.id)
+                                   if isinstance(appointment, Appointment) else None)
+        result.append(appointment_dict)
+    
+    return jsonify({'date': day.isoformat(), 'appointments': result})
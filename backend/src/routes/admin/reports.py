@@ -0,0 +1,91 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from datetime import date, datetime, timedelta
+from src.models import User
+from src.routes.admin_auth import admin_required, manager_or_admin_required
+from src.services.analytics_service import AnalyticsService
+from src.tasks import Tasks
+
+blueprint = Blueprint('reports', __name__, url_prefix='/admin/reports')
+
+
+def _date_arg(name, default):
+    try:
+        return datetime.strptime(request.args.get(name, ''), '%Y-%m-%d').date()
+    except ValueError:
+        return default
+
+
+@blueprint.route('/')
+@manager_or_admin_required
+def index():
+    """Revenue, utilization and no-show reports (from the analytics snapshot)."""
+    current_user = User.get(id=session['admin_id'])
+    
+    date_to = _date_arg('date_to', date.today())
+    date_from = _date_arg('date_from', date_to - timedelta(days=29))
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+    
+    # Managers only see their own salon
+    if current_user.is_admin:
+        salon_id = request.args.get('salon_id', type=int)
+    else:
+        if not current_user.salon_id:
+            flash('Manager must be assigned to a salon!', 'error')
+            return redirect(url_for('admin_dashboard.dashboard'))
+        salon_id = current_user.salon_id
+    
+    report = AnalyticsService.report(date_from, date_to, salon_id=salon_id)
+    return render_template('admin/reports/reports.html',
+                         report=report,
+                         date_from=date_from,
+                         date_to=date_to,
+                         salon_id=salon_id)
+
+
+@blueprint.route('/utilization')
+@manager_or_admin_required
+def utilization():
+    """Per staff, hour-of-week heatmap of the booked share of working time (?format=json for JSON)."""
+    current_user = User.get(id=session['admin_id'])
+    
+    date_to = _date_arg('date_to', date.today())
+    date_from = _date_arg('date_from', date_to - timedelta(days=27))
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+    if (date_to - date_from).days > 366:
+        flash('Choose a range of at most one year.', 'error')
+        date_from = date_to - timedelta(days=366)
+    
+    if current_user.is_admin:
+        salon_id = request.args.get('salon_id', type=int) or current_user.salon_id
+    else:
+        salon_id = current_user.salon_id
+    if not salon_id:
+        if not current_user.is_admin:
+            flash('Manager must be assigned to a salon!', 'error')
+            return redirect(url_for('admin_dashboard.dashboard'))
+        report = None
+    else:
+        report = AnalyticsService.utilization_heatmap(salon_id, date_from, date_to)
+    
+    if request.args.get('format') == 'json':
+        if report is None:
+            return jsonify({'error': 'Salon not found'}), 404
+        return jsonify(report)
+    
+    return render_template('admin/reports/utilization.html',
+                         report=report,
+                         date_from=date_from,
+                         date_to=date_to,
+                         salon_id=salon_id,
+                         weekdays=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+
+
+@blueprint.route('/refresh', methods=['POST'])
+@admin_required
+def refresh():
+    """Rebuild the analytics snapshot in the background."""
+    Tasks.build_analytics_snapshot.delay()
+    flash('The report data is being rebuilt; reload in a few minutes.', 'success')
+    return redirect(url_for('admin_reports.index'))
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from src.models import Salon
 from src.routes.admin_auth import admin_required, manager_or_admin_required
+from src.services.catalog_service import CatalogService
 from flask import session
 from src.models.user import User, UserRole
 from datetime import time
@@ -11,7 +12,7 @@ blueprint = Blueprint('admin_salons', __name__, url_prefix='/admin')
 @admin_required
 def salons():
     """List all salons."""
-    salons = Salon.query.all()
+    salons = Salon.with_counts().order_by(Salon.id).all()
     
     return render_template('admin/salons/salons.html', salons=salons)
 
@@ -19,7 +20,7 @@ def salons():
 @manager_or_admin_required
 def salon_detail(salon_id):
     """View salon details by ID."""
-    salon = Salon.query.get_or_404(salon_id)
+    salon = Salon.with_counts().filter_by(id=salon_id).first_or_404()
     
     current_user = User.query.filter_by(username=session.get('admin_username')).first()
     if current_user and current_user.is_manager:
@@ -61,6 +62,7 @@ def edit_salon(salon_id):
                 salon.end_working_time = None
             
             salon.save()
+            CatalogService.refresh(salon.id)
             flash('Salon updated successfully!', 'success')
             return redirect(url_for('admin_salons.salon_detail', salon_id=salon.id))
             
@@ -97,6 +99,7 @@ def new_salon():
             )
             
             salon.save()
+            CatalogService.refresh(salon.id)
             flash('Salon created successfully!', 'success')
             return redirect(url_for('admin_salons.salon_detail', salon_id=salon.id))
             
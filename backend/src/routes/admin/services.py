@@ -3,6 +3,7 @@ from decimal import Decimal
 from src.models import Service
 from src.models.service import ServiceType
 from src.routes.admin_auth import manager_or_admin_required
+from src.services.catalog_service import CatalogService
 
 blueprint = Blueprint('admin_services', __name__, url_prefix='/admin')
 
@@ -89,6 +90,7 @@ def new_service():
                 # is_active=request.form.get('is_active') == 'on',
                 salon_id=current_user.salon_id  # Assign to manager's salon
             )
+            CatalogService.refresh(service.salon_id)
             flash('Service created successfully!', 'success')
             return redirect(url_for('admin_services.services'))
         except Exception as e:
@@ -134,6 +136,7 @@ def edit_service(service_id):
             service.description = request.form.get('description', '')
             service.is_active = request.form.get('is_active') == 'on'
             service.save()
+            CatalogService.refresh(service.salon_id)
             flash('Service updated successfully!', 'success')
             return redirect(url_for('admin_services.services'))
         except Exception as e:
@@ -169,6 +172,7 @@ def delete_service(service_id):
     
     try:
         service.delete()
+        CatalogService.refresh(service.salon_id)
         flash('Service deleted successfully!', 'success')
     except Exception as e:
         flash(f'Error deleting service: {str(e)}', 'error')
@@ -3,6 +3,7 @@ from src.models import Staff, Salon, User
 from src.models.staff import StaffRole, Seniority
 from src.models.user import UserRole
 from src.routes.admin_auth import manager_or_admin_required
+from src.services.catalog_service import CatalogService
 
 blueprint = Blueprint('admin_staff', __name__, url_prefix='/admin')
 
@@ -84,6 +85,7 @@ def new_staff():
                 specialties=request.form.get('specialization', ''),
                 bio=request.form.get('bio', '')
             )
+            CatalogService.refresh(staff.salon_id)
             flash('Staff member created successfully!', 'success')
             return redirect(url_for('admin_staff.staff'))
         except Exception as e:
@@ -131,6 +133,7 @@ def edit_staff(staff_id):
                     return redirect(url_for('admin_staff.edit_staff', staff_id=staff_id))
             
             seniority = Seniority(request.form['seniority'])
+            previous_salon_id = staff.salon_id
             staff.name = request.form['name']
             staff.role = int(request.form['role'])
             staff.salon_id = salon_id
@@ -139,6 +142,7 @@ def edit_staff(staff_id):
             staff.specialties = request.form.get('specialization', '')
             staff.bio = request.form.get('bio', '')
             staff.save()
+            CatalogService.refresh(previous_salon_id, staff.salon_id)
             flash('Staff member updated successfully!', 'success')
             return redirect(url_for('admin_staff.staff'))
         except Exception as e:
@@ -174,6 +178,7 @@ def delete_staff(staff_id):
     
     try:
         staff.delete()
+        CatalogService.refresh(staff.salon_id)
         flash('Staff member deleted successfully!', 'success')
     except Exception as e:
         flash(f'Error deleting staff member: {str(e)}', 'error')
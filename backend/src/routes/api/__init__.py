@@ -6,6 +6,8 @@ from .appointments import blueprint as api_appointments_bp
 from .auth import blueprint as api_auth_bp
 from .staff_calendar import blueprint as api_staff_calendar_bp
 from .chat import blueprint as api_chat_bp
+from .time_off import blueprint as api_time_off_bp
+from .events import blueprint as api_events_bp
 
 # Rename blueprints to avoid conflicts
 api_salons_bp.name = 'api_salons'
@@ -14,6 +16,8 @@ api_services_bp.name = 'api_services'
 api_appointments_bp.name = 'api_appointments'
 api_auth_bp.name = 'api_auth'
 api_staff_calendar_bp.name = 'api_staff_calendar'
+api_time_off_bp.name = 'api_time_off'
+api_events_bp.name = 'api_events'
 
 # Array of all API blueprints
 api_blueprints = [
@@ -23,7 +27,9 @@ api_blueprints = [
     api_appointments_bp,
     api_auth_bp,
     api_staff_calendar_bp, 
-    api_chat_bp
+    api_chat_bp,
+    api_time_off_bp,
+    api_events_bp
 ]
 
 # Export for easy importing
@@ -3,9 +3,11 @@ from flask import current_app
 from datetime import datetime, date, time
 import re
 
-from src.models import Appointment
-from src.routes.api.auth import token_required, optional_token_required
+from src.models import Appointment, AppointmentSchema, GuestAppointmentSchema
+from src.routes.api.auth import token_required, optional_token_required, user_salon_id
+from src.routes.api.idempotency import idempotent
 from src.services.appointment_service import AppointmentService
+from src.serializers import json_response, requested_fields
 
 blueprint = Blueprint('appointments', __name__, url_prefix='/api')
 
@@ -14,14 +16,16 @@ blueprint = Blueprint('appointments', __name__, url_prefix='/api')
 def get_appointments(current_user):
     """Get all appointments for current user"""
     try:
-        appointments = AppointmentService.get_appointments(current_user.id)
+        fields = requested_fields()
+        rows = AppointmentService.get_appointment_rows(current_user.id, fields)
         
-        return jsonify([appointment.to_dict() for appointment in appointments])
+        return json_response(AppointmentSchema.dump_rows(rows, fields))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @blueprint.route('/appointments/', methods=['POST'])
+@idempotent('create_appointment')
 @optional_token_required
 def create_appointment(current_user):
     """Create a new appointment for both authenticated and guest users"""
@@ -39,6 +43,35 @@ def create_appointment(current_user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@blueprint.route('/appointments/lookup/', methods=['GET'])
+@token_required
+def lookup_guest_appointments(current_user):
+    """Get upcoming guest appointments booked with a phone number (admins, managers and staff)"""
+    salon_id = None
+    if not current_user.is_admin:
+        salon_id = user_salon_id(current_user)
+        if salon_id is None:
+            return jsonify({'error': 'Access denied'}), 403
+    
+    phone = request.args.get('phone', '')
+    from_date = request.args.get('date')
+    
+    try:
+        if from_date:
+            try:
+                from_date = date.fromisoformat(from_date)
+            except ValueError:
+                return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        
+        appointments, error = AppointmentService.find_guest_appointments(phone, from_date, salon_id)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        return json_response(GuestAppointmentSchema.dump_many(appointments, requested_fields()))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @blueprint.route('/appointments/<int:appointment_id>/', methods=['GET'])
 @token_required
 def get_appointment(current_user, appointment_id):
@@ -2,7 +2,7 @@ import jwt
 import datetime
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.security import check_password_hash, generate_password_hash
-from src.models import User, db
+from src.models import Staff, User, db
 from src.models.user import UserRole
 from functools import wraps
 
@@ -23,8 +23,8 @@ def handle_preflight():
         response = jsonify({'status': 'ok'})
         return add_cors_headers(response)
 
-def token_required(f):
-    """Decorator to require valid JWT token"""
+def _token_required(f, query_param=None):
+    """Require a valid JWT token from the Authorization header (or ``?<query_param>=``)"""
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
@@ -37,6 +37,8 @@ def token_required(f):
             except IndexError:
                 response = jsonify({'error': 'Invalid token format'})
                 return add_cors_headers(response), 401
+        elif query_param:
+            token = request.args.get(query_param)
         
         if not token:
             response = jsonify({'error': 'Token is missing'})
@@ -60,6 +62,23 @@ def token_required(f):
     
     return decorated
 
+def token_required(f):
+    """Decorator to require valid JWT token"""
+    return _token_required(f)
+
+def stream_token_required(f):
+    """token_required for server-sent events: EventSource cannot set headers,
+    so the token may also be passed as ``?access_token=``"""
+    return _token_required(f, query_param='access_token')
+
+def user_salon_id(user):
+    """Salon a manager manages or a staff member works at (None for other users)"""
+    if user.is_manager:
+        return user.salon_id
+    if user.is_staff:
+        return Staff.query.filter_by(user_id=user.id).with_entities(Staff.salon_id).scalar()
+    return None
+
 def optional_token_required(f):
     """Decorator to optionally require JWT token - returns current_user or None"""
     @wraps(f)
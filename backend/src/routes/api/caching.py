@@ -0,0 +1,70 @@
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from src.services.catalog_service import CatalogService
+
+
+def _cache_control():
+    config = current_app.config
+    return (
+        f"public, max-age={config['CATALOG_CACHE_MAX_AGE']}, "
+        f"s-maxage={config['CATALOG_CACHE_S_MAXAGE']}, "
+        f"stale-while-revalidate={config['CATALOG_CACHE_STALE_WHILE_REVALIDATE']}"
+    )
+
+
+def _set_cache_headers(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = _cache_control()
+    return response
+
+
+def _not_modified(etag):
+    # Only the ETag decides: Last-Modified has one-second resolution, so a
+    # version bumped within the same second would pass If-Modified-Since
+    return bool(request.if_none_match) and request.if_none_match.contains(etag)
+
+
+def catalog_cached(resolve_salon_id):
+    """Decorator adding conditional GET support to catalog endpoints
+
+    ``resolve_salon_id`` receives the view kwargs and returns the salon
+    whose catalog the response depends on (or None if it is unknown).
+    The strong ETag combines that salon's catalog version with the
+    request path and query string, so a revalidation with a matching
+    ``If-None-Match`` returns 304 before the view - and the database - is
+    reached.  ``Last-Modified`` is informational only.
+
+    Salons without a version yet (first read, or an unknown ID) are
+    served uncached; the view's snapshot lookup seeds the version of
+    salons that exist.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method != 'GET' or not current_app.config['CATALOG_CACHE_ENABLED']:
+                return f(*args, **kwargs)
+
+            salon_id = resolve_salon_id(kwargs)
+            state = CatalogService.get_version(salon_id) if salon_id else None
+            if state is None:
+                return f(*args, **kwargs)
+
+            version, updated_at = state
+            path_hash = zlib.crc32(request.full_path.encode('utf-8'))
+            etag = f'{salon_id}-{version}-{path_hash:08x}'
+            last_modified = datetime.fromtimestamp(updated_at, tz=timezone.utc)
+
+            if _not_modified(etag):
+                return _set_cache_headers(make_response('', 304), etag, last_modified)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _set_cache_headers(response, etag, last_modified)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,67 @@
+from flask import Blueprint, Response, jsonify, request
+
+from src.events import listen, parse_event_id, stream_key
+from src.models import db, Salon, Staff
+from src.routes.api.auth import stream_token_required, user_salon_id
+from src.serializers import dumps
+from src.settings import Settings as S
+
+blueprint = Blueprint('events', __name__, url_prefix='/api')
+
+# Reconnection delay suggested to EventSource clients (milliseconds)
+RETRY_MS = 3000
+
+
+def _event_stream(stream):
+    """Stream a salon or staff event stream as text/event-stream"""
+    last_id = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    
+    # Release the DB connection: the response stays open for minutes
+    db.session.close()
+    
+    def generate():
+        yield f'retry: {RETRY_MS}\n\n'
+        for event_id, name, payload in listen(stream, last_id, S.EVENTS_CONNECTION_SECONDS):
+            if name is None:
+                yield ': keep-alive\n\n'
+            elif name == 'reset':
+                yield 'event: reset\ndata: {}\n\n'
+            else:
+                yield f"id: {event_id}\nevent: {name}\ndata: {dumps(payload).decode('utf-8')}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+def _can_follow(user, salon_id):
+    """Admins follow every salon, managers and staff members their own"""
+    return user.is_admin or (salon_id is not None and user_salon_id(user) == salon_id)
+
+
+@blueprint.route('/salons/<int:salon_id>/events/', methods=['GET'])
+@stream_token_required
+def salon_events(current_user, salon_id):
+    """Live appointment changes of a salon (server-sent events)"""
+    if not S.EVENTS_ENABLED:
+        return jsonify({'error': 'Live events are disabled'}), 404
+    if not Salon.get(id=salon_id):
+        return jsonify({'error': 'Salon not found'}), 404
+    if not _can_follow(current_user, salon_id):
+        return jsonify({'error': 'Access denied'}), 403
+    return _event_stream(stream_key('salon', salon_id))
+
+
+@blueprint.route('/staffs/<int:staff_id>/events/', methods=['GET'])
+@stream_token_required
+def staff_events(current_user, staff_id):
+    """Live appointment changes of a staff member (server-sent events)"""
+    if not S.EVENTS_ENABLED:
+        return jsonify({'error': 'Live events are disabled'}), 404
+    staff = Staff.get(id=staff_id)
+    if not staff:
+        return jsonify({'error': 'Staff member not found'}), 404
+    if not _can_follow(current_user, staff.salon_id):
+        return jsonify({'error': 'Access denied'}), 403
+    return _event_stream(stream_key('staff', staff_id))
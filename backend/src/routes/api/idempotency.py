@@ -0,0 +1,116 @@
+import hashlib
+import logging
+from functools import wraps
+
+import jwt
+from flask import current_app, jsonify, make_response, request
+from redis.exceptions import RedisError
+
+from src.cache import get_redis, key
+from src.serializers import dumps, loads
+
+
+logger = logging.getLogger(__name__)
+
+# Longest accepted Idempotency-Key header
+MAX_KEY_LENGTH = 255
+
+
+def _scope():
+    """Owner of the key: the token's user, or guests (no database lookup)"""
+    auth_header = request.headers.get('Authorization', '')
+    try:
+        token = auth_header.split(' ')[1]
+        data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        return f"user:{data['user_id']}"
+    except Exception:
+        return 'guest'
+
+
+def _fingerprint():
+    return hashlib.sha256(request.method.encode() + request.path.encode() + request.get_data()).hexdigest()
+
+
+def _release(client, redis_key):
+    try:
+        client.delete(redis_key)
+    except RedisError as e:
+        logger.warning(f'Could not release Idempotency-Key {redis_key}: {e}')
+
+
+def _replay(stored):
+    response = make_response(stored['body'], stored['status'])
+    response.mimetype = stored['mimetype']
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(name):
+    """Decorator making a POST endpoint safe to retry with an ``Idempotency-Key`` header
+
+    The first request with a key claims it in Redis (``SET NX``) for
+    IDEMPOTENCY_LOCK_SECONDS and runs the view; its response is then
+    stored for IDEMPOTENCY_TTL_SECONDS.  Retries with the same key and
+    body get the stored response back (with ``Idempotent-Replayed: true``)
+    before authentication or the database is reached, while the first
+    request is still running they get 409, and with a different body 422.
+    Server errors release the key so the request can be retried.
+
+    Keys are scoped to ``name`` and to the token's user (or to guests).
+    Requests without the header, and all requests while Redis is
+    unavailable, run as usual.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if idempotency_key is None or not current_app.config['IDEMPOTENCY_ENABLED']:
+                return f(*args, **kwargs)
+            if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+                return jsonify({'error': f'Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters'}), 400
+
+            digest = hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()
+            redis_key = key('idempotency', name, _scope(), digest)
+            fingerprint = _fingerprint()
+
+            try:
+                client = get_redis()
+                claimed = client.set(redis_key, dumps({'fingerprint': fingerprint}), nx=True,
+                                     ex=current_app.config['IDEMPOTENCY_LOCK_SECONDS'])
+                stored = None if claimed else client.get(redis_key)
+            except RedisError as e:
+                logger.warning(f'Idempotency store unavailable, running {name} without it: {e}')
+                return f(*args, **kwargs)
+
+            if not claimed:
+                # None if the key was released or expired between SET and GET
+                stored = loads(stored) if stored else None
+                if stored and stored['fingerprint'] != fingerprint:
+                    return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+                if not stored or 'status' not in stored:
+                    response = jsonify({'error': 'A request with this Idempotency-Key is in progress'})
+                    response.headers['Retry-After'] = '1'
+                    return response, 409
+                return _replay(stored)
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _release(client, redis_key)
+                raise
+
+            try:
+                if response.status_code >= 500:
+                    _release(client, redis_key)
+                else:
+                    client.set(redis_key, dumps({
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'mimetype': response.mimetype,
+                        'body': response.get_data(as_text=True),
+                    }), ex=current_app.config['IDEMPOTENCY_TTL_SECONDS'])
+            except RedisError as e:
+                logger.warning(f'Could not store the {name} response for its Idempotency-Key: {e}')
+            return response
+        return decorated
+    return decorator
@@ -1,12 +1,16 @@
 from flask import Blueprint, jsonify, request
-from src.models import Salon
+from src.models import SalonSchema
+from src.routes.api.caching import catalog_cached
+from src.serializers import json_response, requested_fields
+from src.services.catalog_service import CatalogService
 
 blueprint = Blueprint('salons', __name__, url_prefix='/api')
 
 @blueprint.route('/salons/<int:salon_id>/', methods=['GET'])
+@catalog_cached(lambda kwargs: kwargs['salon_id'])
 def get_salon(salon_id):
     """Get salon by ID"""
-    salon = Salon.get(id=salon_id)
-    if not salon:
+    snapshot = CatalogService.get_snapshot(salon_id)
+    if not snapshot:
         return jsonify({'error': 'Salon not found'}), 404
-    return jsonify(salon.to_dict())
+    return json_response(SalonSchema.pick(snapshot['salon'], requested_fields()))
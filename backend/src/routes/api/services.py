@@ -1,26 +1,54 @@
 from flask import Blueprint, jsonify, request
-from src.models import Service, Salon
+from src.models import Service, ServiceSchema
 from src.models.service import ServiceType
+from src.routes.api.caching import catalog_cached
+from src.serializers import json_response, requested_fields
+from src.services.availability_service import AvailabilityService
+from src.services.catalog_service import CatalogService
 
 blueprint = Blueprint('services', __name__, url_prefix='/api')
 
 @blueprint.route('/salons/<int:salon_id>/services/', methods=['GET'])
+@catalog_cached(lambda kwargs: kwargs['salon_id'])
 def get_services(salon_id):
     """Get all services for a specific salon"""
-    salon = Salon.get(id=salon_id)
-    if not salon:
+    snapshot = CatalogService.get_snapshot(salon_id)
+    if not snapshot:
         return jsonify({'error': 'Salon not found'}), 404
     
-    # Get services directly using salon_id
-    services = Service.query.filter_by(salon_id=salon_id).all()
-    
-    return jsonify([service.to_dict() for service in services])
+    fields = requested_fields()
+    return json_response([ServiceSchema.pick(service, fields) for service in snapshot['services']])
 
 
 @blueprint.route('/services/<int:service_id>/', methods=['GET'])
+@catalog_cached(lambda kwargs: CatalogService.service_salon_id(kwargs['service_id']))
 def get_service(service_id):
     """Get service by ID"""
-    service = Service.get(id=service_id)
+    service = CatalogService.find_service(service_id)
     if not service:
         return jsonify({'error': 'Service not found'}), 404
-    return jsonify(service.to_dict())
+    return json_response(ServiceSchema.pick(service, requested_fields()))
+
+
+@blueprint.route('/services/<int:service_id>/next-available/', methods=['GET'])
+def get_next_available(service_id):
+    """Get the earliest openings for a service across the salon's staff"""
+    try:
+        count = int(request.args.get('count', 5))
+        days = int(request.args.get('days', 14))
+        staff_id = request.args.get('staff_id', type=int)
+    except ValueError:
+        return jsonify({'error': 'count and days must be integers'}), 400
+    if not 1 <= count <= 50 or not 1 <= days <= 60:
+        return jsonify({'error': 'count must be 1-50 and days 1-60'}), 400
+    
+    openings, error = AvailabilityService.find_next_available(
+        service_id=service_id,
+        count=count,
+        days=days,
+        staff_id=staff_id,
+        seniority=request.args.get('seniority')
+    )
+    if error:
+        return jsonify({'error': error}), 404
+    return jsonify({'service_id': service_id, 'openings': openings})
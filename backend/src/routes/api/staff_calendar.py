@@ -1,10 +1,13 @@
 from flask import Blueprint, jsonify, request
 from flask import current_app
 from datetime import datetime, date
+from sqlalchemy.orm import joinedload
 
 from src.models import Appointment, Staff, Service, User
 from src.models.appointment import AppointmentStatus
 from src.services.availability_service import AvailabilityService
+from src.services.archive_service import ArchiveService
+from src.services.catalog_service import CatalogService, DEFAULT_SERVICE_DURATION
 
 blueprint = Blueprint('calendar', __name__, url_prefix='/api')
 
@@ -21,41 +24,43 @@ def get_appointments(staff_id):
     month = request.args.get('month')
     year = request.args.get('year')
     
-    # Build query
-    query = Appointment.query.filter_by(staff_id=staff_id)
-    
-    # Apply month filter if provided
-    if month and year:
+    # Apply month filter if provided (as a date range, which the date indexes can serve)
+    first_day = next_month = None
+    if month:
         try:
             month_int = int(month)
-            year_int = int(year)
-            
-            # Filter by month and year
-            from sqlalchemy import and_, extract
-            query = query.filter(
-                and_(
-                    extract('month', Appointment.date) == month_int,
-                    extract('year', Appointment.date) == year_int
-                )
-            )
+            year_int = int(year) if year else datetime.now().year
+            first_day = date(year_int, month_int, 1)
+            next_month = date(year_int + month_int // 12, month_int % 12 + 1, 1)
         except ValueError:
-            return jsonify({'error': 'Invalid month or year format'}), 400
-    elif month:
-        try:
-            month_int = int(month)
-            current_year = datetime.now().year
-            from sqlalchemy import and_, extract
-            query = query.filter(
-                and_(
-                    extract('month', Appointment.date) == month_int,
-                    extract('year', Appointment.date) == current_year
-                )
-            )
-        except ValueError:
-            return jsonify({'error': 'Invalid month format'}), 400
+            return jsonify({'error': 'Invalid month or year format' if year else 'Invalid month format'}), 400
+    
+    # Old completed and cancelled appointments live in the archive table
+    appointments = []
+    services = {}
+    users = {}
+    for model in ArchiveService.models_for(first_day):
+        query = model.query.filter(model.staff_id == staff_id)
+        if first_day:
+            query = query.filter(model.date >= first_day, model.date < next_month)
+        if model is Appointment:
+            query = query.options(joinedload(Appointment.service), joinedload(Appointment.user))
+            for appointment in query.all():
+                services[appointment.service_id] = appointment.service
+                if appointment.user:
+                    users[appointment.user_id] = appointment.user
+                appointments.append(appointment)
+        else:
+            appointments.extend(query.all())
+    appointments.sort(key=lambda appointment: (appointment.date, appointment.start_time))
     
-    # Get appointments
-    appointments = query.order_by(Appointment.date, Appointment.start_time).all()
+    # Archived rows have no relationships: load their services and customers in one query each
+    missing_services = {a.service_id for a in appointments} - set(services)
+    if missing_services:
+        services.update((s.id, s) for s in Service.query.filter(Service.id.in_(missing_services)))
+    missing_users = {a.user_id for a in appointments if a.user_id} - set(users)
+    if missing_users:
+        users.update((u.id, u) for u in User.query.filter(User.id.in_(missing_users)))
     
     # Format response with additional staff and service information
     result = []
@@ -63,7 +68,7 @@ def get_appointments(staff_id):
         appointment_dict = appointment.to_dict()
         
         # Add service information
-        service = Service.get(id=appointment.service_id)
+        service = services.get(appointment.service_id)
         if service:
             appointment_dict['service'] = {
                 'id': service.id,
@@ -72,7 +77,7 @@ def get_appointments(staff_id):
             }
         
         # Add user information
-        user = User.get(id=appointment.user_id)
+        user = users.get(appointment.user_id)
         if user:
             appointment_dict['user'] = {
                 'id': user.id,
@@ -110,8 +115,14 @@ def get_available_time_slots(staff_id):
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
-    # Get optional parameters
-    service_duration = request.args.get('service_duration', 60, type=int)
+    # Slot length: the service's duration, or an explicit service_duration
+    service_id = request.args.get('service_id', type=int)
+    if service_id:
+        service_duration = CatalogService.service_durations(staff.salon_id).get(service_id)
+        if service_duration is None:
+            return jsonify({'error': 'Service not found in this salon'}), 404
+    else:
+        service_duration = request.args.get('service_duration', DEFAULT_SERVICE_DURATION, type=int)
     
     # Get available time slots
     available_time_slots = AvailabilityService.get_available_time_slots(
@@ -123,6 +134,7 @@ def get_available_time_slots(staff_id):
     return jsonify({
         'staff_id': staff_id,
         'date': appointment_date.isoformat(),
+        'service_duration': service_duration,
         'available_slots': available_time_slots,
         'total_slots': len(available_time_slots)
     })
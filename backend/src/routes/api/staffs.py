@@ -1,20 +1,25 @@
 from flask import Blueprint, jsonify, request
-from src.models import Staff, Salon
+from src.models import DayOfWeek, Staff, StaffSchema, WorkingHour, WorkingHourSchema
 from src.models.staff import Seniority
+from src.routes.api.auth import token_required
+from src.routes.api.caching import catalog_cached
+from src.serializers import json_response, requested_fields
+from src.services.catalog_service import CatalogService
+from src.services.schedule_service import ScheduleService
 
 blueprint = Blueprint('staff', __name__, url_prefix='/api')
 
 @blueprint.route('/salons/<int:salon_id>/staffs/', methods=['GET'])
+@catalog_cached(lambda kwargs: kwargs['salon_id'])
 def get_salon_staff(salon_id):
     """Get all staff for a specific salon"""
-    # Verify salon exists
-    salon = Salon.get(id=salon_id)
-    if not salon:
+    # Served from the salon's catalog snapshot (also verifies the salon exists)
+    snapshot = CatalogService.get_snapshot(salon_id)
+    if not snapshot:
         return jsonify({'error': 'Salon not found'}), 404
     
-    # Get staff for the salon
-    staff = Staff.query.filter_by(salon_id=salon_id).all()
-    return jsonify([member.to_dict() for member in staff])
+    fields = requested_fields()
+    return json_response([StaffSchema.pick(member, fields) for member in snapshot['staffs']])
 
 @blueprint.route('/staffs/<int:staff_id>/', methods=['GET'])
 def get_staff_member(staff_id):
@@ -22,7 +27,7 @@ def get_staff_member(staff_id):
     staff = Staff.get(id=staff_id)
     if not staff:
         return jsonify({'error': 'Staff member not found'}), 404
-    return jsonify(staff.to_dict())
+    return json_response(StaffSchema.dump(staff, requested_fields()))
 
 @blueprint.route('/staffs/<int:staff_id>/', methods=['PUT'])
 def update_staff(staff_id):
@@ -52,6 +57,47 @@ def update_staff(staff_id):
             staff.image_url = data['image_url']
         
         staff.save()
+        CatalogService.refresh(staff.salon_id)
         return jsonify(staff.to_dict())
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@blueprint.route('/staffs/<int:staff_id>/working-hours/', methods=['GET'])
+def get_working_hours(staff_id):
+    """Get the weekly schedule of a staff member"""
+    staff = Staff.get(id=staff_id)
+    if not staff:
+        return jsonify({'error': 'Staff member not found'}), 404
+    
+    days = list(DayOfWeek)
+    working_hours = sorted(WorkingHour.query.filter_by(staff_id=staff_id).all(),
+                           key=lambda shift: (days.index(shift.day_of_week), shift.start_time))
+    return json_response({
+        'staff_id': staff_id,
+        # Empty: the staff member works the salon's opening hours
+        'working_hours': WorkingHourSchema.dump_many(working_hours),
+    })
+
+@blueprint.route('/staffs/<int:staff_id>/working-hours/', methods=['PUT'])
+@token_required
+def replace_working_hours(current_user, staff_id):
+    """Replace the whole weekly schedule of a staff member (admins and the salon's managers)"""
+    staff = Staff.get(id=staff_id)
+    if not staff:
+        return jsonify({'error': 'Staff member not found'}), 404
+    
+    if not (current_user.is_admin or (current_user.is_manager and current_user.salon_id == staff.salon_id)):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json() or {}
+    if not isinstance(data.get('working_hours'), list):
+        return jsonify({'error': 'working_hours must be a list'}), 400
+    
+    working_hours, error = ScheduleService.replace_weekly_schedule(staff, data['working_hours'])
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return json_response({
+        'staff_id': staff_id,
+        'working_hours': WorkingHourSchema.dump_many(working_hours),
+    })
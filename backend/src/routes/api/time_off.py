@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+from flask import Blueprint, jsonify, request
+from src.models import PublicTimeOffSchema, Salon, Staff, TimeOff, TimeOffSchema
+from src.routes.api.auth import optional_token_required, token_required
+from src.serializers import json_response
+from src.services.time_off_service import TimeOffService
+
+blueprint = Blueprint('time_off', __name__, url_prefix='/api')
+
+
+def _can_manage(user, salon_id):
+    """Admins manage every salon, managers their own"""
+    return user.is_admin or (user.is_manager and user.salon_id == salon_id)
+
+@blueprint.route('/salons/<int:salon_id>/time-off/', methods=['GET'])
+@optional_token_required
+def list_time_off(current_user, salon_id):
+    """List staff time off and salon blackouts overlapping a date range
+
+    Reasons and notes are only shown to those who manage the salon.
+    """
+    if not Salon.get(id=salon_id):
+        return jsonify({'error': 'Salon not found'}), 404
+    
+    try:
+        start = date.fromisoformat(request.args.get('from') or date.today().isoformat())
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else start + timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    periods = TimeOffService.list_time_off(
+        salon_id,
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end, datetime.min.time()) + timedelta(days=1),
+        staff_id=request.args.get('staff_id', type=int)
+    )
+    schema = TimeOffSchema if current_user and _can_manage(current_user, salon_id) else PublicTimeOffSchema
+    return json_response(schema.dump_many(periods))
+
+@blueprint.route('/salons/<int:salon_id>/time-off/', methods=['POST'])
+@token_required
+def create_time_off(current_user, salon_id):
+    """Block a period for a staff member (staff_id) or the whole salon"""
+    if not Salon.get(id=salon_id):
+        return jsonify({'error': 'Salon not found'}), 404
+    if not _can_manage(current_user, salon_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json() or {}
+    staff = None
+    if data.get('staff_id'):
+        staff = Staff.get(id=data['staff_id'])
+        if not staff or staff.salon_id != salon_id:
+            return jsonify({'error': 'Staff member not found in this salon'}), 404
+    
+    time_off, error = TimeOffService.create_time_off(data, salon_id, staff)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return jsonify(time_off.to_dict()), 201
+
+@blueprint.route('/time-off/<int:time_off_id>/', methods=['DELETE'])
+@token_required
+def delete_time_off(current_user, time_off_id):
+    """Delete a time off period"""
+    time_off = TimeOff.get(id=time_off_id)
+    if not time_off:
+        return jsonify({'error': 'Time off not found'}), 404
+    if not _can_manage(current_user, time_off.salon_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    success, error = TimeOffService.delete_time_off(time_off)
+    if not success:
+        return jsonify({'error': error}), 400
+    
+    return jsonify({'message': 'Time off deleted successfully'})
@@ -0,0 +1,175 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+
+from flask import current_app, request
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # falls back to the stdlib encoder
+
+
+# ----------------------------------------------------------------------
+# Value formatters
+#
+# Each formatter receives a raw column value (from an ORM instance or a
+# projected row tuple) and returns a JSON-ready value.  They mirror the
+# conversions the hand-written ``to_dict()`` methods used to do.
+# ----------------------------------------------------------------------
+
+def iso(value):
+    """Format date/time/datetime values as ISO 8601 strings."""
+    return value.isoformat() if value else None
+
+
+def enum_value(value):
+    """Return the ``.value`` of an Enum member."""
+    return value.value if value is not None else None
+
+
+def to_float(value):
+    """Format Numeric columns (e.g. prices) as floats."""
+    return float(value) if value else None
+
+
+def hhmm(value):
+    """Format a datetime as a HH:MM time string."""
+    return value.strftime('%H:%M') if value else None
+
+
+def _default(value):
+    """Fallback encoder for types the JSON encoder does not know about."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(data) -> bytes:
+    """Encode data as JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON produced by ``dumps``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(data, status=200):
+    """Build a JSON response without going through ``jsonify``."""
+    return current_app.response_class(dumps(data), status=status, mimetype='application/json')
+
+
+def requested_fields():
+    """Parse the ``fields=`` query param (comma separated) into a tuple.
+
+    Returns None when the param is absent, meaning "all fields".
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    return tuple(name.strip() for name in raw.split(',') if name.strip())
+
+
+class Field:
+    """A single serialized field.
+
+    ``source`` is the model attribute to read (defaults to ``name``) and
+    ``format`` an optional formatter applied to the raw value.
+    """
+
+    __slots__ = ('name', 'source', 'format')
+
+    def __init__(self, name, source=None, format=None):
+        self.name = name
+        self.source = source or name
+        self.format = format
+
+    def column(self, model):
+        return getattr(model, self.source)
+
+
+class Schema:
+    """Declarative serializer for a model.
+
+    A schema can dump ORM instances (``dump``/``dump_many``) or, for list
+    endpoints, build a column projection with ``query()`` and dump the
+    resulting row tuples with ``dump_rows()`` so that no ORM objects are
+    hydrated at all.
+
+    Usage:
+        class ServiceSchema(Schema):
+            model = Service
+            fields = (Field('id'), Field('price', format=to_float))
+
+        rows = ServiceSchema.query(only).filter(Service.salon_id == 1).all()
+        return json_response(ServiceSchema.dump_rows(rows, only))
+    """
+
+    model = None
+    fields = ()
+
+    @classmethod
+    def select(cls, only=None):
+        """Return the fields to serialize, restricted to ``only`` if given.
+
+        Unknown names in ``only`` are ignored.  If nothing matches, all
+        fields are returned so a typo does not produce empty objects.
+        """
+        if not only:
+            return cls.fields
+        selected = tuple(field for field in cls.fields if field.name in only)
+        return selected or cls.fields
+
+    @classmethod
+    def pick(cls, data, only=None):
+        """Restrict an already serialized dict to the selected fields."""
+        if not only:
+            return data
+        return {field.name: data[field.name] for field in cls.select(only) if field.name in data}
+
+    @classmethod
+    def columns(cls, only=None, model=None):
+        return [field.column(model or cls.model) for field in cls.select(only)]
+
+    @classmethod
+    def query(cls, only=None, model=None):
+        """Query selecting only the schema columns (no ORM hydration).
+
+        ``model`` replaces the schema's model with another one that has the
+        same columns (e.g. ``ArchivedAppointment`` for ``AppointmentSchema``).
+        """
+        model = model or cls.model
+        return model.query.with_entities(*cls.columns(only, model))
+
+    @classmethod
+    def dump(cls, obj, only=None):
+        result = {}
+        for field in cls.select(only):
+            value = getattr(obj, field.source)
+            result[field.name] = field.format(value) if field.format else value
+        return result
+
+    @classmethod
+    def dump_many(cls, objs, only=None):
+        return [cls.dump(obj, only) for obj in objs]
+
+    @classmethod
+    def dump_rows(cls, rows, only=None):
+        """Serialize row tuples returned by ``query(only)``."""
+        fields = cls.select(only)
+        names = [field.name for field in fields]
+        formats = [field.format for field in fields]
+        return [
+            {name: fmt(value) if fmt else value for name, fmt, value in zip(names, formats, row)}
+            for row in rows
+        ]
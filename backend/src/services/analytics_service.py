@@ -0,0 +1,392 @@
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.database import use_replica
+from src.models import db, Appointment, ArchivedAppointment, Salon, Service, Staff
+from src.models.appointment import AppointmentStatus
+from src.services.archive_service import ArchiveService
+from src.services.catalog_service import CatalogService
+from src.services.schedule_service import ScheduleService
+from src.settings import Settings as S
+
+
+SNAPSHOT_FILE = 'appointments.npz'
+MINUTES_PER_DAY = 24 * 60
+# Rows fetched per round trip while extracting
+EXTRACT_BATCH_SIZE = 10000
+EPOCH = date(1970, 1, 1)
+
+# Status codes stored in the snapshot: index into this tuple
+STATUSES = tuple(AppointmentStatus)
+STATUS_CODE = {status: code for code, status in enumerate(STATUSES)}
+
+# Last snapshot loaded by this process, keyed by file modification time
+_loaded: Dict[str, Any] = {'mtime': None, 'data': None}
+_lock = threading.Lock()
+
+
+def _day_number(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def _group(keys: np.ndarray, weights: Optional[np.ndarray] = None):
+    """Group by key: (unique keys, row counts, weight sums)."""
+    ids, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(ids))
+    sums = np.bincount(inverse, weights=weights, minlength=len(ids)) if weights is not None else None
+    return ids, counts, sums
+
+
+def _covered_minutes(keys: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Per key: (unique keys, minutes covered by the union of its [start, end) intervals)."""
+    if not len(keys):
+        return np.empty(0, dtype=keys.dtype), np.empty(0, dtype=np.float64)
+    order = np.lexsort((starts, keys))
+    keys, starts, ends = keys[order], starts[order], ends[order]
+    ids, inverse = np.unique(keys, return_inverse=True)
+    # Shift each key's intervals past the previous key's, so one running max serves every key
+    offset = inverse.astype(np.int64) * (int(ends.max()) + 1)
+    starts, ends = starts + offset, ends + offset
+    reach = np.concatenate(([starts[0]], np.maximum.accumulate(ends)[:-1]))
+    covered = np.clip(ends - np.maximum(starts, reach), 0, None)
+    return ids, np.bincount(inverse, weights=covered.astype(np.float64), minlength=len(ids))
+
+
+def _lookup(ids: np.ndarray, table_ids: np.ndarray, values: np.ndarray, default=0):
+    """Vectorized dict lookup: values[table_ids == id] for each id (table_ids sorted)."""
+    if not len(table_ids):
+        return np.full(len(ids), default)
+    positions = np.clip(np.searchsorted(table_ids, ids), 0, len(table_ids) - 1)
+    return np.where(table_ids[positions] == ids, values[positions], default)
+
+
+class AnalyticsService:
+    """Admin reports computed from a columnar snapshot of the appointments.
+
+    A Celery task (``Tasks.build_analytics_snapshot``, nightly at
+    ANALYTICS_SNAPSHOT_HOUR) extracts every appointment joined with its
+    staff member's salon and the service price into one NumPy array per
+    column, and writes them to ``ANALYTICS_DIR/appointments.npz``.  The
+    extraction reads from the replica when one is configured.
+
+    Reports load that file once per process (reloading when it changes) and
+    are computed with vectorized NumPy operations, so the OLTP database
+    runs no analytical scans.  Figures are as of the last snapshot.
+    """
+
+    @staticmethod
+    def snapshot_path() -> str:
+        return os.path.join(S.ANALYTICS_DIR, SNAPSHOT_FILE)
+
+    @staticmethod
+    def build_snapshot() -> Dict[str, int]:
+        """
+        Extract the current and archived appointments into a new snapshot file
+
+        Returns:
+            Row counts of the snapshot
+        """
+        columns: Dict[str, List[np.ndarray]] = {
+            'id': [], 'salon_id': [], 'staff_id': [], 'service_id': [], 'status': [],
+            'day': [], 'start_minute': [], 'duration': [], 'price': [],
+        }
+
+        with use_replica():
+            # Current and archived appointments
+            for model in (Appointment, ArchivedAppointment):
+                query = db.session.query(
+                    model.id, Staff.salon_id, model.staff_id, model.service_id,
+                    model.status, model.date, model.start_time, model.end_time,
+                    Service.price
+                ).join(Staff, model.staff_id == Staff.id).join(
+                    Service, model.service_id == Service.id
+                ).order_by(model.id).yield_per(EXTRACT_BATCH_SIZE)
+
+                batch = []
+                for row in query:
+                    batch.append(row)
+                    if len(batch) == EXTRACT_BATCH_SIZE:
+                        AnalyticsService._append_batch(columns, batch)
+                        batch = []
+                if batch:
+                    AnalyticsService._append_batch(columns, batch)
+
+            salons = db.session.query(Salon.id, Salon.name, Salon.start_working_time, Salon.end_working_time).order_by(Salon.id).all()
+            staffs = db.session.query(Staff.id, Staff.salon_id, Staff.name).order_by(Staff.id).all()
+            services = db.session.query(Service.id, Service.salon_id, Service.name).order_by(Service.id).all()
+
+        dtypes = {
+            'id': np.int64, 'salon_id': np.int32, 'staff_id': np.int32, 'service_id': np.int32,
+            'status': np.int8, 'day': np.int32, 'start_minute': np.int16, 'duration': np.int32,
+            'price': np.float64,
+        }
+        arrays = {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+            for name, parts in columns.items()
+        }
+        arrays.update({
+            'salon_ids': np.array([s.id for s in salons], dtype=np.int32),
+            'salon_names': np.array([s.name for s in salons], dtype=str),
+            'salon_open_minutes': np.array([
+                (s.end_working_time.hour * 60 + s.end_working_time.minute)
+                - (s.start_working_time.hour * 60 + s.start_working_time.minute)
+                if s.start_working_time and s.end_working_time else 0
+                for s in salons
+            ], dtype=np.int32),
+            'staff_ids': np.array([s.id for s in staffs], dtype=np.int32),
+            'staff_salon_ids': np.array([s.salon_id or 0 for s in staffs], dtype=np.int32),
+            'staff_names': np.array([s.name for s in staffs], dtype=str),
+            'service_ids': np.array([s.id for s in services], dtype=np.int32),
+            'service_names': np.array([s.name for s in services], dtype=str),
+            'generated_at': np.array(datetime.now().isoformat(timespec='seconds')),
+        })
+
+        # Write to a temporary file and rename, so readers never see a partial file
+        os.makedirs(S.ANALYTICS_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=S.ANALYTICS_DIR, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, AnalyticsService.snapshot_path())
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        return {'appointments': len(arrays['id']), 'salons': len(salons), 'staff': len(staffs), 'services': len(services)}
+
+    @staticmethod
+    def _append_batch(columns: Dict[str, List[np.ndarray]], batch: list) -> None:
+        ids, salon_ids, staff_ids, service_ids, statuses, days, starts, ends, prices = zip(*batch)
+        columns['id'].append(np.array(ids, dtype=np.int64))
+        columns['salon_id'].append(np.array([s or 0 for s in salon_ids], dtype=np.int32))
+        columns['staff_id'].append(np.array(staff_ids, dtype=np.int32))
+        columns['service_id'].append(np.array(service_ids, dtype=np.int32))
+        columns['status'].append(np.array([STATUS_CODE[s] for s in statuses], dtype=np.int8))
+        columns['day'].append(np.array([_day_number(d) for d in days], dtype=np.int32))
+        columns['start_minute'].append(np.array([s.hour * 60 + s.minute for s in starts], dtype=np.int16))
+        columns['duration'].append(np.array(
+            [(end - start).total_seconds() // 60 for start, end in zip(starts, ends)], dtype=np.int32
+        ))
+        columns['price'].append(np.array([float(p or 0) for p in prices], dtype=np.float64))
+
+    @staticmethod
+    def load_snapshot() -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the latest snapshot (cached per process until the file changes)
+
+        Returns:
+            Column arrays by name, or None when no snapshot was built yet
+        """
+        path = AnalyticsService.snapshot_path()
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        with _lock:
+            if _loaded['mtime'] != mtime:
+                with np.load(path) as f:
+                    _loaded['data'] = {name: f[name] for name in f.files}
+                _loaded['mtime'] = mtime
+            return _loaded['data']
+
+    @staticmethod
+    def report(date_from: date, date_to: date, salon_id: Optional[int] = None,
+               today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """
+        Revenue, utilization and no-show rate over a date range
+
+        Revenue counts completed appointments at the current service price.
+        Utilization is booked (non-cancelled) minutes over the salon's
+        opening hours for every day of the range, with overlapping bookings
+        of a staff member counted once.  Past appointments that
+        were never started (still pending or confirmed) count as no-shows.
+
+        Args:
+            date_from: First day (inclusive)
+            date_to: Last day (inclusive)
+            salon_id: Restrict to one salon
+            today: Reference day for no-shows (defaults to today)
+
+        Returns:
+            Report dict, or None when no snapshot was built yet
+        """
+        data = AnalyticsService.load_snapshot()
+        if data is None:
+            return None
+
+        day = data['day']
+        mask = (day >= _day_number(date_from)) & (day <= _day_number(date_to))
+        if salon_id:
+            mask &= data['salon_id'] == salon_id
+
+        status = data['status'][mask]
+        price = data['price'][mask]
+        completed = status == STATUS_CODE[AppointmentStatus.COMPLETED]
+        cancelled = status == STATUS_CODE[AppointmentStatus.CANCELLED]
+
+        def revenue_by(column, names_ids, names):
+            keys = data[column][mask][completed]
+            ids, counts, sums = _group(keys, price[completed])
+            labels = _lookup(ids, data[names_ids], data[names], default='')
+            order = np.argsort(-sums, kind='stable')
+            return [
+                {'id': int(ids[i]), 'name': str(labels[i]), 'appointments': int(counts[i]), 'revenue': round(float(sums[i]), 2)}
+                for i in order
+            ]
+
+        # Utilization of every staff member in scope (booked or not)
+        booked = ~cancelled
+        booked_starts = data['day'][mask][booked].astype(np.int64) * MINUTES_PER_DAY + data['start_minute'][mask][booked]
+        booked_ids, booked_minutes = _covered_minutes(
+            data['staff_id'][mask][booked], booked_starts, booked_starts + data['duration'][mask][booked]
+        )
+        staff_ids, staff_salons = data['staff_ids'], data['staff_salon_ids']
+        if salon_id:
+            staff_ids, staff_salons = staff_ids[staff_salons == salon_id], staff_salons[staff_salons == salon_id]
+        minutes = _lookup(staff_ids, booked_ids, booked_minutes, default=0.0)
+        open_minutes = _lookup(staff_salons, data['salon_ids'], data['salon_open_minutes'])
+        days = (date_to - date_from).days + 1
+        available = open_minutes.astype(np.float64) * days
+        utilization = np.divide(minutes, available, out=np.zeros_like(minutes), where=available > 0)
+        staff_names = _lookup(staff_ids, data['staff_ids'], data['staff_names'], default='')
+
+        # No-show rate per salon, over appointments already past
+        past = (day[mask] < _day_number(today or date.today())) & ~cancelled
+        not_started = np.isin(status, [STATUS_CODE[AppointmentStatus.PENDING], STATUS_CODE[AppointmentStatus.CONFIRMED]])
+        salon_keys = data['salon_id'][mask][past]
+        salon_ids, totals, no_shows = _group(salon_keys, not_started[past].astype(np.float64))
+        salon_names = _lookup(salon_ids, data['salon_ids'], data['salon_names'], default='')
+
+        return {
+            'generated_at': str(data['generated_at']),
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'appointments': int(mask.sum()),
+            'revenue_total': round(float(price[completed].sum()), 2),
+            'revenue_by_salon': revenue_by('salon_id', 'salon_ids', 'salon_names'),
+            'revenue_by_staff': revenue_by('staff_id', 'staff_ids', 'staff_names'),
+            'revenue_by_service': revenue_by('service_id', 'service_ids', 'service_names'),
+            'utilization': [
+                {'staff_id': int(staff_ids[i]), 'name': str(staff_names[i]),
+                 'booked_minutes': int(minutes[i]), 'utilization': round(float(utilization[i]), 4)}
+                for i in np.argsort(-utilization, kind='stable')
+            ],
+            'no_show': [
+                {'salon_id': int(salon_ids[i]), 'name': str(salon_names[i]), 'appointments': int(totals[i]),
+                 'no_shows': int(no_shows[i]), 'rate': round(float(no_shows[i] / totals[i]), 4)}
+                for i in range(len(salon_ids))
+            ],
+        }
+
+    @staticmethod
+    def utilization_heatmap(salon_id: int, date_from: date, date_to: date) -> Optional[Dict[str, Any]]:
+        """
+        Booked share of working time per staff member and hour of the week
+
+        Appointments of the range (including archived ones for past ranges)
+        are loaded and turned into minute offsets from the start of the
+        range.  Each staff member's occupancy is a +1/-1 difference array
+        over every minute of the range, integrated with a cumulative sum,
+        and masked with the working minutes of their weekly template (or
+        the salon's opening hours).  Minutes are then summed per hour and
+        per weekday.
+
+        Args:
+            salon_id: Salon ID
+            date_from: First day (inclusive)
+            date_to: Last day (inclusive)
+
+        Returns:
+            Report dict with a 7 x 24 grid (0 = Monday) of booked fractions
+            (None where no one works) per staff member and for the salon,
+            or None if the salon does not exist
+        """
+        snapshot = CatalogService.get_snapshot(salon_id)
+        if not snapshot:
+            return None
+
+        days = (date_to - date_from).days + 1
+        range_start = np.datetime64(date_from, 'm')
+        range_minutes = days * MINUTES_PER_DAY
+
+        rows = []
+        with use_replica():
+            for model in ArchiveService.models_for(date_from):
+                rows += db.session.query(
+                    model.staff_id, model.start_time, model.end_time
+                ).join(Staff, model.staff_id == Staff.id).filter(
+                    Staff.salon_id == salon_id,
+                    model.date >= date_from,
+                    model.date <= date_to,
+                    model.status != AppointmentStatus.CANCELLED
+                ).all()
+
+        if rows:
+            staff_column, starts, ends = zip(*rows)
+            staff_column = np.array(staff_column, dtype=np.int64)
+            starts = np.clip((np.array(starts, dtype='datetime64[m]') - range_start).astype(np.int64), 0, range_minutes)
+            ends = np.clip((np.array(ends, dtype='datetime64[m]') - range_start).astype(np.int64), 0, range_minutes)
+        else:
+            staff_column = starts = ends = np.empty(0, dtype=np.int64)
+
+        # Weekday of every day of the range, 0 = Monday
+        weekdays = (np.arange(days) + date_from.weekday()) % 7
+
+        def per_hour_of_week(minutes: np.ndarray) -> np.ndarray:
+            """(days, 1440) minute flags -> (7, 24) minute totals"""
+            per_day_hour = minutes.reshape(days, 24, 60).sum(axis=2)
+            grid = np.zeros((7, 24), dtype=np.int64)
+            np.add.at(grid, weekdays, per_day_hour)
+            return grid
+
+        def fractions(booked: np.ndarray, working: np.ndarray) -> list:
+            ratio = np.divide(booked, working, out=np.zeros(booked.shape), where=working > 0)
+            return [
+                [round(float(ratio[d, h]), 3) if working[d, h] else None for h in range(24)]
+                for d in range(7)
+            ]
+
+        salon_booked = np.zeros((7, 24), dtype=np.int64)
+        salon_working = np.zeros((7, 24), dtype=np.int64)
+        staff_rows = []
+        for member in snapshot['staffs']:
+            week = np.zeros((7, MINUTES_PER_DAY), dtype=bool)
+            for weekday, shifts in enumerate(ScheduleService.get_weekly_template(member['id'], salon_id, snapshot)):
+                for start, end in shifts:
+                    week[weekday, start:end] = True
+            working = week[weekdays]
+
+            selected = staff_column == member['id']
+            changes = (np.bincount(starts[selected], minlength=range_minutes + 1)
+                       - np.bincount(ends[selected], minlength=range_minutes + 1))
+            # Overlapping bookings count once
+            occupied = (np.cumsum(changes[:range_minutes]) > 0).reshape(days, MINUTES_PER_DAY)
+            booked = occupied & working
+
+            booked_grid = per_hour_of_week(booked)
+            working_grid = per_hour_of_week(working)
+            salon_booked += booked_grid
+            salon_working += working_grid
+            booked_total, working_total = int(booked_grid.sum()), int(working_grid.sum())
+            staff_rows.append({
+                'staff_id': member['id'],
+                'name': member['name'],
+                'booked_minutes': booked_total,
+                'working_minutes': working_total,
+                'utilization': round(booked_total / working_total, 4) if working_total else None,
+                'heatmap': fractions(booked_grid, working_grid),
+            })
+
+        return {
+            'salon_id': salon_id,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'heatmap': fractions(salon_booked, salon_working),
+            'staff': staff_rows,
+        }
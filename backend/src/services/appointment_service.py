@@ -1,10 +1,15 @@
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 import re
 from typing import Optional, List, Dict, Any, Tuple
 from flask import current_app
 
-from src.models import Appointment, Staff, Service, User
-from src.models.appointment import AppointmentStatus
+from src.models import Appointment, Staff, User, AppointmentSchema
+from src.models.appointment import AppointmentStatus, normalize_phone
+from src.services.archive_service import ArchiveService
+from src.services.catalog_service import CatalogService, DEFAULT_SERVICE_DURATION
+from src.services.schedule_service import ScheduleService
+from src.services.status_service import AppointmentStatusService
+from src.services.time_off_service import TimeOffService
 
 
 class AppointmentService:
@@ -30,13 +35,14 @@ class AppointmentService:
         """
         try:
             # Determine required fields based on authentication status
+            # (end_time is optional: it defaults to start_time + service duration)
             if user_id:
                 # Authenticated user
-                required_fields = ['staff_id', 'service_id', 'date', 'start_time', 'end_time']
+                required_fields = ['staff_id', 'service_id', 'date', 'start_time']
                 phone_number = None
             else:
                 # Guest user - phone_number is required
-                required_fields = ['staff_id', 'service_id', 'date', 'start_time', 'end_time', 'customer_phone']
+                required_fields = ['staff_id', 'service_id', 'date', 'start_time', 'customer_phone']
                 
                 if 'customer_phone' not in data:
                     return None, 'Phone number is required for guest booking'
@@ -55,25 +61,16 @@ class AppointmentService:
             
             # Parse and validate time strings
             start_time_str = data['start_time']
-            end_time_str = data['end_time']
+            end_time_str = data.get('end_time')
             
             if not AppointmentService._validate_time_format(start_time_str):
                 return None, 'Invalid start_time format. Use HH:MM (e.g., 10:00)'
                 
-            if not AppointmentService._validate_time_format(end_time_str):
+            if end_time_str and not AppointmentService._validate_time_format(end_time_str):
                 return None, 'Invalid end_time format. Use HH:MM (e.g., 11:30)'
             
-            # Parse time strings to time objects
-            start_time_obj = time.fromisoformat(start_time_str)
-            end_time_obj = time.fromisoformat(end_time_str)
-            
-            # Validate that start_time is earlier than end_time
-            if start_time_obj >= end_time_obj:
-                return None, 'start_time must be earlier than end_time'
-            
             # Combine date and time to create datetime objects
-            start_datetime = datetime.combine(appointment_date, start_time_obj)
-            end_datetime = datetime.combine(appointment_date, end_time_obj)
+            start_datetime = datetime.combine(appointment_date, time.fromisoformat(start_time_str))
             
             # Validate that appointment is not in the past
             if start_datetime < datetime.now():
@@ -84,21 +81,40 @@ class AppointmentService:
             if not staff:
                 return None, 'Staff member not found'
             
-            # Check if service exists
-            service = Service.get(id=data['service_id'])
+            # Check if service exists (catalog snapshot, no query)
+            service = CatalogService.find_service(data['service_id'])
             if not service:
                 return None, 'Service not found'
             
             # Check if staff and service belong to same salon
-            if staff.salon_id != service.salon_id:
+            if staff.salon_id != service['salon_id']:
                 return None, 'Staff and service must belong to the same salon'
             
+            # End time defaults to the service's duration
+            if end_time_str:
+                end_datetime = datetime.combine(appointment_date, time.fromisoformat(end_time_str))
+            else:
+                end_datetime = start_datetime + timedelta(
+                    minutes=service['duration'] or DEFAULT_SERVICE_DURATION
+                )
+                if end_datetime.date() != appointment_date:
+                    return None, 'Service would end after midnight'
+            
+            # Validate that start_time is earlier than end_time
+            if start_datetime >= end_datetime:
+                return None, 'start_time must be earlier than end_time'
+            
+            # Within one of the staff member's shifts (or the salon's opening hours)
+            if not ScheduleService.is_working(staff.id, staff.salon_id, start_datetime, end_datetime):
+                return None, 'Staff member is not working at this time'
+            
             # Check for time conflicts
             conflict = AppointmentService.check_time_conflict(
                 staff_id=data['staff_id'],
                 start_time=start_datetime,
                 end_time=end_datetime,
-                exclude_appointment_id=None
+                exclude_appointment_id=None,
+                salon_id=staff.salon_id
             )
             if conflict:
                 return None, f'Time conflict: {conflict}'
@@ -163,6 +179,69 @@ class AppointmentService:
             current_app.logger.error(f'Error getting appointments: {str(e)}')
             return []
     
+    @staticmethod
+    def get_appointment_rows(user_id: int, fields: Optional[Tuple[str, ...]] = None) -> List[tuple]:
+        """
+        Get appointments for a specific user as row tuples for serialization
+        
+        Includes archived appointments: the whole history, newest first.
+        
+        Args:
+            user_id: User ID to get appointments for
+            fields: Optional subset of AppointmentSchema field names
+            
+        Returns:
+            List of row tuples matching AppointmentSchema.select(fields)
+        """
+        try:
+            rows = []
+            for model in ArchiveService.models_for(None):
+                # start_time is appended for sorting the two tables together
+                query = AppointmentSchema.query(fields, model).add_columns(model.start_time)
+                rows += query.filter(model.user_id == user_id).all()
+            rows.sort(key=lambda row: row[-1], reverse=True)
+            return [tuple(row[:-1]) for row in rows]
+            
+        except Exception as e:
+            current_app.logger.error(f'Error getting appointments: {str(e)}')
+            return []
+    
+    @staticmethod
+    def find_guest_appointments(phone_number: str, from_date: Optional[date] = None,
+                                salon_id: Optional[int] = None) -> Tuple[List[Appointment], Optional[str]]:
+        """
+        Find upcoming guest bookings made with a phone number
+        
+        Matches the digits of the phone number exactly, using the
+        (phone_digits, date) index.
+        
+        Args:
+            phone_number: Phone number in any format
+            from_date: Earliest appointment date (defaults to today)
+            salon_id: Only bookings with this salon's staff (None = every salon)
+            
+        Returns:
+            Tuple of (appointments, error_message)
+        """
+        digits = normalize_phone(phone_number)
+        if not digits or len(digits) < 10 or len(digits) > 15:
+            return [], 'Phone number must have 10-15 digits'
+        
+        try:
+            query = Appointment.query.filter(
+                Appointment.phone_digits == digits,
+                Appointment.date >= (from_date or date.today()),
+                Appointment.user_id.is_(None)
+            )
+            if salon_id is not None:
+                query = query.filter(Appointment.staff_id.in_(
+                    Staff.query.filter_by(salon_id=salon_id).with_entities(Staff.id)
+                ))
+            return query.order_by(Appointment.date, Appointment.start_time).all(), None
+            
+        except Exception as e:
+            return [], f'Error looking up appointments: {str(e)}'
+    
     @staticmethod
     def get_appointment_by_id(appointment_id: int, user_id: Optional[int] = None) -> Tuple[Optional[Appointment], Optional[str]]:
         """
@@ -211,9 +290,13 @@ class AppointmentService:
             # Update fields
             if 'status' in data:
                 try:
-                    appointment.status = AppointmentStatus(data['status'])
+                    new_status = AppointmentStatus(data['status'])
                 except ValueError:
                     return None, 'Invalid status value'
+                error = AppointmentStatusService.check_transition(appointment.status, new_status)
+                if error:
+                    return None, error
+                appointment.status = new_status
             
             if 'date' in data:
                 try:
@@ -230,7 +313,7 @@ class AppointmentService:
                 start_datetime = datetime.combine(appointment.date, start_time_obj)
                 appointment.start_time = start_datetime
             
-            if 'end_time' in data:
+            if data.get('end_time'):
                 end_time_str = data['end_time']
                 if not AppointmentService._validate_time_format(end_time_str):
                     return None, 'Invalid end_time format. Use HH:MM (e.g., 11:30)'
@@ -238,11 +321,23 @@ class AppointmentService:
                 end_time_obj = time.fromisoformat(end_time_str)
                 end_datetime = datetime.combine(appointment.date, end_time_obj)
                 appointment.end_time = end_datetime
+            elif 'start_time' in data:
+                # Moved without an end time: keep the service's duration
+                durations = CatalogService.service_durations(appointment.staff.salon_id)
+                appointment.end_time = appointment.start_time + timedelta(
+                    minutes=durations.get(appointment.service_id, DEFAULT_SERVICE_DURATION)
+                )
             
             # Validate that start_time is earlier than end_time
             if appointment.start_time >= appointment.end_time:
                 return None, 'start_time must be earlier than end_time'
             
+            # Rescheduled: within one of the staff member's shifts (or the salon's opening hours)
+            if any(name in data for name in ('date', 'start_time', 'end_time')) and not ScheduleService.is_working(
+                appointment.staff_id, appointment.staff.salon_id, appointment.start_time, appointment.end_time
+            ):
+                return None, 'Staff member is not working at this time'
+            
             # Check for time conflicts (excluding current appointment)
             conflict = AppointmentService.check_time_conflict(
                 staff_id=appointment.staff_id,
@@ -284,20 +379,31 @@ class AppointmentService:
     
     @staticmethod
     def check_time_conflict(staff_id: int, start_time: datetime, end_time: datetime, 
-                           exclude_appointment_id: Optional[int] = None) -> Optional[str]:
+                           exclude_appointment_id: Optional[int] = None,
+                           salon_id: Optional[int] = None) -> Optional[str]:
         """
-        Check for time conflicts with existing appointments
+        Check for time conflicts with existing appointments and time off
         
         Args:
             staff_id: Staff ID
             start_time: Start time
             end_time: End time
             exclude_appointment_id: Appointment ID to exclude from conflict check
+            salon_id: Salon of the staff member, if known (saves a staff lookup)
             
         Returns:
             Conflict message if found, None otherwise
         """
         try:
+            # Time off and salon blackouts: in-memory interval lookup
+            if salon_id is None:
+                staff = Staff.query.get(staff_id)
+                salon_id = staff.salon_id if staff else None
+            if salon_id:
+                blocked = TimeOffService.find_conflict(staff_id, salon_id, start_time, end_time)
+                if blocked:
+                    return blocked
+            
             # Find overlapping appointments
             query = Appointment.query.filter_by(staff_id=staff_id).filter(
                 Appointment.start_time < end_time,
@@ -0,0 +1,91 @@
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import literal, select
+
+from src.models import db, Appointment, ArchivedAppointment
+from src.models.appointment import AppointmentStatus
+from src.settings import Settings as S
+
+
+# Only final statuses are archived: anything else may still change
+ARCHIVED_STATUSES = (AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED)
+ARCHIVED_COLUMNS = ('id', 'staff_id', 'user_id', 'service_id', 'phone_number', 'phone_digits',
+                    'status', 'date', 'start_time', 'end_time')
+
+
+class ArchiveService:
+    """Moves old appointments out of the ``appointments`` table.
+
+    Completed and cancelled appointments dated before the first day of the
+    month ARCHIVE_AFTER_MONTHS ago are copied to ``appointments_archive``
+    and deleted, in batches of ARCHIVE_BATCH_SIZE with one short
+    transaction each, by a daily Celery beat job.  Booking, availability
+    and the admin list then only scan and index current appointments.
+
+    Archived appointments are always in the past, so readers of history
+    (the staff and admin calendars, the admin export, a customer's
+    appointments, analytics) also query the archive only for ranges
+    starting before today (see ``models_for``).  The admin list does not
+    read the archive and rejects dates before the cutoff.
+    """
+
+    @staticmethod
+    def cutoff(today: Optional[date] = None, months: Optional[int] = None) -> date:
+        """First day not archived: the first of the month ``months`` before this one"""
+        today = today or date.today()
+        months = S.ARCHIVE_AFTER_MONTHS if months is None else months
+        month_index = today.year * 12 + today.month - 1 - months
+        return date(month_index // 12, month_index % 12 + 1, 1)
+
+    @staticmethod
+    def models_for(date_from: Optional[date]) -> Tuple:
+        """Appointment models holding rows dated on or after ``date_from`` (None = any date)"""
+        if date_from is None or date_from < date.today():
+            return Appointment, ArchivedAppointment
+        return (Appointment,)
+
+    @staticmethod
+    def archive_appointments(months: Optional[int] = None, batch_size: Optional[int] = None,
+                             today: Optional[date] = None) -> int:
+        """
+        Move completed and cancelled appointments older than ``months`` to the archive
+
+        Args:
+            months: Months of history kept in ``appointments`` (default: ARCHIVE_AFTER_MONTHS)
+            batch_size: Appointments moved per transaction (default: ARCHIVE_BATCH_SIZE)
+            today: Reference date for the cutoff (default: today)
+
+        Returns:
+            Number of appointments archived
+        """
+        cutoff = ArchiveService.cutoff(today, months)
+        batch_size = batch_size or S.ARCHIVE_BATCH_SIZE
+        source = Appointment.__table__
+        target = ArchivedAppointment.__table__
+        archived_at = literal(datetime.now(), target.c.archived_at.type)
+
+        moved = 0
+        while True:
+            # Rows locked by a concurrent edit are picked up by the next run
+            ids = [row.id for row in db.session.execute(
+                select([source.c.id]).where(
+                    source.c.status.in_(ARCHIVED_STATUSES) & (source.c.date < cutoff)
+                ).order_by(source.c.id).limit(batch_size).with_for_update(skip_locked=True)
+            )]
+            if not ids:
+                break
+            try:
+                db.session.execute(target.insert().from_select(
+                    list(ARCHIVED_COLUMNS) + ['archived_at'],
+                    select([source.c[name] for name in ARCHIVED_COLUMNS] + [archived_at]).where(source.c.id.in_(ids))
+                ))
+                db.session.execute(source.delete().where(source.c.id.in_(ids)))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            moved += len(ids)
+            if len(ids) < batch_size:
+                break
+        return moved
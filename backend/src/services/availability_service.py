@@ -1,8 +1,13 @@
+import heapq
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from sqlalchemy import and_, or_
 from src.models import db, Appointment, Staff
 from src.models.appointment import AppointmentStatus
+from src.services.catalog_service import CatalogService, DEFAULT_SERVICE_DURATION
+from src.services.schedule_service import ScheduleService
+from src.services.time_off_service import TimeOffService
 
 class AvailabilityService:
     """Service class for handling appointment availability logic.
@@ -28,8 +33,15 @@ class AvailabilityService:
             exclude_appointment_id: ID of appointment to exclude (for editing)
             
         Returns:
-            bool: True if available, False if conflicts exist
+            bool: True if available, False if off shift or conflicts exist
         """
+        # Check working hours and time off (no query: catalog snapshot)
+        staff = Staff.query.get(staff_id)
+        if not staff or not ScheduleService.is_working(staff_id, staff.salon_id, start_time, end_time):
+            return False
+        if TimeOffService.get_blocked_intervals(staff_id, staff.salon_id, start_time, end_time):
+            return False
+        
         # Check for time conflicts
         query = Appointment.query.filter(
             and_(
@@ -60,6 +72,9 @@ class AvailabilityService:
         """
         Get available time slots for a staff member on a specific date.
         
+        Slots are laid out from the start of each shift of the staff
+        member's weekly schedule, so breaks and split shifts are honoured.
+        
         Args:
             staff_id: ID of the staff member
             appointment_date: Date to check availability
@@ -69,41 +84,175 @@ class AvailabilityService:
         Returns:
             List of available time slots in HH:MM format
         """
-        # Get staff information and salon working hours
+        # Staff lookup hits the session identity map when the caller loaded it
         staff = Staff.query.get(staff_id)
         if not staff:
             return []
         
-        salon = staff.salon
-        if not salon or not salon.start_working_time or not salon.end_working_time:
+        # Shifts of the day from the staff member's weekly template (or salon hours)
+        snapshot = CatalogService.get_snapshot(staff.salon_id)
+        shifts = ScheduleService.get_shifts(staff_id, staff.salon_id, appointment_date, snapshot)
+        if not shifts:
             return []
         
-        # Convert salon working hours to datetime for the appointment date
-        start_working_time = datetime.combine(appointment_date, salon.start_working_time)
-        end_working_time = datetime.combine(appointment_date, salon.end_working_time)
+        appointments = AvailabilityService._booked_intervals([staff_id], appointment_date, appointment_date)
+        busy = AvailabilityService._busy_intervals(
+            staff_id, staff.salon_id, appointment_date, appointments.get((staff_id, appointment_date), []), snapshot
+        )
+        slots = AvailabilityService.iter_free_slots(
+            shifts, busy,
+            timedelta(minutes=service_duration_minutes),
+            timedelta(minutes=slot_interval_minutes)
+        )
+        return [slot.strftime('%H:%M') for slot in slots]
+    
+    @staticmethod
+    def iter_free_slots(
+        shifts: List[Tuple[datetime, datetime]],
+        busy: List[Tuple[datetime, datetime]],
+        duration: timedelta,
+        interval: timedelta,
+        not_before: Optional[datetime] = None
+    ) -> Iterator[datetime]:
+        """
+        Yield the start of every free slot, in time order.
         
-        # Generate all possible time slots
-        available_slots = []
-        current_time = start_working_time
+        Single pass: slots and busy intervals are both in time order, so the
+        busy pointer only moves forward.
         
-        while current_time + timedelta(minutes=service_duration_minutes) <= end_working_time:
-            slot_start = current_time
-            slot_end = current_time + timedelta(minutes=service_duration_minutes)
-            
-            # Check if this slot conflicts with existing appointments
-            is_available = AvailabilityService.check_staff_availability(
-                staff_id=staff_id,
-                appointment_date=appointment_date,
-                start_time=slot_start,
-                end_time=slot_end
-            )
-            
-            # If no conflicts, add to available slots
-            if is_available:
-                available_slots.append(slot_start.strftime('%H:%M'))
+        Args:
+            shifts: Sorted, non-overlapping working periods; slots start at each shift start
+            busy: Sorted, merged booked/blocked periods
+            duration: Slot length
+            interval: Step between slot starts
+            not_before: Skip slots starting earlier (e.g. now)
+        """
+        next_busy = 0
+        for shift_start, shift_end in shifts:
+            slot_start = shift_start
+            while slot_start + duration <= shift_end:
+                slot_end = slot_start + duration
+                
+                # Skip busy intervals that end before this slot starts
+                while next_busy < len(busy) and busy[next_busy][1] <= slot_start:
+                    next_busy += 1
+                
+                free = next_busy == len(busy) or busy[next_busy][0] >= slot_end
+                if free and (not_before is None or slot_start >= not_before):
+                    yield slot_start
+                
+                slot_start += interval
+    
+    @staticmethod
+    def _booked_intervals(staff_ids: List[int], first_day: date, last_day: date) -> Dict[Tuple[int, date], List[Tuple[datetime, datetime]]]:
+        """Non-cancelled appointments of several staff over a date range, in one query"""
+        rows = Appointment.query.with_entities(
+            Appointment.staff_id, Appointment.date, Appointment.start_time, Appointment.end_time
+        ).filter(
+            Appointment.staff_id.in_(staff_ids),
+            Appointment.date >= first_day,
+            Appointment.date <= last_day,
+            Appointment.status != AppointmentStatus.CANCELLED
+        ).all()
+        
+        booked: Dict[Tuple[int, date], List[Tuple[datetime, datetime]]] = {}
+        for staff_id, day, start, end in rows:
+            booked.setdefault((staff_id, day), []).append((start, end))
+        return booked
+    
+    @staticmethod
+    def _busy_intervals(staff_id: int, salon_id: int, day: date,
+                        appointments: List[Tuple[datetime, datetime]],
+                        snapshot: Optional[Dict[str, Any]] = None) -> List[Tuple[datetime, datetime]]:
+        """Merge a day's appointments with the staff member's time off"""
+        day_start = datetime.combine(day, datetime.min.time())
+        blocked = TimeOffService.get_blocked_intervals(
+            staff_id, salon_id, day_start, day_start + timedelta(days=1), snapshot
+        )
+        intervals = sorted(list(appointments) + [(start, end) for start, end, _ in blocked])
+        
+        merged: List[Tuple[datetime, datetime]] = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+    
+    @staticmethod
+    def find_next_available(
+        service_id: int,
+        count: int = 5,
+        days: int = 14,
+        staff_id: Optional[int] = None,
+        seniority: Optional[str] = None,
+        not_before: Optional[datetime] = None,
+        slot_interval_minutes: int = 30
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """
+        Find the earliest openings for a service across all eligible staff.
+        
+        Appointments of every eligible staff member over the whole range
+        are loaded in one query; schedules and time off come from the
+        catalog snapshot.  Each staff member then gets a lazy, time-ordered
+        stream of free slots, and the streams are merged with a heap, so
+        only as many days are swept as it takes to find ``count`` openings.
+        
+        Args:
+            service_id: Service to book (its salon and duration are used)
+            count: Number of openings to return
+            days: How many days ahead to search, starting today
+            staff_id: Only this staff member
+            seniority: Only staff of this seniority (e.g. "senior")
+            not_before: Earliest start (defaults to now)
+            slot_interval_minutes: Interval between candidate start times
             
-            # Move to next slot
-            current_time += timedelta(minutes=slot_interval_minutes)
+        Returns:
+            Tuple of (openings, error_message); openings are dicts with
+            staff_id, staff_name, date, start_time and end_time, earliest first
+        """
+        service = CatalogService.find_service(service_id)
+        if not service:
+            return None, 'Service not found'
         
-        return available_slots
-
+        snapshot = CatalogService.get_snapshot(service['salon_id']) if service['salon_id'] else None
+        if not snapshot:
+            return None, 'Salon not found'
+        
+        staffs = [
+            member for member in snapshot['staffs']
+            if (not staff_id or member['id'] == staff_id)
+            and (not seniority or member['seniority'] == seniority)
+        ]
+        if not staffs:
+            return [], None
+        
+        not_before = not_before or datetime.now()
+        first_day = not_before.date()
+        last_day = first_day + timedelta(days=max(days, 1) - 1)
+        duration = timedelta(minutes=CatalogService.service_durations(service['salon_id']).get(service_id, DEFAULT_SERVICE_DURATION))
+        interval = timedelta(minutes=slot_interval_minutes)
+        booked = AvailabilityService._booked_intervals([member['id'] for member in staffs], first_day, last_day)
+        
+        def openings(member):
+            day = first_day
+            while day <= last_day:
+                shifts = ScheduleService.get_shifts(member['id'], service['salon_id'], day, snapshot)
+                if shifts:
+                    busy = AvailabilityService._busy_intervals(
+                        member['id'], service['salon_id'], day, booked.get((member['id'], day), []), snapshot
+                    )
+                    for start in AvailabilityService.iter_free_slots(shifts, busy, duration, interval, not_before):
+                        yield start, member['id'], member['name']
+                day += timedelta(days=1)
+        
+        results = []
+        for start, member_id, member_name in islice(heapq.merge(*(openings(member) for member in staffs)), count):
+            results.append({
+                'staff_id': member_id,
+                'staff_name': member_name,
+                'date': start.date().isoformat(),
+                'start_time': start.strftime('%H:%M'),
+                'end_time': (start + duration).strftime('%H:%M'),
+            })
+        return results, None
@@ -0,0 +1,363 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from src.cache import LocalLRU, get_redis, key
+from src.database import use_primary
+from src.models import (
+    DayOfWeek, Salon, SalonSchema, Service, ServiceSchema, Staff, StaffSchema, TimeOff, WorkingHour
+)
+from src.serializers import dumps, loads
+from src.settings import Settings as S
+
+
+# Bumped whenever the snapshot layout changes, so older blobs in Redis are ignored
+SNAPSHOT_FORMAT = 3
+
+# Process-local copy of recently used snapshots, keyed by salon ID.  Each
+# entry is validated against the Redis version before it is served.
+_local_snapshots = LocalLRU(maxsize=S.CATALOG_LOCAL_CACHE_SIZE)
+
+# Slot length for services without a duration, in minutes
+DEFAULT_SERVICE_DURATION = 60
+
+# Service durations by salon, derived from (and tagged with) the snapshot above
+_durations = LocalLRU(maxsize=S.CATALOG_LOCAL_CACHE_SIZE)
+
+
+class CatalogService:
+    """Per-salon catalog versioning shared by every web and worker process.
+
+    Each salon has a version counter in Redis that admin writes to the
+    salon, its services or its staff bump.  Read endpoints derive strong
+    ETags from it, so a revalidation can be answered without touching the
+    database.
+
+    The serialized catalog of a salon (salon, services, staff, their
+    weekly schedules and upcoming time off) is kept
+    as a snapshot blob in Redis tagged with that version, with a small
+    per-process LRU in front of it, so catalog reads in any uWSGI or
+    Celery process are a version check plus a memory lookup.
+
+    All methods degrade gracefully: if Redis is unreachable they return
+    None and callers fall back to uncached behaviour.
+    """
+
+    @staticmethod
+    def _version_key(salon_id: int) -> str:
+        return key('catalog', salon_id, 'version')
+
+    @staticmethod
+    def _service_salon_key(service_id: int) -> str:
+        return key('catalog', 'service', service_id, 'salon')
+
+    @staticmethod
+    def _snapshot_key(salon_id: int) -> str:
+        return key('catalog', salon_id, 'snapshot', SNAPSHOT_FORMAT)
+
+    @staticmethod
+    def _seed(pipe, version_key: str) -> None:
+        # A missing counter starts from the clock rather than 0, so a
+        # flushed Redis never re-issues a version a client already holds
+        now = time.time()
+        pipe.hsetnx(version_key, 'version', int(now * 1000))
+        pipe.hsetnx(version_key, 'updated_at', int(now))
+
+    @staticmethod
+    def get_version(salon_id: int) -> Optional[Tuple[int, float]]:
+        """
+        Get the current catalog version of a salon
+
+        Reading never creates a counter: it is seeded by ``seed_version``
+        once the salon is known to exist, so requests for unknown salon IDs
+        leave nothing behind in Redis.
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            Tuple of (version, updated_at epoch seconds), or None if the salon
+            has no version yet or Redis is unavailable
+        """
+        try:
+            version, updated_at = get_redis().hmget(CatalogService._version_key(salon_id), 'version', 'updated_at')
+        except RedisError as e:
+            current_app.logger.warning(f'Catalog version lookup failed: {e}')
+            return None
+        if version is None or updated_at is None:
+            return None
+        return int(version), float(updated_at)
+
+    @staticmethod
+    def seed_version(salon_id: int) -> Optional[Tuple[int, float]]:
+        """
+        Create the catalog version of an existing salon if it has none
+
+        Args:
+            salon_id: Salon ID (the caller has checked that the salon exists)
+
+        Returns:
+            Tuple of (version, updated_at epoch seconds), or None if Redis is unavailable
+        """
+        try:
+            version_key = CatalogService._version_key(salon_id)
+            pipe = get_redis().pipeline()
+            CatalogService._seed(pipe, version_key)
+            pipe.hmget(version_key, 'version', 'updated_at')
+            version, updated_at = pipe.execute()[-1]
+            return int(version), float(updated_at)
+        except RedisError as e:
+            current_app.logger.warning(f'Catalog version seed failed: {e}')
+            return None
+
+    @staticmethod
+    def bump_version(*salon_ids: Optional[int]) -> None:
+        """
+        Invalidate the catalog of one or more salons after a write
+
+        Args:
+            salon_ids: Salon IDs whose salon/services/staff changed (None values are skipped)
+        """
+        salon_ids = {salon_id for salon_id in salon_ids if salon_id}
+        if not salon_ids:
+            return
+        try:
+            pipe = get_redis().pipeline()
+            now = int(time.time())
+            for salon_id in salon_ids:
+                version_key = CatalogService._version_key(salon_id)
+                CatalogService._seed(pipe, version_key)
+                pipe.hincrby(version_key, 'version', 1)
+                pipe.hset(version_key, 'updated_at', now)
+            pipe.execute()
+        except RedisError as e:
+            current_app.logger.error(f'Catalog version bump failed for salons {sorted(salon_ids)}: {e}')
+
+    @staticmethod
+    def remember_service_salon(service_id: int, salon_id: Optional[int]) -> None:
+        """Record which salon a service belongs to so its ETag can be built without the DB."""
+        if not salon_id:
+            return
+        try:
+            get_redis().set(CatalogService._service_salon_key(service_id), salon_id)
+        except RedisError as e:
+            current_app.logger.warning(f'Could not cache salon of service {service_id}: {e}')
+
+    @staticmethod
+    def service_salon_id(service_id: int) -> Optional[int]:
+        """Salon ID of a service previously recorded by remember_service_salon, if any."""
+        try:
+            salon_id = get_redis().get(CatalogService._service_salon_key(service_id))
+        except RedisError as e:
+            current_app.logger.warning(f'Could not read salon of service {service_id}: {e}')
+            return None
+        return int(salon_id) if salon_id is not None else None
+
+    @staticmethod
+    def build_snapshot(salon_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Build the catalog snapshot of a salon from the database
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            Dict with ``salon``, ``services``, ``staffs``, ``schedules`` and ``time_off``
+            entries, or None if the salon does not exist
+        """
+        # Stored under the current version, so never built from a lagging replica
+        with use_primary():
+            salon = Salon.with_counts().filter_by(id=salon_id).first()
+            if not salon:
+                return None
+            services = ServiceSchema.query().filter(Service.salon_id == salon_id).order_by(Service.id).all()
+            staffs = StaffSchema.query().filter(Staff.salon_id == salon_id).order_by(Staff.id).all()
+            return {
+                'salon': SalonSchema.dump(salon),
+                'services': ServiceSchema.dump_rows(services),
+                'staffs': StaffSchema.dump_rows(staffs),
+                'schedules': CatalogService.build_schedules(salon_id),
+                'time_off': CatalogService.build_time_off(salon_id),
+            }
+
+    @staticmethod
+    def build_schedules(salon_id: int) -> Dict[str, Dict[str, list]]:
+        """
+        Build the weekly schedule templates of a salon's staff
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            ``{staff_id: {weekday: [[start_minute, end_minute], ...]}}`` with string keys
+            (JSON), weekday 0 = Monday and shifts sorted; staff without working hours are omitted
+        """
+        weekdays = {day: index for index, day in enumerate(DayOfWeek)}
+        rows = WorkingHour.query.join(Staff).filter(Staff.salon_id == salon_id).with_entities(
+            WorkingHour.staff_id, WorkingHour.day_of_week, WorkingHour.start_time, WorkingHour.end_time
+        ).order_by(WorkingHour.staff_id, WorkingHour.start_time).all()
+
+        schedules: Dict[str, Dict[str, list]] = {}
+        for staff_id, day_of_week, start, end in rows:
+            shifts = schedules.setdefault(str(staff_id), {}).setdefault(str(weekdays[day_of_week]), [])
+            shifts.append([start.hour * 60 + start.minute, end.hour * 60 + end.minute])
+        return schedules
+
+    @staticmethod
+    def build_time_off(salon_id: int) -> list:
+        """
+        Build the list of current and upcoming time off of a salon
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            ``[[staff_id or None, start_at, end_at, reason], ...]`` sorted by start, ISO datetimes;
+            a None staff_id is a salon-wide blackout
+        """
+        rows = TimeOff.query.with_entities(
+            TimeOff.staff_id, TimeOff.start_at, TimeOff.end_at, TimeOff.reason
+        ).filter(
+            TimeOff.salon_id == salon_id,
+            TimeOff.end_at > datetime.now()
+        ).order_by(TimeOff.start_at).all()
+        return [[staff_id, start.isoformat(), end.isoformat(), reason.value] for staff_id, start, end, reason in rows]
+
+    @staticmethod
+    def _store_snapshot(salon_id: int, version: int, snapshot: Optional[Dict[str, Any]]) -> None:
+        blob = dumps({'version': version, 'snapshot': snapshot})
+        try:
+            get_redis().set(CatalogService._snapshot_key(salon_id), blob, ex=S.CATALOG_SNAPSHOT_TTL)
+        except RedisError as e:
+            current_app.logger.warning(f'Could not store catalog snapshot of salon {salon_id}: {e}')
+        _local_snapshots.set(salon_id, (version, snapshot))
+
+    @staticmethod
+    def get_snapshot(salon_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the catalog snapshot of a salon
+
+        Served from the process-local LRU when its version is current,
+        then from Redis, and rebuilt from the database as a last resort.
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            Snapshot dict (see build_snapshot), or None if the salon does not exist
+        """
+        state = CatalogService.get_version(salon_id)
+        if state is None:
+            # First read of the salon, or Redis is down: nothing to validate a
+            # cached copy against.  Only salons that exist get a version.
+            snapshot = CatalogService.build_snapshot(salon_id)
+            if snapshot is not None:
+                state = CatalogService.seed_version(salon_id)
+                if state is not None:
+                    CatalogService._store_snapshot(salon_id, state[0], snapshot)
+            return snapshot
+        version = state[0]
+
+        cached = _local_snapshots.get(salon_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            blob = get_redis().get(CatalogService._snapshot_key(salon_id))
+        except RedisError as e:
+            current_app.logger.warning(f'Could not read catalog snapshot of salon {salon_id}: {e}')
+            blob = None
+        if blob is not None:
+            stored = loads(blob)
+            if stored['version'] == version:
+                _local_snapshots.set(salon_id, (version, stored['snapshot']))
+                return stored['snapshot']
+
+        snapshot = CatalogService.build_snapshot(salon_id)
+        CatalogService._store_snapshot(salon_id, version, snapshot)
+        return snapshot
+
+    @staticmethod
+    def refresh(*salon_ids: Optional[int]) -> None:
+        """
+        Bump the catalog version of salons and rebuild their snapshots
+
+        Call after any committed write to a salon, its services or its staff.
+
+        Args:
+            salon_ids: Salon IDs whose catalog changed (None values are skipped)
+        """
+        CatalogService.bump_version(*salon_ids)
+        for salon_id in {salon_id for salon_id in salon_ids if salon_id}:
+            _local_snapshots.pop(salon_id)
+            snapshot = CatalogService.build_snapshot(salon_id)
+            if snapshot is None:
+                # Deleted salon: drop its version and snapshot
+                CatalogService._forget(salon_id)
+                continue
+            state = CatalogService.get_version(salon_id)
+            if state is not None:
+                CatalogService._store_snapshot(salon_id, state[0], snapshot)
+
+    @staticmethod
+    def _forget(salon_id: int) -> None:
+        try:
+            get_redis().delete(CatalogService._version_key(salon_id), CatalogService._snapshot_key(salon_id))
+        except RedisError as e:
+            current_app.logger.warning(f'Could not drop the catalog of salon {salon_id}: {e}')
+
+    @staticmethod
+    def find_service(service_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a serialized service, from its salon's snapshot when the salon is known
+
+        Args:
+            service_id: Service ID
+
+        Returns:
+            Service dict (ServiceSchema fields), or None if not found
+        """
+        salon_id = CatalogService.service_salon_id(service_id)
+        if salon_id:
+            snapshot = CatalogService.get_snapshot(salon_id) or {}
+            for service in snapshot.get('services', []):
+                if service['id'] == service_id:
+                    return service
+
+        service = Service.get(id=service_id)
+        if not service:
+            return None
+        CatalogService.remember_service_salon(service.id, service.salon_id)
+        return service.to_dict()
+
+    @staticmethod
+    def service_durations(salon_id: int) -> Dict[int, int]:
+        """
+        Get the duration of every service of a salon
+
+        Args:
+            salon_id: Salon ID
+
+        Returns:
+            Minutes keyed by service ID (DEFAULT_SERVICE_DURATION when unset),
+            empty if the salon does not exist
+        """
+        # Built from the database when Redis is unavailable, so None only
+        # means that the salon does not exist
+        snapshot = CatalogService.get_snapshot(salon_id)
+        if snapshot is None:
+            return {}
+
+        cached = _durations.get(salon_id)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+
+        durations = {
+            service['id']: service['duration'] or DEFAULT_SERVICE_DURATION
+            for service in snapshot['services']
+        }
+        _durations.set(salon_id, (snapshot, durations))
+        return durations
@@ -4,8 +4,12 @@ from typing import Any, Dict, List, Optional
 
 from flask import current_app
 
+from src.database import use_replica
 from src.models import Staff, Service
 from src.services.appointment_service import AppointmentService
+from src.services.availability_service import AvailabilityService
+from src.services.catalog_service import CatalogService
+from src.services.schedule_service import ScheduleService
 from src.settings import Settings
 
 try:
@@ -58,6 +62,7 @@ class ChatBotService:
         "- Use `list_services` to list salon services.\n"
         "- Use `list_staff` to list staff members. If `service_id` is given, only staff in that service’s salon.\n"
         "- Use `find_available_staff` to suggest staff for a service at a specific date/time window.\n"
+        "- Use `find_next_available` when the customer asks for the earliest/next free time for a service.\n"
         "- Use `get_appointments` to retrieve the user’s appointments.\n"
         "- Use `get_current_appointments` to retrieve upcoming appointments only.\n"
         "- Use `create_appointment` to book only after explicit confirmation.\n"
@@ -105,7 +110,8 @@ class ChatBotService:
                 "description": (
                     "Create a new appointment for an authenticated user or a "
                     "guest.  If the user is a guest (no user_id), a "
-                    "customer_phone field must be provided.  The appointment "
+                    "customer_phone field must be provided.  end_time defaults to "
+                    "start_time plus the service duration.  The appointment "
                     "will be validated for date, time formats, and time conflicts."
                 ),
                 "parameters": {
@@ -115,10 +121,10 @@ class ChatBotService:
                         "service_id": {"type": "integer"},
                         "date": {"type": "string", "description": "YYYY-MM-DD"},
                         "start_time": {"type": "string", "description": "HH:MM (24h)"},
-                        "end_time": {"type": "string", "description": "HH:MM (24h)"},
+                        "end_time": {"type": "string", "description": "HH:MM (24h); omit to use the service duration", "nullable": True},
                         "customer_phone": {"type": "string", "description": "Required if guest", "nullable": True},
                     },
-                    "required": ["staff_id", "service_id", "date", "start_time", "end_time"],
+                    "required": ["staff_id", "service_id", "date", "start_time"],
                 },
             },
         },
@@ -182,6 +188,28 @@ class ChatBotService:
                 },
             },
         },
+        {
+            "type": "function",
+            "function": {
+                "name": "find_next_available",
+                "description": (
+                    "Find the earliest open time slots for a service across all staff of its salon, "
+                    "optionally limited to one staff member or a seniority level.  Returns an array "
+                    "of openings with staff_id, staff_name, date, start_time and end_time, earliest first."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service_id": {"type": "integer", "description": "ID of the service the customer wants"},
+                        "count": {"type": "integer", "description": "Number of openings to return (default 3)"},
+                        "days": {"type": "integer", "description": "Days ahead to search (default 14)"},
+                        "staff_id": {"type": "integer", "nullable": True, "description": "Preferred staff member"},
+                        "seniority": {"type": "string", "nullable": True, "description": "Preferred seniority, e.g. senior"},
+                    },
+                    "required": ["service_id"],
+                },
+            },
+        },
         {
             "type": "function",
             "function": {
@@ -230,6 +258,9 @@ class ChatBotService:
         
     ]
 
+    # Read-only tools that tolerate replica lag (see _dispatch_tool)
+    REPLICA_TOOLS = {"list_services", "list_staff", "find_available_staff", "find_next_available"}
+
     def __init__(self) -> None:
         """Initialise the chatbot with the configured LLM provider."""
         provider = (Settings.LLM_PROVIDER or "openai").lower()
@@ -353,35 +384,30 @@ class ChatBotService:
     def _tool_list_services(self, args: Dict[str, Any], user_id: Optional[int]) -> Any:
         """Return a list of services, optionally filtered by salon."""
         salon_id = args.get("salon_id")
-        # If salon_id is provided, we could join through SalonService to fetch only
-        # services available at that salon.  Otherwise, return all services.
+        # If salon_id is provided, serve the salon's cached catalog snapshot.
+        # Otherwise, return all services.
         if salon_id:
-            # Prevent circular import by importing SalonService within the function
-            from src.models.salon_service import SalonService  # type: ignore
-            from src.models import Salon
-            salon = Salon.get(id=salon_id)
-            if not salon:
+            snapshot = CatalogService.get_snapshot(salon_id)
+            if not snapshot:
                 return {"error": "Salon not found"}
-            salon_services = SalonService.query.filter_by(salon_id=salon_id).all()
-            services = [ss.service for ss in salon_services]
-        else:
-            services = Service.query.all()
+            return snapshot["services"]
+        services = Service.query.all()
         return [svc.to_dict() for svc in services]
 
     def _tool_list_staff(self, args: Dict[str, Any], user_id: Optional[int]) -> Any:
         """Return a list of staff members, optionally filtered by salon or service."""
         salon_id = args.get("salon_id")
         service_id = args.get("service_id")
-        staff_query = Staff.query
         if service_id:
             # If a service_id is supplied, limit the staff to those in the same salon
-            service = Service.get(id=service_id)
+            service = CatalogService.find_service(service_id)
             if not service:
                 return {"error": "Service not found"}
-            staff_query = staff_query.filter_by(salon_id=service.salon_id)
-        elif salon_id:
-            staff_query = staff_query.filter_by(salon_id=salon_id)
-        staff_members = staff_query.all()
+            salon_id = service["salon_id"]
+        if salon_id:
+            snapshot = CatalogService.get_snapshot(salon_id)
+            return snapshot["staffs"] if snapshot else []
+        staff_members = Staff.query.all()
         return [member.to_dict() for member in staff_members]
 
     def _tool_find_available_staff(self, args: Dict[str, Any], user_id: Optional[int]) -> Any:
@@ -411,16 +437,33 @@ class ChatBotService:
         staff_members = Staff.query.filter_by(salon_id=service.salon_id).all()
         available: List[Dict[str, Any]] = []
         for staff in staff_members:
+            # Weekly schedule check first: in memory, no query
+            if not ScheduleService.is_working(staff.id, staff.salon_id, start_dt, end_dt):
+                continue
             conflict = AppointmentService.check_time_conflict(
                 staff_id=staff.id,
                 start_time=start_dt,
                 end_time=end_dt,
                 exclude_appointment_id=None,
+                salon_id=staff.salon_id,
             )
             if not conflict:
                 available.append(staff.to_dict())
         return available
 
+    def _tool_find_next_available(self, args: Dict[str, Any], user_id: Optional[int]) -> Any:
+        """Find the earliest openings for a service across eligible staff."""
+        openings, error = AvailabilityService.find_next_available(
+            service_id=args.get("service_id"),
+            count=min(int(args.get("count") or 3), 10),
+            days=min(int(args.get("days") or 14), 60),
+            staff_id=args.get("staff_id"),
+            seniority=args.get("seniority"),
+        )
+        if error:
+            return {"error": error}
+        return openings
+
     # ------------------------------------------------------------------
     # Core chat loop
     # ------------------------------------------------------------------
@@ -501,6 +544,13 @@ class ChatBotService:
     def _dispatch_tool(self, name: str, args: Dict[str, Any], user_id: Optional[int]) -> Any:
         """Dispatch a tool call by name to the appropriate method."""
         print(f"🔧 Calling tool: {name}")
+        # Catalog and availability lookups may be served by the read replica;
+        # the user's own appointments are read from the primary so a booking
+        # made a moment ago is never missing.
+        with use_replica(name in self.REPLICA_TOOLS):
+            return self._run_tool(name, args, user_id)
+
+    def _run_tool(self, name: str, args: Dict[str, Any], user_id: Optional[int]) -> Any:
         try:
             if name == "get_appointments":
                 return self._tool_get_appointments(args, user_id)
@@ -518,6 +568,8 @@ class ChatBotService:
                 return self._tool_list_staff(args, user_id)
             if name == "find_available_staff":
                 return self._tool_find_available_staff(args, user_id)
+            if name == "find_next_available":
+                return self._tool_find_next_available(args, user_id)
             return {"error": f"Unknown tool: {name}"}
         except Exception as e:
             current_app.logger.error(f"Error in tool {name}: {e}")
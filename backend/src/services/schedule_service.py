@@ -0,0 +1,132 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.models import db, DayOfWeek, Staff, WorkingHour
+from src.services.catalog_service import CatalogService
+
+
+class ScheduleService:
+    """Weekly working hours of staff members.
+
+    Schedules are read from the salon's catalog snapshot (see
+    CatalogService.build_schedules), which holds a per-staff weekly
+    template in memory, so resolving the shifts of a day costs no query.
+    Staff without any working hours work the salon's opening hours.
+    """
+
+    @staticmethod
+    def _minutes_to_datetime(day: date, minutes: int) -> datetime:
+        return datetime.combine(day, time()) + timedelta(minutes=minutes)
+
+    @staticmethod
+    def get_shifts(staff_id: int, salon_id: int, day: date,
+                   snapshot: Optional[Dict[str, Any]] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Get the shifts a staff member works on a date
+
+        Args:
+            staff_id: Staff ID
+            salon_id: Salon of the staff member
+            day: Date
+            snapshot: The salon's catalog snapshot, when the caller already has it
+
+        Returns:
+            Sorted, non-overlapping (start, end) datetimes; empty on days off
+        """
+        template = ScheduleService.get_weekly_template(staff_id, salon_id, snapshot)
+        return [
+            (ScheduleService._minutes_to_datetime(day, start), ScheduleService._minutes_to_datetime(day, end))
+            for start, end in template[day.weekday()]
+        ]
+
+    @staticmethod
+    def get_weekly_template(staff_id: int, salon_id: int,
+                            snapshot: Optional[Dict[str, Any]] = None) -> List[List[Tuple[int, int]]]:
+        """
+        Get a staff member's working hours for each day of the week
+
+        Args:
+            staff_id: Staff ID
+            salon_id: Salon of the staff member
+            snapshot: The salon's catalog snapshot, when the caller already has it
+
+        Returns:
+            Seven lists (0 = Monday) of sorted (start_minute, end_minute) shifts
+        """
+        snapshot = snapshot or CatalogService.get_snapshot(salon_id)
+        if not snapshot:
+            return [[] for _ in range(7)]
+
+        template = snapshot.get('schedules', {}).get(str(staff_id))
+        if template is not None:
+            return [[tuple(shift) for shift in template.get(str(weekday), [])] for weekday in range(7)]
+
+        salon = snapshot['salon']
+        if not salon['start_working_time'] or not salon['end_working_time']:
+            return [[] for _ in range(7)]
+        start, end = (time.fromisoformat(salon[name]) for name in ('start_working_time', 'end_working_time'))
+        opening_hours = (start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+        return [[opening_hours] for _ in range(7)]
+
+    @staticmethod
+    def is_working(staff_id: int, salon_id: int, start_time: datetime, end_time: datetime) -> bool:
+        """Whether [start_time, end_time] falls entirely within one shift"""
+        return any(
+            shift_start <= start_time and end_time <= shift_end
+            for shift_start, shift_end in ScheduleService.get_shifts(staff_id, salon_id, start_time.date())
+        )
+
+    @staticmethod
+    def _parse_shifts(entries: List[Dict[str, Any]]) -> Tuple[Optional[List[Tuple[DayOfWeek, time, time]]], Optional[str]]:
+        shifts = []
+        for entry in entries:
+            try:
+                day_of_week = DayOfWeek(str(entry['day_of_week']).lower())
+                start = time.fromisoformat(entry['start_time'])
+                end = time.fromisoformat(entry['end_time'])
+            except KeyError as e:
+                return None, f'Missing required field: {e.args[0]}'
+            except (TypeError, ValueError):
+                return None, f'Invalid working hour: {entry}. Use a weekday name and HH:MM times'
+            if start >= end:
+                return None, f'start_time must be earlier than end_time ({day_of_week.value} {entry["start_time"]})'
+            shifts.append((day_of_week, start, end))
+
+        # Shifts of the same day must not overlap (gaps between them are breaks)
+        shifts.sort(key=lambda shift: (list(DayOfWeek).index(shift[0]), shift[1]))
+        for previous, current in zip(shifts, shifts[1:]):
+            if previous[0] == current[0] and current[1] < previous[2]:
+                return None, f'Overlapping shifts on {current[0].value}'
+        return shifts, None
+
+    @staticmethod
+    def replace_weekly_schedule(staff: Staff, entries: List[Dict[str, Any]]) -> Tuple[Optional[List[WorkingHour]], Optional[str]]:
+        """
+        Replace the whole weekly schedule of a staff member
+
+        Args:
+            staff: Staff member
+            entries: Shifts as ``{'day_of_week': 'monday', 'start_time': 'HH:MM', 'end_time': 'HH:MM'}``;
+                     an empty list reverts the staff member to the salon's opening hours
+
+        Returns:
+            Tuple of (working_hours, error_message)
+        """
+        shifts, error = ScheduleService._parse_shifts(entries)
+        if error:
+            return None, error
+
+        try:
+            WorkingHour.query.filter_by(staff_id=staff.id).delete(synchronize_session=False)
+            working_hours = [
+                WorkingHour(staff_id=staff.id, day_of_week=day_of_week, start_time=start, end_time=end)
+                for day_of_week, start, end in shifts
+            ]
+            db.session.add_all(working_hours)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return None, f'Failed to update working hours: {str(e)}'
+
+        CatalogService.refresh(staff.salon_id)
+        return working_hours, None
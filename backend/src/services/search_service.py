@@ -0,0 +1,99 @@
+from sqlalchemy import any_, case, func, or_, select
+from sqlalchemy.orm import Query
+
+from src.models import db, Appointment, Service, Staff, User
+from src.models.appointment import normalize_phone
+
+
+# Shortest term worth a trigram lookup (pg_trgm cannot index fewer characters)
+MIN_TRIGRAM_LENGTH = 3
+# Shortest digit run treated as a phone number prefix
+MIN_PHONE_DIGITS = 3
+
+
+class AppointmentSearchService:
+    """Ranked appointment search for the admin appointment list.
+
+    On Postgres, each name column (customer username, staff name, service
+    name) is matched on its own through a pg_trgm GIN index, both as a
+    substring (``ILIKE``) and fuzzily (word similarity).  The matching IDs
+    are fed to the appointments table as ``= ANY(ARRAY(...))`` so the
+    planner can combine the foreign key indexes with the phone prefix index
+    in one bitmap scan instead of scanning the joined tables.
+
+    Phone numbers are compared as digits only (``Appointment.phone_digits``),
+    so ``912-345`` finds ``(912) 345 678`` by prefix.
+
+    Results are ranked by the best word similarity of any field (1 for a
+    phone prefix match), then by date.  Other databases (SQLite in
+    development) fall back to unranked substring matching.
+
+    The trigram indexes are created by migration 9a41c7e2d5b8.
+    """
+
+    @staticmethod
+    def _like_pattern(term: str) -> str:
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f'%{escaped}%'
+
+    @staticmethod
+    def _matching_ids(column, id_column, term: str):
+        """ARRAY(SELECT id ...) of rows whose ``column`` matches the term"""
+        predicates = [column.ilike(AppointmentSearchService._like_pattern(term), escape='\\')]
+        if len(term) >= MIN_TRIGRAM_LENGTH:
+            # word_similarity(term, column) above pg_trgm.word_similarity_threshold
+            predicates.append(column.op('%>')(term))
+        # Uncorrelated, so it runs once even though the outer query joins the same table
+        return func.array(select([id_column]).where(or_(*predicates)).correlate(None).as_scalar())
+
+    @staticmethod
+    def search(query: Query, term: str, model=Appointment) -> Query:
+        """
+        Restrict an appointment query to a search term and order it by relevance
+
+        Args:
+            query: Appointment query already joined with Staff, Service and (outer) User
+            term: Free text: customer, staff or service name, or phone number
+            model: Appointment or ArchivedAppointment (the model ``query`` selects)
+
+        Returns:
+            Filtered and ordered query (date order when the term is blank)
+        """
+        term = (term or '').strip()
+        if not term:
+            return query.order_by(model.date.desc(), model.start_time.desc())
+
+        digits = normalize_phone(term)
+        if db.session.get_bind().dialect.name != 'postgresql':
+            pattern = AppointmentSearchService._like_pattern(term)
+            predicates = [
+                User.username.ilike(pattern, escape='\\'),
+                Staff.name.ilike(pattern, escape='\\'),
+                Service.name.ilike(pattern, escape='\\'),
+            ]
+            if len(digits) >= MIN_PHONE_DIGITS:
+                predicates.append(model.phone_digits.like(f'{digits}%'))
+            return query.filter(or_(*predicates)).order_by(
+                model.date.desc(), model.start_time.desc()
+            )
+
+        predicates = [
+            model.user_id == any_(AppointmentSearchService._matching_ids(User.username, User.id, term)),
+            model.staff_id == any_(AppointmentSearchService._matching_ids(Staff.name, Staff.id, term)),
+            model.service_id == any_(AppointmentSearchService._matching_ids(Service.name, Service.id, term)),
+        ]
+        scores = [
+            func.word_similarity(term, User.username),
+            func.word_similarity(term, Staff.name),
+            func.word_similarity(term, Service.name),
+        ]
+        if len(digits) >= MIN_PHONE_DIGITS:
+            phone_match = model.phone_digits.like(f'{digits}%')
+            predicates.append(phone_match)
+            scores.append(case([(phone_match, 1.0)], else_=0.0))
+
+        # GREATEST ignores the NULL score of guest bookings (no user)
+        rank = func.greatest(*scores)
+        return query.filter(or_(*predicates)).order_by(
+            rank.desc(), model.date.desc(), model.start_time.desc()
+        )
@@ -0,0 +1,160 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, literal, select
+
+from src import events
+from src.models import db, Appointment, Staff
+from src.models.appointment import AppointmentStatus
+
+
+# Statuses each status may change to.  Completed and cancelled appointments
+# are final: a cancelled booking is rebooked as a new appointment.
+TRANSITIONS = {
+    AppointmentStatus.PENDING: {AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS,
+                                AppointmentStatus.CANCELLED},
+    AppointmentStatus.CONFIRMED: {AppointmentStatus.PENDING, AppointmentStatus.IN_PROGRESS,
+                                  AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED},
+    AppointmentStatus.IN_PROGRESS: {AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED},
+    AppointmentStatus.COMPLETED: set(),
+    AppointmentStatus.CANCELLED: set(),
+}
+
+# Statuses completed by the end-of-day job once the appointment has ended
+AUTO_COMPLETE_FROM = (AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS)
+
+
+class AppointmentStatusService:
+    """Appointment status changes, one at a time or in bulk.
+
+    Bulk changes run as one set-based ``UPDATE ... RETURNING`` (on Postgres)
+    restricted to appointments whose current status may change to the new
+    one, so rows changed concurrently into a final status are skipped rather
+    than overwritten.  Bulk statements bypass the ORM, so the live calendar
+    events are published here for every returned row.
+    """
+
+    @staticmethod
+    def can_transition(current: AppointmentStatus, new: AppointmentStatus) -> bool:
+        """Whether ``current`` may change to ``new`` (keeping the same status is allowed)"""
+        return current == new or new in TRANSITIONS[current]
+
+    @staticmethod
+    def check_transition(current: AppointmentStatus, new: AppointmentStatus) -> Optional[str]:
+        """Error message when ``current`` may not change to ``new``, else None"""
+        if AppointmentStatusService.can_transition(current, new):
+            return None
+        return f'Cannot change status from {current.value} to {new.value}'
+
+    @staticmethod
+    def parse_statuses(values: Iterable[str]) -> Tuple[List[AppointmentStatus], Optional[str]]:
+        """Parse status values (e.g. ['pending', 'confirmed'])"""
+        statuses = []
+        for value in values:
+            try:
+                statuses.append(AppointmentStatus(value))
+            except ValueError:
+                return [], f'Invalid status value: {value}'
+        return statuses, None
+
+    @staticmethod
+    def bulk_transition(status: AppointmentStatus,
+                        from_statuses: Optional[Iterable[AppointmentStatus]] = None,
+                        salon_id: Optional[int] = None,
+                        staff_id: Optional[int] = None,
+                        date_from: Optional[date] = None,
+                        date_to: Optional[date] = None,
+                        ended_before: Optional[datetime] = None,
+                        appointment_ids: Optional[Iterable[int]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Change the status of every matching appointment in one statement
+
+        Args:
+            status: New status
+            from_statuses: Only change appointments in these statuses
+                (default: every status that may change to ``status``)
+            salon_id: Only appointments of this salon's staff
+            staff_id: Only appointments of this staff member
+            date_from: Only appointments on or after this date
+            date_to: Only appointments on or before this date
+            ended_before: Only appointments ending at or before this time
+            appointment_ids: Only these appointments
+
+        Returns:
+            Tuple of (changed appointments as event payloads, error_message)
+        """
+        if date_from is None and date_to is None and ended_before is None and appointment_ids is None:
+            return [], 'A date, end time or appointment IDs are required'
+
+        if from_statuses is None:
+            sources = [current for current, allowed in TRANSITIONS.items() if status in allowed]
+        else:
+            sources = list(dict.fromkeys(from_statuses))
+            for current in sources:
+                error = AppointmentStatusService.check_transition(current, status)
+                if error:
+                    return [], error
+            sources = [current for current in sources if current != status]
+        if not sources:
+            return [], None
+
+        table = Appointment.__table__
+        conditions = [table.c.status.in_(sources)]
+        if salon_id is not None:
+            conditions.append(table.c.staff_id.in_(select([Staff.id]).where(Staff.salon_id == salon_id)))
+        if staff_id is not None:
+            conditions.append(table.c.staff_id == staff_id)
+        if date_from is not None:
+            conditions.append(table.c.date >= date_from)
+        if date_to is not None:
+            conditions.append(table.c.date <= date_to)
+        if ended_before is not None:
+            conditions.append(table.c.end_time <= ended_before)
+        if appointment_ids is not None:
+            conditions.append(table.c.id.in_(list(appointment_ids)))
+        condition = and_(*conditions)
+
+        # Salon of each row for the event streams, without a separate lookup
+        salon = select([Staff.salon_id]).where(Staff.id == table.c.staff_id).as_scalar().label('salon_id')
+        columns = [table.c[name] for name in events.EVENT_FIELDS if name != 'status']
+        update = table.update().where(condition).values(status=status)
+
+        try:
+            if db.session.get_bind().dialect.name == 'postgresql':
+                rows = db.session.execute(update.returning(table.c.status, salon, *columns)).fetchall()
+            else:
+                # No RETURNING: lock and read the matching rows, then update them by ID
+                new_status = literal(status, table.c.status.type).label('status')
+                rows = db.session.execute(
+                    select([new_status, salon] + columns).where(condition).with_for_update()
+                ).fetchall()
+                if rows:
+                    db.session.execute(
+                        table.update().where(table.c.id.in_([row.id for row in rows])).values(status=status)
+                    )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return [], f'Error updating appointment statuses: {str(e)}'
+
+        action = events.CANCELLED if status == AppointmentStatus.CANCELLED else events.UPDATED
+        changed = [events.appointment_event(row, action, row.salon_id) for row in rows]
+        events.publish(changed)
+        return changed, None
+
+    @staticmethod
+    def auto_complete(now: Optional[datetime] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Complete confirmed and in-progress appointments that have ended
+
+        Args:
+            now: Cut-off time (default: now, server time)
+
+        Returns:
+            Tuple of (completed appointments as event payloads, error_message)
+        """
+        return AppointmentStatusService.bulk_transition(
+            AppointmentStatus.COMPLETED,
+            from_statuses=AUTO_COMPLETE_FROM,
+            ended_before=now or datetime.now(),
+        )
@@ -0,0 +1,214 @@
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from src.cache import LocalLRU
+from src.models import db, Staff, TimeOff
+from src.models.time_off import TimeOffReason
+from src.services.catalog_service import CatalogService
+from src.settings import Settings as S
+
+
+class IntervalIndex:
+    """Static set of half-open intervals supporting overlap queries.
+
+    Intervals are sorted by start, with a running maximum of their ends:
+    a query bisects to the last interval starting before its end and walks
+    back only while an earlier interval could still reach its start.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, Any]]):
+        self.intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in self.intervals]
+        self.max_ends = []
+        for _, end, _ in self.intervals:
+            self.max_ends.append(max(end, self.max_ends[-1]) if self.max_ends else end)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime, Any]]:
+        """Intervals overlapping [start, end), in start order"""
+        found = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.intervals[i][1] > start:
+                found.append(self.intervals[i])
+            i -= 1
+        found.reverse()
+        return found
+
+
+# Interval indexes per salon, rebuilt when the catalog snapshot changes
+_indexes = LocalLRU(maxsize=S.CATALOG_LOCAL_CACHE_SIZE)
+
+
+class TimeOffService:
+    """Staff time off and salon blackouts.
+
+    Availability checks read a salon's upcoming periods from its catalog
+    snapshot and query them through per-staff interval indexes kept in
+    process memory, so blocking a day for every staff member adds no
+    queries to availability probes.
+    """
+
+    @staticmethod
+    def _indexes_for(salon_id: int, snapshot: Optional[Dict[str, Any]] = None) -> Dict[Optional[int], IntervalIndex]:
+        snapshot = snapshot or CatalogService.get_snapshot(salon_id)
+        if not snapshot:
+            return {}
+
+        cached = _indexes.get(salon_id)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+
+        by_staff: Dict[Optional[int], list] = {}
+        for staff_id, start, end, reason in snapshot.get('time_off', []):
+            by_staff.setdefault(staff_id, []).append(
+                (datetime.fromisoformat(start), datetime.fromisoformat(end), reason)
+            )
+        indexes = {staff_id: IntervalIndex(intervals) for staff_id, intervals in by_staff.items()}
+        _indexes.set(salon_id, (snapshot, indexes))
+        return indexes
+
+    @staticmethod
+    def get_blocked_intervals(staff_id: int, salon_id: int, start: datetime, end: datetime,
+                              snapshot: Optional[Dict[str, Any]] = None) -> List[Tuple[datetime, datetime, str]]:
+        """
+        Get the time off and salon blackouts overlapping a period
+
+        Args:
+            staff_id: Staff ID
+            salon_id: Salon of the staff member
+            start: Period start
+            end: Period end
+            snapshot: The salon's catalog snapshot, when the caller already has it
+
+        Returns:
+            (start, end, reason) tuples in start order
+        """
+        indexes = TimeOffService._indexes_for(salon_id, snapshot)
+        blocked = []
+        for key in (staff_id, None):
+            if key in indexes:
+                blocked.extend(indexes[key].overlapping(start, end))
+        return sorted(blocked, key=lambda interval: interval[0])
+
+    @staticmethod
+    def find_conflict(staff_id: int, salon_id: int, start: datetime, end: datetime) -> Optional[str]:
+        """
+        Describe the time off preventing a booking, if any
+
+        Returns:
+            Conflict message, or None if the staff member is not off
+        """
+        blocked = TimeOffService.get_blocked_intervals(staff_id, salon_id, start, end)
+        if not blocked:
+            return None
+        # The reason stays private: this message reaches customers
+        block_start, block_end, _ = blocked[0]
+        return (f"Staff is unavailable from {block_start.strftime('%Y-%m-%d %H:%M')} "
+                f"to {block_end.strftime('%Y-%m-%d %H:%M')}")
+
+    @staticmethod
+    def _parse_period(data: Dict[str, Any]) -> Tuple[Optional[Tuple[datetime, datetime]], Optional[str]]:
+        """Accept either start_at/end_at datetimes or whole days (start_date/end_date, inclusive)"""
+        try:
+            if 'start_date' in data:
+                start = datetime.combine(date.fromisoformat(data['start_date']), time())
+                end = datetime.combine(date.fromisoformat(data.get('end_date') or data['start_date']), time()) + timedelta(days=1)
+            else:
+                start = datetime.fromisoformat(data['start_at'])
+                end = datetime.fromisoformat(data['end_at'])
+        except KeyError as e:
+            return None, f'Missing required field: {e.args[0]}'
+        except (TypeError, ValueError):
+            return None, 'Invalid date format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM'
+        if start >= end:
+            return None, 'The period must end after it starts'
+        return (start, end), None
+
+    @staticmethod
+    def create_time_off(data: Dict[str, Any], salon_id: int, staff: Optional[Staff] = None) -> Tuple[Optional[TimeOff], Optional[str]]:
+        """
+        Block a period for a staff member, or for a whole salon
+
+        Args:
+            data: ``start_at``/``end_at`` (ISO datetimes) or ``start_date``/``end_date`` (whole days),
+                  plus optional ``reason`` and ``note``
+            salon_id: Salon ID
+            staff: Staff member, or None for a salon-wide blackout
+
+        Returns:
+            Tuple of (time_off, error_message)
+        """
+        period, error = TimeOffService._parse_period(data)
+        if error:
+            return None, error
+        try:
+            reason = TimeOffReason(data.get('reason', TimeOffReason.OTHER.value))
+        except ValueError:
+            return None, f"Invalid reason. Use one of: {', '.join(r.value for r in TimeOffReason)}"
+
+        try:
+            time_off = TimeOff.create(
+                staff_id=staff.id if staff else None,
+                salon_id=salon_id,
+                reason=reason,
+                note=data.get('note'),
+                start_at=period[0],
+                end_at=period[1]
+            )
+        except Exception as e:
+            db.session.rollback()
+            return None, f'Failed to create time off: {str(e)}'
+
+        CatalogService.refresh(salon_id)
+        return time_off, None
+
+    @staticmethod
+    def delete_time_off(time_off: TimeOff) -> Tuple[bool, Optional[str]]:
+        """
+        Delete a time off period
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        salon_id = time_off.salon_id
+        try:
+            db.session.delete(time_off)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return False, f'Failed to delete time off: {str(e)}'
+
+        CatalogService.refresh(salon_id)
+        return True, None
+
+    @staticmethod
+    def list_time_off(salon_id: int, start: datetime, end: datetime, staff_id: Optional[int] = None) -> List[TimeOff]:
+        """
+        List the periods of a salon overlapping [start, end)
+
+        Args:
+            salon_id: Salon ID
+            start: Range start
+            end: Range end
+            staff_id: Only this staff member's time off (salon blackouts are always included)
+
+        Returns:
+            Time off periods in start order
+        """
+        query = TimeOff.query.filter(TimeOff.salon_id == salon_id)
+        if staff_id:
+            query = query.filter((TimeOff.staff_id == staff_id) | TimeOff.staff_id.is_(None))
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # Served by the GiST index on tsrange(start_at, end_at)
+            query = query.filter(
+                func.tsrange(TimeOff.start_at, TimeOff.end_at).op('&&')(func.tsrange(start, end))
+            )
+        else:
+            query = query.filter(TimeOff.start_at < end, TimeOff.end_at > start)
+        return query.order_by(TimeOff.start_at).all()
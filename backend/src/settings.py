@@ -1,4 +1,5 @@
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,21 +14,120 @@ class Parse:
         """Parse booleans (defaults to False)"""
         return os.getenv(field, '').lower() in ['true', '1']
 
+    @staticmethod
+    def int(field, default):
+        """Parse integers (falls back to default when unset or invalid)"""
+        try:
+            return int(os.getenv(field, default))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def float(field, default):
+        """Parse floats (falls back to default when unset or invalid)"""
+        try:
+            return float(os.getenv(field, default))
+        except (TypeError, ValueError):
+            return default
+
 
 class Settings:
 
     # General
     DEV = Parse.bool('DEV')
+    # Set by the uWSGI gevent profile (filesystem/entrypoints/web.sh)
+    GEVENT = Parse.bool('GEVENT')
     REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
     REDIS_URL = os.getenv('REDIS_URL', f'redis://{REDIS_HOST}:6379')
+    REDIS_SOCKET_TIMEOUT = Parse.float('REDIS_SOCKET_TIMEOUT', 0.5)
 
     # Flask
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-this-in-production')
 
+    # Request instrumentation.  Requests slower than SLOW_REQUEST_MS are
+    # logged with their SQL statements (0 disables).  /metrics is served only
+    # when METRICS_TOKEN is set, to requests with "Authorization: Bearer <token>".
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ['true', '1']
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    SLOW_REQUEST_MS = Parse.int('SLOW_REQUEST_MS', 1000)
+    SLOW_REQUEST_LOG_QUERIES = os.getenv('SLOW_REQUEST_LOG_QUERIES', 'true').lower() in ['true', '1']
+
+    # N+1 detection: flag requests running the same SQL shape more than
+    # QUERY_GUARD_THRESHOLD times (warns, or raises with QUERY_GUARD_RAISE)
+    QUERY_GUARD_ENABLED = Parse.bool('QUERY_GUARD_ENABLED') or DEV
+    QUERY_GUARD_THRESHOLD = Parse.int('QUERY_GUARD_THRESHOLD', 5)
+    QUERY_GUARD_RAISE = Parse.bool('QUERY_GUARD_RAISE')
+
     # Database - Use absolute path to avoid confusion
     AES_SECRET_KEY = os.getenv('AES_SECRET_KEY', 'fake-aes-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool, per process (see src/database.py).  With DB_PGBOUNCER
+    # the app keeps no pool and relies on PgBouncer in transaction mode.
+    DB_POOL_SIZE = Parse.int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = Parse.int('DB_MAX_OVERFLOW', 5)
+    DB_POOL_TIMEOUT = Parse.int('DB_POOL_TIMEOUT', 10)
+    DB_POOL_RECYCLE = Parse.int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ['true', '1']
+    DB_STATEMENT_TIMEOUT_MS = Parse.int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    DB_PGBOUNCER = Parse.bool('DB_PGBOUNCER')
+    # Optional streaming replica for GET requests and chatbot catalog tools.
+    # Falls back to the primary while it lags more than DB_REPLICA_MAX_LAG
+    # seconds (checked every DB_REPLICA_LAG_CHECK_INTERVAL seconds).
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    DB_REPLICA_MAX_LAG = Parse.float('DB_REPLICA_MAX_LAG', 5.0)
+    DB_REPLICA_LAG_CHECK_INTERVAL = Parse.float('DB_REPLICA_LAG_CHECK_INTERVAL', 5.0)
+    DB_REPLICA_STICKY_SECONDS = Parse.int('DB_REPLICA_STICKY_SECONDS', 10)
+
+    # HTTP caching for catalog endpoints (salons, services, staff).
+    # Browsers always revalidate (max-age=0); a CDN may serve its copy for
+    # CATALOG_CACHE_S_MAXAGE seconds and revalidate in the background.
+    CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'true').lower() in ['true', '1']
+    CATALOG_CACHE_MAX_AGE = Parse.int('CATALOG_CACHE_MAX_AGE', 0)
+    CATALOG_CACHE_S_MAXAGE = Parse.int('CATALOG_CACHE_S_MAXAGE', 60)
+    CATALOG_CACHE_STALE_WHILE_REVALIDATE = Parse.int('CATALOG_CACHE_STALE_WHILE_REVALIDATE', 300)
+
+    # Catalog snapshots: per-process LRU size and Redis TTL (seconds)
+    CATALOG_LOCAL_CACHE_SIZE = Parse.int('CATALOG_LOCAL_CACHE_SIZE', 128)
+    CATALOG_SNAPSHOT_TTL = Parse.int('CATALOG_SNAPSHOT_TTL', 24 * 60 * 60)
+
+    # Bookings sent with an Idempotency-Key header are claimed in Redis for
+    # IDEMPOTENCY_LOCK_SECONDS and their response is replayed to retries for
+    # IDEMPOTENCY_TTL_SECONDS.  The claim must outlive a request killed by
+    # harakiri, so it defaults to 30 seconds more than HERESALON_UWSGI_HARAKIRI
+    # (set by filesystem/entrypoints/web.sh; 120 for the gevent profile).
+    IDEMPOTENCY_ENABLED = os.getenv('IDEMPOTENCY_ENABLED', 'true').lower() in ['true', '1']
+    IDEMPOTENCY_LOCK_SECONDS = Parse.int('IDEMPOTENCY_LOCK_SECONDS', Parse.int('HERESALON_UWSGI_HARAKIRI', 120) + 30)
+    IDEMPOTENCY_TTL_SECONDS = Parse.int('IDEMPOTENCY_TTL_SECONDS', 86400)
+
+    # Live calendar events (src/events.py).  Appointment changes are appended
+    # to per-salon and per-staff Redis streams of EVENTS_STREAM_MAXLEN entries;
+    # SSE connections send a keep-alive every EVENTS_HEARTBEAT_SECONDS and
+    # are closed after EVENTS_CONNECTION_SECONDS, below the uWSGI harakiri
+    # timeout (clients reconnect and resume with Last-Event-ID).
+    EVENTS_ENABLED = os.getenv('EVENTS_ENABLED', 'true').lower() in ['true', '1']
+    EVENTS_STREAM_MAXLEN = Parse.int('EVENTS_STREAM_MAXLEN', 1000)
+    EVENTS_HEARTBEAT_SECONDS = Parse.int('EVENTS_HEARTBEAT_SECONDS', 15)
+    EVENTS_CONNECTION_SECONDS = Parse.int('EVENTS_CONNECTION_SECONDS', 55)
+
+    # Admin reports read a columnar snapshot of the appointments
+    # (src/services/analytics_service.py), rebuilt daily at
+    # ANALYTICS_SNAPSHOT_HOUR (server time, outside business hours) into
+    # ANALYTICS_DIR, which the web and worker containers must share.
+    ANALYTICS_DIR = os.getenv('ANALYTICS_DIR', 'data/analytics')
+    ANALYTICS_SNAPSHOT_HOUR = Parse.int('ANALYTICS_SNAPSHOT_HOUR', 3)
+
+    # Confirmed and in-progress appointments that have ended are marked
+    # completed every day at AUTO_COMPLETE_HOUR:55 (server time)
+    AUTO_COMPLETE_HOUR = Parse.int('AUTO_COMPLETE_HOUR', 23)
+
+    # Completed and cancelled appointments older than ARCHIVE_AFTER_MONTHS
+    # (whole months) are moved to appointments_archive daily at ARCHIVE_HOUR
+    # (src/services/archive_service.py), ARCHIVE_BATCH_SIZE rows per transaction.
+    ARCHIVE_AFTER_MONTHS = Parse.int('ARCHIVE_AFTER_MONTHS', 12)
+    ARCHIVE_BATCH_SIZE = Parse.int('ARCHIVE_BATCH_SIZE', 5000)
+    ARCHIVE_HOUR = Parse.int('ARCHIVE_HOUR', 4)
 
     # Celery
     CELERY_BROKER_URL = REDIS_URL
@@ -39,6 +139,18 @@ class Settings:
                 'args': (1,),
                 'schedule': 5.0,
             },
+            'build_analytics_snapshot': {
+                'task': 'src.tasks.build_analytics_snapshot',
+                'schedule': crontab(hour=ANALYTICS_SNAPSHOT_HOUR, minute=0),
+            },
+            'auto_complete_appointments': {
+                'task': 'src.tasks.auto_complete_appointments',
+                'schedule': crontab(hour=AUTO_COMPLETE_HOUR, minute=55),
+            },
+            'archive_appointments': {
+                'task': 'src.tasks.archive_appointments',
+                'schedule': crontab(hour=ARCHIVE_HOUR, minute=30),
+            },
         }
     }
     LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")  # either "openai" or "gemini"
@@ -37,6 +37,9 @@ class Tasks:
         """Bind the Celery app to all the tasks"""
         # NOTE: DONT
         cls.ping_once = celery.task(cls.ping_once)
+        cls.build_analytics_snapshot = celery.task(cls.build_analytics_snapshot)
+        cls.auto_complete_appointments = celery.task(cls.auto_complete_appointments)
+        cls.archive_appointments = celery.task(cls.archive_appointments)
 
     @staticmethod
     def ping_once(amount):
@@ -44,3 +47,29 @@ class Tasks:
         print(f"Ping task executed with amount: {amount}")
         # Can add other logic here if needed
         return f"Ping completed with amount: {amount}"
+
+    @staticmethod
+    def build_analytics_snapshot():
+        """Rebuild the columnar appointment snapshot used by admin reports"""
+        from src.services.analytics_service import AnalyticsService
+        counts = AnalyticsService.build_snapshot()
+        print(f"Analytics snapshot built: {counts}")
+        return counts
+
+    @staticmethod
+    def auto_complete_appointments():
+        """Mark confirmed and in-progress appointments that have ended as completed"""
+        from src.services.status_service import AppointmentStatusService
+        changed, error = AppointmentStatusService.auto_complete()
+        if error:
+            raise RuntimeError(error)
+        print(f"Appointments auto-completed: {len(changed)}")
+        return len(changed)
+
+    @staticmethod
+    def archive_appointments():
+        """Move old completed and cancelled appointments to the archive table"""
+        from src.services.archive_service import ArchiveService
+        moved = ArchiveService.archive_appointments()
+        print(f"Appointments archived: {moved}")
+        return moved
@@ -0,0 +1,135 @@
+"""Shared fixtures: an in-memory SQLite database and a fake Redis per test.
+
+Run from ``backend/``::
+
+    poetry run python -m pytest
+"""
+import os
+
+# Settings are read at import time, so configure them before importing the app
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.pop('DATABASE_REPLICA_URL', None)
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ['QUERY_GUARD_ENABLED'] = 'false'
+os.environ['SLOW_REQUEST_MS'] = '0'
+os.environ['METRICS_TOKEN'] = 'test-metrics-token'
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import fakeredis
+import pytest
+
+import src.cache
+from src.entry import flask_app
+from src.models import db, Appointment, Salon, Service, ServiceType, Staff, Seniority, User, UserRole
+from src.query_guard import track_queries
+from src.routes.api.auth import encode_jwt_token
+from src.services import catalog_service, time_off_service
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def redis():
+    """Fake Redis, and empty process-local caches that are keyed by its versions."""
+    client = fakeredis.FakeRedis()
+    src.cache._client = client
+    src.cache._blocking_client = client
+    for cache in (catalog_service._local_snapshots, catalog_service._durations, time_off_service._indexes):
+        cache.clear()
+    yield client
+    src.cache._client = None
+    src.cache._blocking_client = None
+
+
+@pytest.fixture
+def query_guard(request):
+    """Fail the test if any statement shape runs more than QUERY_GUARD_THRESHOLD times."""
+    with track_queries(request.node.nodeid, raise_on_violation=True) as tracker:
+        yield tracker
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def salon(app):
+    return Salon.create(name='Salon', start_working_time=time(9), end_working_time=time(18))
+
+
+@pytest.fixture
+def service(salon):
+    return Service.create(name='Gel Manicure', salon_id=salon.id, type=ServiceType.NAIL_CARE,
+                          price=Decimal('25.50'), duration=45)
+
+
+@pytest.fixture
+def staffs(salon):
+    return [Staff.create(name=f'Staff {i}', salon_id=salon.id, role=1, seniority=Seniority.SENIOR)
+            for i in range(3)]
+
+
+@pytest.fixture
+def customer(app):
+    return User.create(username='customer', email='customer@example.com', role=UserRole.CUSTOMER)
+
+
+@pytest.fixture
+def admin(app):
+    return User.create(username='admin', email='admin@example.com', role=UserRole.ADMIN)
+
+
+@pytest.fixture
+def manager(salon):
+    # The model's check_manager_has_salon compares the role with its value
+    # while the column stores enum names; migrations do not create it
+    db.session.execute('PRAGMA ignore_check_constraints = ON')
+    yield User.create(username='manager', email='manager@example.com', role=UserRole.MANAGER, salon_id=salon.id)
+    db.session.execute('PRAGMA ignore_check_constraints = OFF')
+
+
+@pytest.fixture
+def admin_client(client, admin):
+    """Test client logged in to the admin interface."""
+    with client.session_transaction() as session:
+        session['admin_id'] = admin.id
+        session['admin_username'] = admin.username
+    return client
+
+
+def bearer(user):
+    """Authorization header of an API token for ``user``."""
+    return {'Authorization': f"Bearer {encode_jwt_token({'user_id': user.id})}"}
+
+
+@pytest.fixture
+def auth_headers(customer):
+    return bearer(customer)
+
+
+@pytest.fixture
+def tomorrow():
+    return date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def make_appointment(service, customer):
+    """Create an appointment (past dates bypass the model's date validator)."""
+    def make(staff, day, start, end, status='PENDING'):
+        values = dict(staff_id=staff.id, service_id=service.id, user_id=customer.id, status=status, date=day,
+                      start_time=datetime.combine(day, start), end_time=datetime.combine(day, end))
+        result = db.session.execute(Appointment.__table__.insert(), values)
+        db.session.commit()
+        return Appointment.query.get(result.inserted_primary_key[0])
+    return make
@@ -0,0 +1,20 @@
+from datetime import time
+
+
+def test_month_outside_supported_years_is_rejected(admin_client):
+    for year in (0, 10000, 9999):
+        response = admin_client.get(f'/admin/appointments/calendar.json?year={year}&month=12')
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid year'}
+
+    assert admin_client.get('/admin/appointments/calendar.json?year=2024&month=13').status_code == 400
+
+
+def test_month_counts_cover_the_visible_grid(admin_client, staffs, tomorrow, make_appointment):
+    make_appointment(staffs[0], tomorrow, time(10), time(11))
+    make_appointment(staffs[1], tomorrow, time(10), time(11))
+
+    response = admin_client.get(f'/admin/appointments/calendar.json?year={tomorrow.year}&month={tomorrow.month}')
+
+    assert response.status_code == 200
+    assert response.get_json()['days'][tomorrow.isoformat()]['total'] == 2
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import time, timedelta
+
+import pytest
+
+from src.models import Salon, Staff
+
+
+@pytest.fixture
+def history(staffs, tomorrow, make_appointment):
+    """Three appointments on consecutive days, the last one cancelled."""
+    return [
+        make_appointment(staffs[0], tomorrow, time(9), time(9, 45)),
+        make_appointment(staffs[1], tomorrow + timedelta(days=1), time(10), time(10, 45)),
+        make_appointment(staffs[0], tomorrow + timedelta(days=2), time(11), time(11, 45), 'CANCELLED'),
+    ]
+
+
+def export(client, **params):
+    response = client.get('/admin/appointments/export', query_string=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_csv_export(admin_client, history, staffs, service, customer, tomorrow):
+    response = export(admin_client)
+
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="appointments-')
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert sorted(int(row['id']) for row in rows) == [appointment.id for appointment in history]
+    first = next(row for row in rows if int(row['id']) == history[0].id)
+    assert first == {
+        'id': str(history[0].id), 'date': tomorrow.isoformat(), 'start_time': '09:00', 'end_time': '09:45',
+        'status': 'pending', 'salon_id': str(staffs[0].salon_id), 'staff_id': str(staffs[0].id),
+        'staff_name': 'Staff 0', 'service_id': str(service.id), 'service_name': 'Gel Manicure',
+        'price': '25.5', 'customer': customer.username, 'phone_number': '',
+    }
+
+
+def test_ndjson_export(admin_client, history):
+    response = export(admin_client, format='ndjson')
+
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(row['id'] for row in rows) == sorted(appointment.id for appointment in history)
+    assert {row['status'] for row in rows} == {'pending', 'cancelled'}
+    assert all(isinstance(row['price'], float) for row in rows)
+
+
+def test_export_filters(admin_client, history, staffs, tomorrow):
+    def ids(**params):
+        return sorted(row['id'] for row in map(json.loads, export(admin_client, format='ndjson', **params)
+                                                 .get_data(as_text=True).splitlines()))
+
+    assert ids(date_from=(tomorrow + timedelta(days=1)).isoformat()) == [history[1].id, history[2].id]
+    assert ids(date_to=(tomorrow + timedelta(days=1)).isoformat()) == [history[0].id, history[1].id]
+    assert ids(date_from=(tomorrow + timedelta(days=1)).isoformat(),
+               date_to=(tomorrow + timedelta(days=1)).isoformat()) == [history[1].id]
+    assert ids(status='cancelled') == [history[2].id]
+    assert ids(staff=staffs[0].id) == [history[0].id, history[2].id]
+
+
+def test_manager_exports_only_their_salon(client, manager, history, tomorrow, make_appointment):
+    other_salon = Salon.create(name='Other', start_working_time=time(9), end_working_time=time(18))
+    other_staff = Staff.create(name='Other staff', salon_id=other_salon.id, role=1)
+    make_appointment(other_staff, tomorrow, time(9), time(10))
+    with client.session_transaction() as session:
+        session['admin_id'] = manager.id
+        session['admin_username'] = manager.username
+
+    rows = export(client, format='ndjson').get_data(as_text=True).splitlines()
+
+    assert sorted(json.loads(row)['id'] for row in rows) == sorted(appointment.id for appointment in history)
+
+
+def test_export_rejects_unknown_formats(admin_client):
+    response = admin_client.get('/admin/appointments/export?format=xlsx')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'format must be csv or ndjson'}
@@ -0,0 +1,184 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.models import Salon, Service, ServiceType, Staff
+from src.services import analytics_service
+from src.services.analytics_service import AnalyticsService, _covered_minutes
+from src.services.schedule_service import ScheduleService
+from src.settings import Settings as S
+
+DAY = date(2024, 3, 4)  # a Monday
+TODAY = DAY + timedelta(days=7)
+
+
+@pytest.fixture(autouse=True)
+def analytics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(S, 'ANALYTICS_DIR', str(tmp_path))
+    monkeypatch.setitem(analytics_service._loaded, 'mtime', None)
+    monkeypatch.setitem(analytics_service._loaded, 'data', None)
+
+
+def report(salon_id=None):
+    AnalyticsService.build_snapshot()
+    return AnalyticsService.report(DAY, DAY, salon_id, today=TODAY)
+
+
+def test_covered_minutes_merges_overlaps_per_key():
+    keys = np.array([2, 1, 1, 1, 2])
+    starts = np.array([0, 100, 130, 300, 10])
+    ends = np.array([60, 160, 190, 310, 20])
+
+    ids, minutes = _covered_minutes(keys, starts, ends)
+
+    assert ids.tolist() == [1, 2]
+    # Key 1: 100-190 and 300-310; key 2: 0-60 contains 10-20
+    assert minutes.tolist() == [100.0, 60.0]
+
+
+def test_no_snapshot_yet(app):
+    assert AnalyticsService.report(DAY, DAY) is None
+
+
+def test_empty_snapshot(app, salon, staffs):
+    assert AnalyticsService.build_snapshot() == {'appointments': 0, 'salons': 1, 'staff': 3, 'services': 0}
+
+    result = AnalyticsService.report(DAY, DAY, today=TODAY)
+
+    assert result['appointments'] == 0
+    assert result['revenue_total'] == 0
+    assert result['revenue_by_salon'] == result['revenue_by_staff'] == result['revenue_by_service'] == []
+    assert result['no_show'] == []
+    assert [row['booked_minutes'] for row in result['utilization']] == [0, 0, 0]
+
+
+def test_revenue_grouping(app, salon, staffs, service, make_appointment):
+    for staff, hour in ((staffs[0], 9), (staffs[0], 10), (staffs[1], 9)):
+        make_appointment(staff, DAY, time(hour), time(hour, 45), 'COMPLETED')
+    make_appointment(staffs[1], DAY, time(11), time(11, 45), 'CANCELLED')
+
+    result = report()
+
+    assert result['appointments'] == 4
+    assert result['revenue_total'] == 76.5
+    assert result['revenue_by_salon'] == [{'id': salon.id, 'name': 'Salon', 'appointments': 3, 'revenue': 76.5}]
+    assert result['revenue_by_staff'] == [
+        {'id': staffs[0].id, 'name': 'Staff 0', 'appointments': 2, 'revenue': 51.0},
+        {'id': staffs[1].id, 'name': 'Staff 1', 'appointments': 1, 'revenue': 25.5},
+    ]
+    assert result['revenue_by_service'] == [
+        {'id': service.id, 'name': 'Gel Manicure', 'appointments': 3, 'revenue': 76.5},
+    ]
+
+
+def test_no_show_rate(app, salon, staffs, make_appointment):
+    for hour, status in ((9, 'PENDING'), (10, 'CONFIRMED'), (11, 'COMPLETED'), (12, 'IN_PROGRESS'), (13, 'CANCELLED')):
+        make_appointment(staffs[0], DAY, time(hour), time(hour, 30), status)
+
+    result = report()
+
+    # Cancelled appointments are left out; pending and confirmed ones never started
+    assert result['no_show'] == [{'salon_id': salon.id, 'name': 'Salon', 'appointments': 4, 'no_shows': 2, 'rate': 0.5}]
+    assert AnalyticsService.report(DAY, DAY, today=DAY)['no_show'] == []
+
+
+def test_utilization_counts_overlapping_bookings_once(app, staffs, make_appointment):
+    make_appointment(staffs[0], DAY, time(10), time(11), 'COMPLETED')
+    make_appointment(staffs[0], DAY, time(10, 30), time(11, 30), 'CONFIRMED')
+    make_appointment(staffs[0], DAY, time(14), time(14, 30), 'CANCELLED')
+
+    utilization = {row['staff_id']: row for row in report()['utilization']}
+
+    assert utilization[staffs[0].id]['booked_minutes'] == 90
+    # Salon open 9:00-18:00
+    assert utilization[staffs[0].id]['utilization'] == round(90 / 540, 4)
+    assert utilization[staffs[1].id]['booked_minutes'] == 0
+
+
+def test_salon_scoping(app, salon, staffs, service, make_appointment):
+    other_salon = Salon.create(name='Other', start_working_time=time(10), end_working_time=time(18))
+    other_staff = Staff.create(name='Other staff', salon_id=other_salon.id, role=1)
+    other_service = Service.create(name='Haircut', salon_id=other_salon.id, type=ServiceType.NAIL_CARE,
+                                   price=Decimal('40'), duration=30)
+    make_appointment(staffs[0], DAY, time(9), time(9, 45), 'COMPLETED')
+    other = make_appointment(other_staff, DAY, time(10), time(10, 30), 'COMPLETED')
+    other.service_id = other_service.id
+    other.save()
+
+    everything = report()
+    scoped = AnalyticsService.report(DAY, DAY, salon.id, today=TODAY)
+
+    assert everything['revenue_total'] == 65.5
+    assert [row['id'] for row in everything['revenue_by_salon']] == [other_salon.id, salon.id]
+    assert scoped['appointments'] == 1
+    assert scoped['revenue_total'] == 25.5
+    assert [row['id'] for row in scoped['revenue_by_salon']] == [salon.id]
+    assert {row['staff_id'] for row in scoped['utilization']} == {staff.id for staff in staffs}
+
+
+WEDNESDAY = date(2024, 3, 6)
+
+
+def heatmap_query(salon_id, date_from, date_to):
+    return f'/admin/reports/utilization?format=json&salon_id={salon_id}&date_from={date_from}&date_to={date_to}'
+
+
+def test_heatmap_counts_overlapping_bookings_once(app, salon, staffs, make_appointment):
+    make_appointment(staffs[0], WEDNESDAY, time(10), time(11))
+    make_appointment(staffs[0], WEDNESDAY, time(10, 30), time(11, 30))
+
+    report = AnalyticsService.utilization_heatmap(salon.id, WEDNESDAY, WEDNESDAY)
+    row = report['staff'][0]
+
+    assert row['booked_minutes'] == 90
+    assert row['working_minutes'] == 540
+    assert row['heatmap'][2][10] == 1.0
+    assert row['heatmap'][2][11] == 0.5
+
+
+def test_heatmap_masks_minutes_outside_shifts(app, salon, staffs, make_appointment):
+    ScheduleService.replace_weekly_schedule(staffs[0], [
+        {'day_of_week': 'wednesday', 'start_time': '10:00', 'end_time': '12:00'},
+    ])
+    make_appointment(staffs[0], WEDNESDAY, time(9), time(11))
+
+    row = AnalyticsService.utilization_heatmap(salon.id, WEDNESDAY, WEDNESDAY)['staff'][0]
+
+    assert row['booked_minutes'] == 60
+    assert row['working_minutes'] == 120
+    assert row['utilization'] == 0.5
+    assert row['heatmap'][2][9] is None
+    assert row['heatmap'][2][10] == 1.0
+    assert row['heatmap'][2][11] == 0.0
+
+
+def test_heatmap_maps_days_to_weekdays(app, salon, staffs, make_appointment):
+    # Wednesday to the following Tuesday
+    make_appointment(staffs[0], WEDNESDAY, time(9), time(10))
+    make_appointment(staffs[0], WEDNESDAY + timedelta(days=5), time(12), time(13))
+
+    report = AnalyticsService.utilization_heatmap(salon.id, WEDNESDAY, WEDNESDAY + timedelta(days=6))
+    heatmap = report['staff'][0]['heatmap']
+
+    assert heatmap[2][9] == 1.0
+    assert heatmap[0][12] == 1.0
+    assert heatmap[0][9] == heatmap[2][12] == 0.0
+    # Three staff members work every hour, one of them booked
+    assert report['heatmap'][2][9] == round(1 / 3, 3)
+
+
+def test_utilization_route_clamps_to_a_year(admin_client, salon):
+    response = admin_client.get(heatmap_query(salon.id, '2022-01-01', '2024-03-06'))
+
+    assert response.status_code == 200
+    assert response.json['date_from'] == '2023-03-06'
+    assert response.json['date_to'] == '2024-03-06'
+
+
+def test_utilization_route_unknown_salon(admin_client, salon):
+    response = admin_client.get(heatmap_query(salon.id + 1, WEDNESDAY, WEDNESDAY))
+
+    assert response.status_code == 404
+    assert response.json == {'error': 'Salon not found'}
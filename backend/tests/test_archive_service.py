@@ -0,0 +1,119 @@
+import json
+from datetime import date, time
+
+from src.models import db, Appointment, ArchivedAppointment
+from src.query_guard import track_queries
+from src.services.archive_service import ArchiveService
+
+TODAY = date(2024, 6, 15)
+
+
+def test_cutoff_is_the_first_of_an_earlier_month():
+    assert ArchiveService.cutoff(TODAY, 3) == date(2024, 3, 1)
+    assert ArchiveService.cutoff(TODAY, 6) == date(2023, 12, 1)
+    assert ArchiveService.cutoff(date(2024, 1, 31), 1) == date(2023, 12, 1)
+    assert ArchiveService.cutoff(TODAY, 0) == date(2024, 6, 1)
+
+
+def test_models_for():
+    assert ArchiveService.models_for(None) == (Appointment, ArchivedAppointment)
+    assert ArchiveService.models_for(date(2000, 1, 1)) == (Appointment, ArchivedAppointment)
+    assert ArchiveService.models_for(date.today()) == (Appointment,)
+
+
+def old_appointments(make_appointment, staff, statuses, day=date(2024, 1, 10)):
+    return [make_appointment(staff, day, time(9 + i), time(10 + i), status) for i, status in enumerate(statuses)]
+
+
+def test_only_old_final_appointments_are_archived(app, staffs, make_appointment):
+    completed, cancelled, confirmed = old_appointments(make_appointment, staffs[0], ('COMPLETED', 'CANCELLED', 'CONFIRMED'))
+    # On the cutoff day itself: kept
+    recent = make_appointment(staffs[0], date(2024, 3, 1), time(9), time(10), 'COMPLETED')
+    expected = {appointment.id: (appointment.staff_id, appointment.start_time, appointment.status)
+                for appointment in (completed, cancelled)}
+
+    assert ArchiveService.archive_appointments(months=3, batch_size=10, today=TODAY) == 2
+
+    db.session.expire_all()
+    assert sorted(appointment.id for appointment in Appointment.query) == sorted([confirmed.id, recent.id])
+    archived = {row.id: (row.staff_id, row.start_time, row.status) for row in ArchivedAppointment.query}
+    assert archived == expected
+    assert all(row.archived_at is not None for row in ArchivedAppointment.query)
+
+
+def test_batches(app, staffs, make_appointment):
+    old_appointments(make_appointment, staffs[0], ['COMPLETED'] * 5)
+    old_appointments(make_appointment, staffs[1], ['CANCELLED'] * 2)
+
+    assert ArchiveService.archive_appointments(months=3, batch_size=3, today=TODAY) == 7
+    assert Appointment.query.count() == 0
+    assert ArchivedAppointment.query.count() == 7
+
+
+def test_batch_size_equal_to_the_row_count(app, staffs, make_appointment):
+    old_appointments(make_appointment, staffs[0], ['COMPLETED'] * 4)
+
+    with track_queries('archive') as tracker:
+        assert ArchiveService.archive_appointments(months=3, batch_size=4, today=TODAY) == 4
+
+    # One batch (select, insert, delete), then an empty select ends the loop
+    assert tracker.count == 4
+    assert Appointment.query.count() == 0
+    assert ArchivedAppointment.query.count() == 4
+
+
+def test_nothing_to_archive(app):
+    assert ArchiveService.archive_appointments(months=3, batch_size=10, today=TODAY) == 0
+    assert ArchivedAppointment.query.count() == 0
+
+
+OLD_DAY = date(2020, 1, 8)
+
+
+def archived_history(make_appointment, staffs, tomorrow):
+    """An archived completed appointment and a current one: (archived_id, current_id)"""
+    archived = make_appointment(staffs[0], OLD_DAY, time(9), time(10), 'COMPLETED').id
+    current = make_appointment(staffs[1], tomorrow, time(9), time(10)).id
+    assert ArchiveService.archive_appointments(months=1) == 1
+    return archived, current
+
+
+def test_export_includes_archived_appointments(admin_client, staffs, tomorrow, make_appointment):
+    archived, current = archived_history(make_appointment, staffs, tomorrow)
+
+    def export(query):
+        return admin_client.get(f'/admin/appointments/export?{query}').data.decode().splitlines()
+
+    # Current appointments come first
+    assert [json.loads(line)['id'] for line in export('format=ndjson')] == [current, archived]
+    lines = export('format=csv&date_from=2020-01-01&date_to=2020-01-31')
+    assert len(lines) == 2 and lines[1].startswith(f'{archived},2020-01-08,09:00,10:00,completed,')
+    assert [json.loads(line)['id'] for line in export(f'format=ndjson&date_from={tomorrow}')] == [current]
+
+
+def test_list_rejects_archived_dates(admin_client, staffs):
+    response = admin_client.get('/admin/appointments/?date_from=2020-01-01&staff=1')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/admin/appointments/?staff=1')
+    assert admin_client.get(f'/admin/appointments/?date_from={ArchiveService.cutoff()}').status_code == 200
+
+
+def test_calendar_includes_archived_appointments(admin_client, staffs, tomorrow, make_appointment):
+    archived, _ = archived_history(make_appointment, staffs, tomorrow)
+
+    month = admin_client.get('/admin/appointments/calendar.json?year=2020&month=1').get_json()
+    day = admin_client.get('/admin/appointments/calendar/day.json?date=2020-01-08').get_json()
+
+    assert month['days'] == {'2020-01-08': {'total': 1, 'by_staff': {str(staffs[0].id): 1}}}
+    assert [row[0] for row in month['appointments']] == [archived]
+    assert [(row['id'], row['staff']['name'], row['url']) for row in day['appointments']] == [(archived, 'Staff 0', None)]
+
+
+def test_customer_history_includes_archived_appointments(client, auth_headers, staffs, tomorrow, make_appointment):
+    archived, current = archived_history(make_appointment, staffs, tomorrow)
+
+    response = client.get('/api/appointments/', headers=auth_headers)
+
+    assert [row['id'] for row in response.get_json()] == [current, archived]
+    assert response.get_json()[1]['status'] == 'completed'
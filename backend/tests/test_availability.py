@@ -0,0 +1,86 @@
+from datetime import datetime, time, timedelta
+
+from src.models import TimeOff
+from src.services.availability_service import AvailabilityService
+
+
+def at(hour, minute=0):
+    return datetime(2024, 1, 1, hour, minute)
+
+
+def free_slots(shifts, busy, duration=60, interval=30, not_before=None):
+    slots = AvailabilityService.iter_free_slots(
+        shifts, busy, timedelta(minutes=duration), timedelta(minutes=interval), not_before
+    )
+    return [slot.strftime('%H:%M') for slot in slots]
+
+
+def test_free_slots_fit_within_shifts():
+    assert free_slots([(at(9), at(11))], []) == ['09:00', '09:30', '10:00']
+    assert free_slots([(at(9), at(9, 45))], []) == []
+
+
+def test_free_slots_skip_busy_periods():
+    assert free_slots([(at(9), at(13))], [(at(10), at(11))]) == ['09:00', '11:00', '11:30', '12:00']
+
+
+def test_free_slots_next_to_busy_periods():
+    # Slots may end exactly when a booking starts and start exactly when it ends
+    assert free_slots([(at(9), at(12))], [(at(10), at(10, 30))], interval=60) == ['09:00', '11:00']
+    assert free_slots([(at(9), at(12))], [(at(10), at(10, 30))]) == ['09:00', '10:30', '11:00']
+
+
+def test_free_slots_split_shifts_and_busy_across_the_break():
+    shifts = [(at(9), at(12)), (at(13), at(15))]
+
+    assert free_slots(shifts, [(at(11), at(13, 30))]) == ['09:00', '09:30', '10:00', '13:30', '14:00']
+
+
+def test_free_slots_not_before():
+    assert free_slots([(at(9), at(11))], [], not_before=at(9, 15)) == ['09:30', '10:00']
+
+
+def test_next_available_merges_staff_in_time_order(app, service, staffs, tomorrow, make_appointment):
+    make_appointment(staffs[0], tomorrow, time(9), time(10))
+    not_before = datetime.combine(tomorrow, time(9))
+
+    openings, error = AvailabilityService.find_next_available(service.id, count=4, not_before=not_before)
+
+    assert error is None
+    assert [(opening['staff_id'], opening['start_time'], opening['end_time']) for opening in openings] == [
+        (staffs[1].id, '09:00', '09:45'),
+        (staffs[2].id, '09:00', '09:45'),
+        (staffs[1].id, '09:30', '10:15'),
+        (staffs[2].id, '09:30', '10:15'),
+    ]
+
+
+def test_next_available_for_one_staff_member_skips_time_off(app, salon, service, staffs, tomorrow, make_appointment):
+    make_appointment(staffs[0], tomorrow, time(9), time(10))
+    day_start = datetime.combine(tomorrow, time())
+    TimeOff.create(staff_id=staffs[0].id, salon_id=salon.id, start_at=day_start + timedelta(hours=10),
+                   end_at=day_start + timedelta(hours=17))
+
+    openings, error = AvailabilityService.find_next_available(
+        service.id, count=3, staff_id=staffs[0].id, not_before=day_start
+    )
+
+    assert error is None
+    assert [(opening['date'], opening['start_time']) for opening in openings] == [
+        (tomorrow.isoformat(), '17:00'),
+        ((tomorrow + timedelta(days=1)).isoformat(), '09:00'),
+        ((tomorrow + timedelta(days=1)).isoformat(), '09:30'),
+    ]
+
+
+def test_next_available_stops_after_the_last_day(app, service, staffs, tomorrow):
+    not_before = datetime.combine(tomorrow, time(17))
+
+    openings, _ = AvailabilityService.find_next_available(service.id, count=10, days=1, staff_id=staffs[0].id,
+                                                          not_before=not_before)
+
+    assert [opening['start_time'] for opening in openings] == ['17:00']
+
+
+def test_next_available_unknown_service(app):
+    assert AvailabilityService.find_next_available(99999) == (None, 'Service not found')
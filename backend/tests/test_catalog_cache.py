@@ -0,0 +1,45 @@
+import src.database
+from src.services.catalog_service import CatalogService
+
+
+def test_unknown_salon_leaves_no_redis_keys(client, app, redis):
+    response = client.get('/api/salons/99999/')
+
+    assert response.status_code == 404
+    assert redis.keys('heresalon:catalog:*') == []
+
+
+def test_etag_revalidation(client, salon):
+    first = client.get(f'/api/salons/{salon.id}/')
+    assert first.status_code == 200
+
+    second = client.get(f'/api/salons/{salon.id}/')
+    etag = second.headers['ETag']
+    assert client.get(f'/api/salons/{salon.id}/', headers={'If-None-Match': etag}).status_code == 304
+
+    CatalogService.refresh(salon.id)
+    assert client.get(f'/api/salons/{salon.id}/', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_if_modified_since_alone_does_not_return_304(client, salon):
+    client.get(f'/api/salons/{salon.id}/')
+    last_modified = client.get(f'/api/salons/{salon.id}/').headers['Last-Modified']
+
+    # Bumped within the same second: Last-Modified is unchanged
+    CatalogService.refresh(salon.id)
+    response = client.get(f'/api/salons/{salon.id}/', headers={'If-Modified-Since': last_modified})
+
+    assert response.status_code == 200
+
+
+def test_snapshot_is_built_on_the_primary(app, salon, monkeypatch):
+    routed = []
+    build_time_off = CatalogService.build_time_off
+    monkeypatch.setattr(CatalogService, 'build_time_off', staticmethod(
+        lambda salon_id: routed.append(src.database._routing.replica) or build_time_off(salon_id)
+    ))
+
+    with src.database.use_replica():
+        assert CatalogService.build_snapshot(salon.id) is not None
+
+    assert routed == [False]
@@ -0,0 +1,98 @@
+from datetime import time
+
+import pytest
+
+from src.events import stream_key
+from src.models import Salon, User, UserRole
+from src.routes.api.auth import encode_jwt_token
+from src.serializers import loads
+from src.settings import Settings as S
+from tests.conftest import bearer
+
+
+@pytest.fixture(autouse=True)
+def events_enabled(monkeypatch):
+    monkeypatch.setattr(S, 'EVENTS_ENABLED', True)
+
+
+def open_stream(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    status, mimetype = response.status_code, response.mimetype
+    response.close()
+    return status, mimetype
+
+
+def test_streams_require_a_token(client, salon, staffs):
+    assert open_stream(client, f'/api/salons/{salon.id}/events/')[0] == 401
+    assert open_stream(client, f'/api/staffs/{staffs[0].id}/events/')[0] == 401
+    assert open_stream(client, f'/api/salons/{salon.id}/events/?access_token=invalid')[0] == 401
+
+
+def test_customers_cannot_follow_a_salon(client, salon, staffs, auth_headers):
+    assert open_stream(client, f'/api/salons/{salon.id}/events/', headers=auth_headers)[0] == 403
+    assert open_stream(client, f'/api/staffs/{staffs[0].id}/events/', headers=auth_headers)[0] == 403
+
+
+def test_manager_follows_their_salon_with_a_query_token(client, salon, staffs, manager):
+    # Opening a stream closes the session, detaching the fixtures
+    salon_url, staff_url = f'/api/salons/{salon.id}/events/', f'/api/staffs/{staffs[0].id}/events/'
+    token = encode_jwt_token({'user_id': manager.id})
+
+    assert open_stream(client, f'{salon_url}?access_token={token}') == (200, 'text/event-stream')
+    assert open_stream(client, staff_url, headers={'Authorization': f'Bearer {token}'})[0] == 200
+
+
+def test_staff_member_follows_only_their_salon(client, salon, staffs):
+    user = User.create(username='stylist', email='stylist@example.com', role=UserRole.STAFF)
+    staffs[0].set(user_id=user.id)
+    staffs[0].save()
+    other_salon = Salon.create(name='Other', start_working_time=time(9), end_working_time=time(18))
+    urls = (f'/api/staffs/{staffs[1].id}/events/', f'/api/salons/{other_salon.id}/events/')
+    headers = bearer(user)
+
+    assert open_stream(client, urls[0], headers=headers)[0] == 200
+    assert open_stream(client, urls[1], headers=headers)[0] == 403
+
+
+def published(redis, scope, object_id):
+    return [loads(fields[b'data']) for _, fields in redis.xrange(stream_key(scope, object_id))]
+
+
+def test_booking_changes_are_published(client, redis, auth_headers, salon, staffs, service, tomorrow):
+    response = client.post('/api/appointments/', headers=auth_headers, json={
+        'staff_id': staffs[0].id, 'service_id': service.id, 'date': tomorrow.isoformat(), 'start_time': '10:00'
+    })
+    appointment_id = response.get_json()['id']
+    url = f'/api/appointments/{appointment_id}/'
+    client.put(url, headers=auth_headers, json={'start_time': '11:00'})
+    client.put(url, headers=auth_headers, json={'status': 'cancelled'})
+    client.delete(url, headers=auth_headers)
+
+    events = published(redis, 'staff', staffs[0].id)
+    assert [(event['action'], event['start_time'], event['status']) for event in events] == [
+        ('created', '10:00', 'pending'),
+        ('updated', '11:00', 'pending'),
+        ('cancelled', '11:00', 'cancelled'),
+        ('deleted', '11:00', 'cancelled'),
+    ]
+    assert {(event['id'], event['staff_id'], event['salon_id']) for event in events} == \
+        {(appointment_id, staffs[0].id, salon.id)}
+    assert published(redis, 'salon', salon.id) == events
+
+
+def test_reassigned_appointment_leaves_the_previous_calendar(admin_client, redis, salon, staffs, tomorrow,
+                                                             make_appointment):
+    appointment = make_appointment(staffs[0], tomorrow, time(10), time(11))
+
+    response = admin_client.post(f'/admin/appointments/{appointment.id}/edit', data={
+        'status': 'pending', 'staff_id': str(staffs[1].id), 'date': tomorrow.isoformat(),
+        'start_time': f'{tomorrow.isoformat()}T10:00', 'end_time': f'{tomorrow.isoformat()}T11:00',
+    })
+
+    assert response.status_code == 302
+    expected = {'id': appointment.id, 'action': 'updated', 'staff_id': staffs[1].id, 'salon_id': salon.id,
+                'previous_staff_id': staffs[0].id, 'previous_salon_id': salon.id}
+    for scope, object_id in (('staff', staffs[0].id), ('staff', staffs[1].id), ('salon', salon.id)):
+        events = published(redis, scope, object_id)
+        assert len(events) == 1
+        assert {name: events[0][name] for name in expected} == expected
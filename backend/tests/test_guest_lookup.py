@@ -0,0 +1,47 @@
+from datetime import datetime, time
+
+import pytest
+
+from src.models import db, Appointment, Salon, Staff, User, UserRole
+from tests.conftest import bearer
+
+
+@pytest.fixture
+def guest_booking(service, staffs, tomorrow):
+    values = dict(staff_id=staffs[0].id, service_id=service.id, phone_number='+1 555 010 2030',
+                  phone_digits='15550102030', status='PENDING', date=tomorrow,
+                  start_time=datetime.combine(tomorrow, time(10)), end_time=datetime.combine(tomorrow, time(11)))
+    result = db.session.execute(Appointment.__table__.insert(), values)
+    db.session.commit()
+    return result.inserted_primary_key[0]
+
+
+def lookup(client, headers=None):
+    return client.get('/api/appointments/lookup/?phone=%2B15550102030', headers=headers or {})
+
+
+def test_lookup_requires_a_token(client, guest_booking):
+    assert lookup(client).status_code == 401
+
+
+def test_customers_cannot_look_up_bookings(client, guest_booking, auth_headers):
+    assert lookup(client, auth_headers).status_code == 403
+
+
+def test_manager_finds_bookings_without_phone_number(client, guest_booking, manager):
+    response = lookup(client, bearer(manager))
+
+    assert response.status_code == 200
+    assert [appointment['id'] for appointment in response.get_json()] == [guest_booking]
+    assert 'phone_number' not in response.get_json()[0]
+
+
+def test_staff_only_see_their_own_salon(client, guest_booking, staffs):
+    own = User.create(username='own', email='own@example.com', role=UserRole.STAFF)
+    staffs[1].user_id = own.id
+    other_salon = Salon.create(name='Other', start_working_time=time(9), end_working_time=time(18))
+    other = User.create(username='other', email='other@example.com', role=UserRole.STAFF)
+    Staff.create(name='Other staff', salon_id=other_salon.id, role=1, user_id=other.id)
+
+    assert len(lookup(client, bearer(own)).get_json()) == 1
+    assert lookup(client, bearer(other)).get_json() == []
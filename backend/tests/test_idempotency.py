@@ -0,0 +1,84 @@
+import pytest
+
+from src.models import Appointment
+from src.services.appointment_service import AppointmentService
+from src.settings import Settings as S
+
+
+@pytest.fixture(autouse=True)
+def idempotency_enabled(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'IDEMPOTENCY_ENABLED', True)
+    monkeypatch.setattr(S, 'EVENTS_ENABLED', False)
+
+
+@pytest.fixture
+def booking(staffs, service, tomorrow):
+    return {'staff_id': staffs[0].id, 'service_id': service.id, 'date': tomorrow.isoformat(), 'start_time': '10:00'}
+
+
+def post(client, headers, body, idempotency_key='booking-1'):
+    return client.post('/api/appointments/', json=body, headers=dict(headers, **{'Idempotency-Key': idempotency_key}))
+
+
+def test_retry_replays_the_stored_response(client, auth_headers, booking):
+    first = post(client, auth_headers, booking)
+    second = post(client, auth_headers, booking)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert Appointment.query.count() == 1
+
+
+def test_other_keys_and_users_are_not_replayed(client, auth_headers, booking):
+    assert post(client, auth_headers, booking).status_code == 201
+
+    # Same key as a guest: a separate scope, so the booking runs (and conflicts)
+    response = post(client, {}, dict(booking, customer_phone='+1 555 010 2030'))
+    assert 'Idempotent-Replayed' not in response.headers
+    assert response.status_code == 400
+
+
+def test_retry_while_in_progress_gets_409(client, auth_headers, booking, monkeypatch):
+    create_appointment = AppointmentService.create_appointment
+    retries = []
+
+    def create_with_retry(data, user_id=None):
+        retries.append(post(client, auth_headers, booking))
+        return create_appointment(data, user_id)
+    monkeypatch.setattr(AppointmentService, 'create_appointment', staticmethod(create_with_retry))
+
+    assert post(client, auth_headers, booking).status_code == 201
+    assert retries[0].status_code == 409
+    assert retries[0].headers['Retry-After'] == '1'
+    assert Appointment.query.count() == 1
+
+
+def test_same_key_with_a_different_body_gets_422(client, auth_headers, booking):
+    assert post(client, auth_headers, booking).status_code == 201
+
+    response = post(client, auth_headers, dict(booking, start_time='11:00'))
+
+    assert response.status_code == 422
+    assert Appointment.query.count() == 1
+
+
+def test_server_errors_release_the_key(client, auth_headers, booking, monkeypatch):
+    create_appointment = AppointmentService.create_appointment
+
+    def fail(data, user_id=None):
+        raise RuntimeError('database unavailable')
+    monkeypatch.setattr(AppointmentService, 'create_appointment', staticmethod(fail))
+    assert post(client, auth_headers, booking).status_code == 500
+
+    monkeypatch.setattr(AppointmentService, 'create_appointment', staticmethod(create_appointment))
+    response = post(client, auth_headers, booking)
+
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_invalid_key(client, auth_headers, booking):
+    assert post(client, auth_headers, booking, idempotency_key='x' * 256).status_code == 400
+    assert Appointment.query.count() == 0
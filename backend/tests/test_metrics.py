@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.models import db
+
+
+def test_metrics_require_the_token(client, salon):
+    client.get(f'/api/salons/{salon.id}/')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer test-metrics-token'})
+    assert response.status_code == 200
+    assert b'heresalon_http_requests_total' in response.data
+
+
+def test_failed_statement_does_not_leak_start_time(app):
+    connection = db.session.connection()
+    with pytest.raises(OperationalError):
+        connection.execute(text('SELECT * FROM missing_table'))
+
+    assert connection.info.get('query_start_time') == []
@@ -0,0 +1,58 @@
+"""Statement counts of list endpoints.
+
+The ``query_guard`` fixture (tests/conftest.py) fails a test when one
+statement shape runs more than QUERY_GUARD_THRESHOLD times, i.e. on an
+N+1 regression; the explicit count bounds catch any other growth.  Data
+is created by fixtures requested before ``query_guard``, so only the
+request is tracked.
+"""
+from datetime import time
+
+import pytest
+
+from src.models import Salon, Service, ServiceType, Staff
+
+
+@pytest.fixture
+def booked_day(staffs, make_appointment, tomorrow):
+    for i, staff in enumerate(staffs * 4):
+        make_appointment(staff, tomorrow, time(9 + i % 8), time(9 + i % 8, 30))
+    return tomorrow
+
+
+@pytest.fixture
+def salons(app):
+    salons = []
+    for i in range(10):
+        salon = Salon.create(name=f'Salon {i}', start_working_time=time(9), end_working_time=time(18))
+        Service.create(name='Cut', salon_id=salon.id, type=ServiceType.HAIR_CUT)
+        Staff.create(name='Stylist', salon_id=salon.id, role=1)
+        salons.append(salon)
+    return salons
+
+
+def test_staff_calendar(client, staffs, booked_day, query_guard):
+    response = client.get(f'/api/staffs/{staffs[0].id}/appointments/?month={booked_day.month}&year={booked_day.year}')
+
+    assert response.status_code == 200
+    appointments = response.get_json()['appointments']
+    assert len(appointments) == 4
+    assert appointments[0]['service']['name'] == 'Gel Manicure'
+    assert appointments[0]['user']['username'] == 'customer'
+    assert query_guard.count <= 5
+
+
+def test_admin_salon_list(admin_client, salons, query_guard):
+    response = admin_client.get('/admin/salons/')
+
+    assert response.status_code == 200
+    assert b'Salon 9' in response.data
+    assert query_guard.count <= 4
+
+
+def test_admin_appointment_list(admin_client, booked_day, query_guard):
+    response = admin_client.get('/admin/appointments/')
+
+    assert response.status_code == 200
+    assert b'Gel Manicure' in response.data
+    assert query_guard.count <= 6
@@ -0,0 +1,55 @@
+from datetime import time
+from decimal import Decimal
+
+from src.models import Salon, Service, ServiceType
+
+
+def test_end_time_defaults_to_the_service_duration(client, auth_headers, staffs, service, tomorrow):
+    response = client.post('/api/appointments/', headers=auth_headers, json={
+        'staff_id': staffs[0].id, 'service_id': service.id, 'date': tomorrow.isoformat(), 'start_time': '10:00'
+    })
+
+    assert response.status_code == 201
+    assert (response.get_json()['start_time'], response.get_json()['end_time']) == ('10:00', '10:45')
+
+
+def test_service_ending_after_midnight_is_rejected(client, auth_headers, staffs, service, tomorrow):
+    response = client.post('/api/appointments/', headers=auth_headers, json={
+        'staff_id': staffs[0].id, 'service_id': service.id, 'date': tomorrow.isoformat(), 'start_time': '23:30'
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Service would end after midnight'
+
+
+def test_moving_an_appointment_keeps_its_duration(client, auth_headers, staffs, tomorrow, make_appointment):
+    appointment = make_appointment(staffs[0], tomorrow, time(10), time(10, 45))
+
+    response = client.put(f'/api/appointments/{appointment.id}/', headers=auth_headers, json={'start_time': '14:00'})
+
+    assert response.status_code == 200
+    assert (response.get_json()['start_time'], response.get_json()['end_time']) == ('14:00', '14:45')
+
+
+def test_service_sizes_the_slots(client, staffs, service, tomorrow):
+    url = f'/api/staffs/{staffs[0].id}/available-time-slots/?date={tomorrow.isoformat()}'
+
+    by_service = client.get(f'{url}&service_id={service.id}').get_json()
+    assert by_service['service_duration'] == 45
+    assert by_service['available_slots'][-1] == '17:00'
+
+    explicit = client.get(f'{url}&service_duration=120').get_json()
+    assert explicit['service_duration'] == 120
+    assert explicit['available_slots'][-1] == '16:00'
+
+
+def test_slots_for_a_service_of_another_salon(client, staffs, tomorrow):
+    other_salon = Salon.create(name='Other', start_working_time=time(9), end_working_time=time(18))
+    other_service = Service.create(name='Haircut', salon_id=other_salon.id, type=ServiceType.NAIL_CARE,
+                                   price=Decimal('30'), duration=30)
+
+    response = client.get(f'/api/staffs/{staffs[0].id}/available-time-slots/'
+                          f'?date={tomorrow.isoformat()}&service_id={other_service.id}')
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Service not found in this salon'
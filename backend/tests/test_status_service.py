@@ -0,0 +1,158 @@
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import src.routes.admin.appointments as admin_appointments
+from src.models import db, Appointment, AppointmentStatus
+from src.services.status_service import AppointmentStatusService, TRANSITIONS
+
+PENDING, CONFIRMED, IN_PROGRESS, COMPLETED, CANCELLED = (
+    AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS,
+    AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED,
+)
+
+
+@pytest.mark.parametrize('current,new', [
+    (PENDING, CONFIRMED), (PENDING, CANCELLED), (CONFIRMED, PENDING), (CONFIRMED, COMPLETED),
+    (IN_PROGRESS, COMPLETED), (COMPLETED, COMPLETED), (CANCELLED, CANCELLED),
+])
+def test_allowed_transitions(current, new):
+    assert AppointmentStatusService.can_transition(current, new)
+    assert AppointmentStatusService.check_transition(current, new) is None
+
+
+@pytest.mark.parametrize('current,new', [
+    (PENDING, COMPLETED), (IN_PROGRESS, PENDING), (IN_PROGRESS, CONFIRMED),
+    (COMPLETED, PENDING), (COMPLETED, CANCELLED), (CANCELLED, CONFIRMED),
+])
+def test_forbidden_transitions(current, new):
+    assert not AppointmentStatusService.can_transition(current, new)
+    assert AppointmentStatusService.check_transition(current, new) == \
+        f'Cannot change status from {current.value} to {new.value}'
+
+
+def test_final_statuses_have_no_transitions():
+    assert TRANSITIONS[COMPLETED] == set()
+    assert TRANSITIONS[CANCELLED] == set()
+    assert set(TRANSITIONS) == set(AppointmentStatus)
+
+
+def statuses(*appointments):
+    db.session.expire_all()
+    return [Appointment.query.get(appointment.id).status for appointment in appointments]
+
+
+def test_bulk_transition_skips_final_statuses(app, staffs, tomorrow, make_appointment):
+    pending, confirmed, completed, cancelled = (
+        make_appointment(staffs[0], tomorrow, time(hour), time(hour + 1), status)
+        for hour, status in ((9, 'PENDING'), (10, 'CONFIRMED'), (11, 'COMPLETED'), (12, 'CANCELLED'))
+    )
+    other_day = make_appointment(staffs[0], tomorrow + timedelta(days=1), time(9), time(10))
+
+    changed, error = AppointmentStatusService.bulk_transition(CANCELLED, date_from=tomorrow, date_to=tomorrow)
+
+    assert error is None
+    assert sorted(event['id'] for event in changed) == [pending.id, confirmed.id]
+    assert {event['status'] for event in changed} == {'cancelled'}
+    assert {event['action'] for event in changed} == {'cancelled'}
+    assert {event['salon_id'] for event in changed} == {staffs[0].salon_id}
+    assert statuses(pending, confirmed, completed, cancelled, other_day) == \
+        [CANCELLED, CANCELLED, COMPLETED, CANCELLED, PENDING]
+
+
+def test_bulk_transition_skips_rows_completed_concurrently(app, staffs, tomorrow, make_appointment):
+    selected = [make_appointment(staffs[0], tomorrow, time(hour), time(hour + 1), 'CONFIRMED') for hour in (9, 10)]
+    # Completed by someone else after the IDs were picked
+    Appointment.query.filter_by(id=selected[1].id).update({'status': COMPLETED})
+    db.session.commit()
+
+    changed, error = AppointmentStatusService.bulk_transition(
+        CANCELLED, appointment_ids=[appointment.id for appointment in selected]
+    )
+
+    assert error is None
+    assert [event['id'] for event in changed] == [selected[0].id]
+    assert statuses(*selected) == [CANCELLED, COMPLETED]
+
+
+def test_bulk_transition_rejects_forbidden_sources(app, tomorrow):
+    changed, error = AppointmentStatusService.bulk_transition(
+        PENDING, from_statuses=[CONFIRMED, COMPLETED], date_from=tomorrow
+    )
+
+    assert changed == []
+    assert error == 'Cannot change status from completed to pending'
+
+
+def test_bulk_transition_requires_a_filter(app):
+    assert AppointmentStatusService.bulk_transition(CANCELLED, salon_id=1) == \
+        ([], 'A date, end time or appointment IDs are required')
+
+
+def test_bulk_transition_uses_returning_on_postgres(app, staffs, tomorrow, monkeypatch):
+    statements = []
+    row = SimpleNamespace(id=7, staff_id=staffs[0].id, service_id=3, status=CANCELLED, date=tomorrow,
+                          start_time=datetime.combine(tomorrow, time(9)),
+                          end_time=datetime.combine(tomorrow, time(10)), salon_id=staffs[0].salon_id)
+    monkeypatch.setattr(db.session, 'get_bind', lambda *args, **kwargs: SimpleNamespace(
+        dialect=SimpleNamespace(name='postgresql')
+    ))
+    monkeypatch.setattr(db.session, 'execute', lambda statement, *args, **kwargs: (
+        statements.append(statement) or SimpleNamespace(fetchall=lambda: [row])
+    ))
+    monkeypatch.setattr(db.session, 'commit', lambda: None)
+
+    changed, error = AppointmentStatusService.bulk_transition(CANCELLED, appointment_ids=[7])
+
+    assert error is None
+    assert len(statements) == 1
+    sql = ' '.join(str(statements[0].compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith('UPDATE appointments SET status=')
+    assert 'WHERE appointments.status IN' in sql
+    assert 'RETURNING appointments.status, (SELECT staffs.salon_id' in sql
+    assert changed == [{'id': 7, 'staff_id': staffs[0].id, 'service_id': 3, 'status': 'cancelled',
+                        'date': tomorrow.isoformat(), 'start_time': '09:00', 'end_time': '10:00',
+                        'action': 'cancelled', 'salon_id': staffs[0].salon_id}]
+
+
+def test_auto_complete(app, staffs, tomorrow, make_appointment):
+    yesterday = tomorrow - timedelta(days=2)
+    confirmed, in_progress, pending, upcoming = (
+        make_appointment(staffs[0], day, time(hour), time(hour + 1), status)
+        for day, hour, status in ((yesterday, 9, 'CONFIRMED'), (yesterday, 10, 'IN_PROGRESS'),
+                                  (yesterday, 11, 'PENDING'), (tomorrow, 9, 'CONFIRMED'))
+    )
+
+    changed, error = AppointmentStatusService.auto_complete()
+
+    assert error is None
+    assert sorted(event['id'] for event in changed) == [confirmed.id, in_progress.id]
+    assert {event['action'] for event in changed} == {'updated'}
+    assert statuses(confirmed, in_progress, pending, upcoming) == [COMPLETED, COMPLETED, PENDING, CONFIRMED]
+
+
+def test_admin_edit_validates_the_status(admin_client, staffs, tomorrow, make_appointment, monkeypatch):
+    monkeypatch.setattr(admin_appointments, 'render_template', lambda *args, **kwargs: '')
+    appointment = make_appointment(staffs[0], tomorrow, time(9), time(10), 'COMPLETED')
+    url = f'/admin/appointments/{appointment.id}/edit'
+    form = {'date': tomorrow.isoformat(), 'start_time': f'{tomorrow.isoformat()}T09:00',
+            'end_time': f'{tomorrow.isoformat()}T10:00'}
+
+    for status, message in (('bogus', 'Invalid status'),
+                            ('pending', 'Cannot change status from completed to pending')):
+        assert admin_client.post(url, data=dict(form, status=status)).status_code == 200
+        with admin_client.session_transaction() as session:
+            assert session.pop('_flashes') == [('error', message)]
+    assert statuses(appointment) == [COMPLETED]
+
+    assert admin_client.post(url, data=dict(form, status='completed')).status_code == 302
+
+
+def test_admin_edit_and_delete_require_login(client, staffs, tomorrow, make_appointment):
+    appointment = make_appointment(staffs[0], tomorrow, time(9), time(10))
+
+    assert client.post(f'/admin/appointments/{appointment.id}/edit', data={'status': 'cancelled'}).status_code == 302
+    assert client.post(f'/admin/appointments/{appointment.id}/delete').status_code == 302
+    assert statuses(appointment) == [PENDING]
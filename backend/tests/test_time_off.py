@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from src.models import TimeOff
+from src.models.time_off import TimeOffReason
+from src.services.time_off_service import IntervalIndex, TimeOffService
+from tests.conftest import bearer
+
+
+def at(hour, minute=0, day=1):
+    return datetime(2024, 1, day, hour, minute)
+
+
+def test_interval_index_overlaps_are_half_open():
+    index = IntervalIndex([(at(12), at(14), 'lunch'), (at(9), at(10), 'meeting')])
+
+    assert [reason for _, _, reason in index.overlapping(at(9, 30), at(13))] == ['meeting', 'lunch']
+    # Adjacent periods touch but do not overlap
+    assert index.overlapping(at(10), at(12)) == []
+    assert index.overlapping(at(8), at(9)) == []
+    assert index.overlapping(at(14), at(15)) == []
+    assert len(index.overlapping(at(11, 59), at(12, 1))) == 1
+
+
+def test_interval_index_adjacent_intervals():
+    index = IntervalIndex([(at(9), at(10), 'a'), (at(10), at(11), 'b')])
+
+    assert [reason for _, _, reason in index.overlapping(at(9, 59), at(10, 1))] == ['a', 'b']
+    assert [reason for _, _, reason in index.overlapping(at(10), at(10, 30))] == ['b']
+
+
+def test_interval_index_finds_long_intervals_behind_short_ones():
+    # The week-long period starts first but is still found past later short ones
+    index = IntervalIndex([(at(0), at(0, day=8), 'holiday'), (at(9), at(10), 'a'), (at(9, day=2), at(10, day=2), 'b')])
+
+    assert [reason for _, _, reason in index.overlapping(at(12, day=5), at(13, day=5))] == ['holiday']
+
+
+def test_interval_index_period_crossing_midnight():
+    index = IntervalIndex([(at(22), at(2, day=2), 'night shift')])
+
+    assert len(index.overlapping(at(23), at(23, 30))) == 1
+    assert len(index.overlapping(at(1, day=2), at(3, day=2))) == 1
+    assert index.overlapping(at(2, day=2), at(9, day=2)) == []
+    assert index.overlapping(at(9), at(22)) == []
+
+
+def test_interval_index_empty():
+    index = IntervalIndex([])
+
+    assert len(index) == 0
+    assert index.overlapping(at(9), at(10)) == []
+
+
+def test_conflict_message_hides_the_reason(app, salon, staffs, tomorrow):
+    start = datetime.combine(tomorrow, datetime.min.time())
+    TimeOffService.create_time_off({'start_at': start.isoformat(), 'end_at': (start + timedelta(days=1)).isoformat(),
+                                    'reason': 'sick'}, salon.id, staffs[0])
+
+    message = TimeOffService.find_conflict(staffs[0].id, salon.id, start + timedelta(hours=10), start + timedelta(hours=11))
+    assert message.startswith('Staff is unavailable from')
+    assert 'sick' not in message
+
+
+def test_list_time_off_shows_reasons_only_to_managers(client, salon, staffs, tomorrow, manager, auth_headers):
+    start = datetime.combine(tomorrow, datetime.min.time())
+    TimeOff.create(staff_id=staffs[0].id, salon_id=salon.id, reason=TimeOffReason.SICK, note='Flu',
+                   start_at=start, end_at=start + timedelta(days=1))
+    url = f'/api/salons/{salon.id}/time-off/'
+
+    for headers in ({}, auth_headers):
+        periods = client.get(url, headers=headers).get_json()
+        assert periods == [{'staff_id': staffs[0].id, 'start_at': start.isoformat(),
+                            'end_at': (start + timedelta(days=1)).isoformat()}]
+
+    periods = client.get(url, headers=bearer(manager)).get_json()
+    assert periods[0]['reason'] == 'sick'
+    assert periods[0]['note'] == 'Flu'
@@ -0,0 +1,47 @@
+from datetime import time
+
+from src.models import DayOfWeek
+from src.services.schedule_service import ScheduleService
+
+
+def book(client, headers, staff, service, day, start, end=None):
+    data = {'staff_id': staff.id, 'service_id': service.id, 'date': day.isoformat(), 'start_time': start}
+    if end:
+        data['end_time'] = end
+    return client.post('/api/appointments/', json=data, headers=headers)
+
+
+def test_booking_within_salon_hours(client, auth_headers, staffs, service, tomorrow):
+    assert book(client, auth_headers, staffs[0], service, tomorrow, '09:00').status_code == 201
+    assert book(client, auth_headers, staffs[0], service, tomorrow, '17:15').status_code == 201
+
+
+def test_booking_outside_salon_hours_is_rejected(client, auth_headers, staffs, service, tomorrow):
+    for start, end in (('08:30', '09:30'), ('17:30', None), ('18:00', '19:00')):
+        response = book(client, auth_headers, staffs[0], service, tomorrow, start, end)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Staff member is not working at this time'
+
+
+def test_booking_follows_the_staff_schedule(client, auth_headers, staffs, service, tomorrow):
+    weekday = list(DayOfWeek)[tomorrow.weekday()].value
+    ScheduleService.replace_weekly_schedule(staffs[0], [
+        {'day_of_week': weekday, 'start_time': '10:00', 'end_time': '12:00'},
+        {'day_of_week': weekday, 'start_time': '13:00', 'end_time': '15:00'},
+    ])
+
+    assert book(client, auth_headers, staffs[0], service, tomorrow, '09:00').status_code == 400
+    # Across the lunch break
+    assert book(client, auth_headers, staffs[0], service, tomorrow, '11:30').status_code == 400
+    assert book(client, auth_headers, staffs[0], service, tomorrow, '13:00').status_code == 201
+
+
+def test_rescheduling_outside_working_hours_is_rejected(client, auth_headers, staffs, tomorrow, make_appointment):
+    appointment = make_appointment(staffs[0], tomorrow, time(10), time(11))
+    url = f'/api/appointments/{appointment.id}/'
+
+    response = client.put(url, json={'start_time': '17:45'}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Staff member is not working at this time'
+
+    assert client.put(url, json={'start_time': '16:00'}, headers=auth_headers).status_code == 200